@@ -0,0 +1,336 @@
+"""
+Local stand-ins for MonarchMoney and the BigQuery client.
+
+FakeMonarch serves payloads shaped like the real API responses at any
+scale, with optional per-call latency. Payloads are synthetic by default;
+given a directory of recorded responses, it replays those records instead,
+cloning them with fresh IDs to reach the requested scale.
+
+FakeBigQueryClient accepts load jobs and counts the rows it receives
+without any network access.
+"""
+
+import asyncio
+import copy
+import io
+import json
+from datetime import date, timedelta
+from pathlib import Path
+
+import pyarrow.parquet as pq
+from google.api_core.exceptions import NotFound
+
+# Recorded payload files FakeMonarch.from_recording looks for, by method
+RECORDING_FILES = {
+    "transactions": "transactions.json",
+    "accounts": "accounts.json",
+    "categories": "categories.json",
+    "tags": "tags.json",
+    "account_history": "account_history.json",
+    "budgets": "budgets.json",
+}
+
+
+class FakeMonarch:
+    """Async stand-in for MonarchMoney serving payloads at configurable scale."""
+
+    def __init__(
+        self,
+        n_transactions: int = 1000,
+        n_accounts: int = 5,
+        n_categories: int = 40,
+        n_months: int = 24,
+        latency: float = 0.0,
+        recordings: dict[str, object] | None = None,
+    ):
+        self.n_transactions = n_transactions
+        self.n_accounts = n_accounts
+        self.n_categories = n_categories
+        self.n_months = n_months
+        self.latency = latency
+        self.recordings = recordings or {}
+        self.calls = 0
+
+    @classmethod
+    def from_recording(cls, directory: str | Path, **kwargs) -> "FakeMonarch":
+        """Build a fake that replays recorded API responses from a directory."""
+        directory = Path(directory)
+        recordings = {
+            name: json.loads((directory / filename).read_text())
+            for name, filename in RECORDING_FILES.items()
+            if (directory / filename).exists()
+        }
+        return cls(recordings=recordings, **kwargs)
+
+    def _get_graphql_client(self):
+        raise NotImplementedError("FakeMonarch doesn't make GraphQL calls")
+
+    async def _respond(self):
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    def _transaction(self, i: int) -> dict:
+        if "transactions" in self.recordings:
+            templates = self.recordings["transactions"]["allTransactions"]["results"]
+            record = copy.deepcopy(templates[i % len(templates)])
+            record["id"] = f"txn-{i}"
+            return record
+        day = date(2024, 1, 1) - timedelta(days=i % 1500)
+        return {
+            "id": f"txn-{i}",
+            "ownedByUser": None,
+            "ownershipOverriddenAt": None,
+            "amount": -round((i * 7.31) % 500, 2),
+            "pending": i % 50 == 0,
+            "date": day.isoformat(),
+            "hideFromReports": False,
+            "plaidName": f"MERCHANT {i % 300}",
+            "notes": None,
+            "isRecurring": i % 20 == 0,
+            "reviewStatus": None,
+            "needsReview": False,
+            "attachments": [],
+            "isSplitTransaction": False,
+            "createdAt": f"{day.isoformat()}T12:00:00+00:00",
+            "updatedAt": f"{day.isoformat()}T12:00:00+00:00",
+            "category": {
+                "id": f"cat-{i % self.n_categories}",
+                "name": f"Category {i % self.n_categories}",
+                "__typename": "Category",
+            },
+            "merchant": {
+                "name": f"Merchant {i % 300}",
+                "id": f"merchant-{i % 300}",
+                "transactionsCount": 10,
+                "__typename": "Merchant",
+            },
+            "account": {
+                "id": f"acct-{i % self.n_accounts}",
+                "displayName": f"Account {i % self.n_accounts}",
+                "__typename": "Account",
+            },
+            "businessEntity": None,
+            "tags": [{"id": "tag-1", "name": "Trip", "color": "#fff", "order": 0}]
+            if i % 10 == 0
+            else [],
+            "__typename": "Transaction",
+        }
+
+    async def get_transactions_summary(self):
+        await self._respond()
+        return {"aggregates": [{"summary": {"count": self.n_transactions}}]}
+
+    async def get_transactions(
+        self, limit: int = 100, offset: int = 0, start_date=None, end_date=None
+    ):
+        await self._respond()
+        stop = min(offset + limit, self.n_transactions)
+        return {
+            "allTransactions": {
+                "totalCount": self.n_transactions,
+                "results": [self._transaction(i) for i in range(offset, stop)],
+            }
+        }
+
+    async def get_transaction_categories(self):
+        await self._respond()
+        if "categories" in self.recordings:
+            return self.recordings["categories"]
+        return {
+            "categories": [
+                {
+                    "id": f"cat-{i}",
+                    "order": i,
+                    "name": f"Category {i}",
+                    "systemCategory": None,
+                    "isSystemCategory": False,
+                    "isDisabled": False,
+                    "updatedAt": "2024-01-01T00:00:00+00:00",
+                    "createdAt": "2024-01-01T00:00:00+00:00",
+                    "group": {
+                        "id": f"group-{i % 8}",
+                        "name": f"Group {i % 8}",
+                        "type": "expense",
+                        "__typename": "CategoryGroup",
+                    },
+                    "__typename": "Category",
+                }
+                for i in range(self.n_categories)
+            ]
+        }
+
+    async def get_transaction_tags(self):
+        await self._respond()
+        if "tags" in self.recordings:
+            return self.recordings["tags"]
+        return {
+            "householdTransactionTags": [
+                {
+                    "id": f"tag-{i}",
+                    "name": f"Tag {i}",
+                    "color": "#ffffff",
+                    "order": i,
+                    "transactionCount": 10,
+                    "__typename": "TransactionTag",
+                }
+                for i in range(10)
+            ]
+        }
+
+    def _account(self, i: int) -> dict:
+        if "accounts" in self.recordings:
+            templates = self.recordings["accounts"]["accounts"]
+            record = copy.deepcopy(templates[i % len(templates)])
+            record["id"] = f"acct-{i}"
+            return record
+        return {
+            "id": f"acct-{i}",
+            "displayName": f"Account {i}",
+            "isAsset": i % 3 != 0,
+            "currentBalance": 1000.0 * i,
+            "displayBalance": 1000.0 * i,
+            "type": {"name": "credit" if i % 3 == 0 else "depository"},
+            "subtype": {"name": "credit_card" if i % 3 == 0 else "checking"},
+            "institution": {"id": f"inst-{i % 4}", "name": f"Bank {i % 4}"},
+            "__typename": "Account",
+        }
+
+    async def get_accounts(self):
+        await self._respond()
+        return {"accounts": [self._account(i) for i in range(self.n_accounts)]}
+
+    async def get_account_history(self, account_id: str):
+        await self._respond()
+        if "account_history" in self.recordings:
+            snapshots = copy.deepcopy(self.recordings["account_history"])
+        else:
+            start = date(2024, 1, 1)
+            snapshots = [
+                {
+                    "date": (start - timedelta(days=day)).isoformat(),
+                    "signedBalance": 1000.0 + day,
+                    "__typename": "AccountSnapshot",
+                }
+                for day in range(self.n_months * 30)
+            ]
+        for snapshot in snapshots:
+            snapshot["accountId"] = account_id
+            snapshot["accountName"] = f"Account {account_id}"
+        return snapshots
+
+    async def get_budgets(self, start_date=None, end_date=None):
+        await self._respond()
+        if "budgets" in self.recordings:
+            return copy.deepcopy(self.recordings["budgets"])
+        months = [
+            date(2022 + m // 12, 1 + m % 12, 1).isoformat()
+            for m in range(self.n_months)
+        ]
+        monthly = [
+            {
+                "month": month,
+                "plannedCashFlowAmount": 100.0,
+                "plannedSetAsideAmount": 0.0,
+                "actualAmount": 90.0,
+                "remainingAmount": 10.0,
+                "previousMonthRolloverAmount": None,
+                "rolloverType": None,
+                "__typename": "BudgetMonthlyAmounts",
+            }
+            for month in months
+        ]
+        return {
+            "budgetData": {
+                "monthlyAmountsByCategory": [
+                    {
+                        "category": {"id": f"cat-{i}", "__typename": "Category"},
+                        "monthlyAmounts": copy.deepcopy(monthly),
+                    }
+                    for i in range(self.n_categories)
+                ],
+                "totalsByMonth": [{"month": month} for month in months],
+            },
+            "categoryGroups": [
+                {
+                    "id": f"group-{g}",
+                    "name": f"Group {g}",
+                    "type": "expense",
+                    "budgetVariability": "fixed",
+                    "groupLevelBudgetingEnabled": False,
+                    "categories": [
+                        {
+                            "id": f"cat-{i}",
+                            "name": f"Category {i}",
+                            "order": i,
+                            "budgetVariability": "fixed",
+                            "rolloverPeriod": None,
+                        }
+                        for i in range(g, self.n_categories, 8)
+                    ],
+                }
+                for g in range(8)
+            ],
+            "goalsV2": [],
+        }
+
+
+class FakeLoadJob:
+    """Completed load job reporting the rows it received."""
+
+    def __init__(self, output_rows: int):
+        self.output_rows = output_rows
+
+    def result(self):
+        return self
+
+
+class FakeTable:
+    """Loaded table, holding only its ID and labels."""
+
+    def __init__(self, table_id: str, labels: dict[str, str]):
+        self.table_id = table_id
+        self.labels = labels
+
+
+class FakeBigQueryClient:
+    """
+    BigQuery client stand-in that accepts and counts Parquet loads.
+
+    Appending loads add to a table's counts, and copy jobs move a table's
+    counts to the destination, which is enough for StreamingLoad. Loaded
+    tables keep their labels, so fingerprint skips work across loads.
+    """
+
+    def __init__(self):
+        self.loads: dict[str, dict] = {}
+        self.labels: dict[str, dict[str, str]] = {}
+
+    def load_table_from_file(self, file_obj, table_id, job_config=None):
+        data = file_obj.read()
+        rows = pq.ParquetFile(io.BytesIO(data)).metadata.num_rows
+        previous = self.loads.get(table_id, {"rows": 0, "bytes": 0})
+        if job_config is not None and job_config.write_disposition == "WRITE_APPEND":
+            self.loads[table_id] = {
+                "rows": previous["rows"] + rows,
+                "bytes": previous["bytes"] + len(data),
+            }
+        else:
+            self.loads[table_id] = {"rows": rows, "bytes": len(data)}
+        return FakeLoadJob(rows)
+
+    def get_table(self, table_id):
+        if table_id not in self.loads:
+            raise NotFound(table_id)
+        return FakeTable(table_id, dict(self.labels.get(table_id, {})))
+
+    def update_table(self, table, fields):
+        self.labels[table.table_id] = dict(table.labels)
+        return table
+
+    def copy_table(self, source, destination, job_config=None):
+        self.loads[destination] = dict(self.loads[source])
+        return FakeLoadJob(self.loads[destination]["rows"])
+
+    def delete_table(self, table_id, not_found_ok=False):
+        self.loads.pop(table_id, None)
@@ -0,0 +1,103 @@
+"""
+Compare forecasting engines on synthetic credit card spending.
+
+Each card gets a monthly series with a trend, yearly seasonality and noise.
+Every engine is fit on all but the last ``--holdout`` months and scored on
+the held-out months. Prophet fits run serially so runtimes are comparable.
+
+Usage:
+    python benchmarks/forecast_engines.py --cards 20 --months 48 --holdout 6
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from zwickfi import forecasts  # noqa: E402
+
+
+def make_spending(n_cards: int, n_months: int, seed: int = 0) -> pd.DataFrame:
+    """Build synthetic monthly spending for n_cards cards."""
+    rng = np.random.default_rng(seed)
+    months = pd.date_range("2020-01-01", periods=n_months, freq="MS")
+    t = np.arange(n_months)
+    frames = []
+    for card in range(n_cards):
+        base = rng.uniform(200, 3000)
+        slope = rng.normal(0, base * 0.005)
+        season = base * 0.2 * np.sin(2 * np.pi * (months.month - rng.integers(12)) / 12)
+        noise = rng.normal(0, base * 0.05, n_months)
+        frames.append(
+            pd.DataFrame(
+                {
+                    "account_name": f"Card {card:03d}",
+                    "due_month": months,
+                    "amount": base + slope * t + season + noise,
+                }
+            )
+        )
+    return pd.concat(frames, ignore_index=True)
+
+
+def score(forecast: pd.DataFrame, actual: pd.DataFrame) -> dict[str, float]:
+    """Mean absolute and mean absolute percentage error on held-out months."""
+    merged = actual.merge(
+        forecast[["account_name", "ds", "yhat"]],
+        left_on=["account_name", "due_month"],
+        right_on=["account_name", "ds"],
+    )
+    errors = (merged["yhat"] - merged["amount"]).abs()
+    return {
+        "mae": float(errors.mean()),
+        "mape": float((errors / merged["amount"].abs()).mean() * 100),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--cards", type=int, default=10)
+    parser.add_argument("--months", type=int, default=48)
+    parser.add_argument("--holdout", type=int, default=6)
+    parser.add_argument(
+        "--engines", nargs="+", default=list(forecasts.FORECAST_ENGINES)
+    )
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    spending = make_spending(args.cards, args.months)
+    cutoff = spending["due_month"].max() - pd.DateOffset(months=args.holdout - 1)
+    train = spending[spending["due_month"] < cutoff]
+    test = spending[spending["due_month"] >= cutoff]
+    credit_cards = train["account_name"].unique().tolist()
+
+    results = []
+    for engine in args.engines:
+        start = time.perf_counter()
+        forecast = forecasts.generate_forecasts(
+            train, credit_cards, workers=1, engine=engine
+        )
+        elapsed = time.perf_counter() - start
+        results.append({"engine": engine, "seconds": elapsed, **score(forecast, test)})
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{args.cards} cards, {args.months} months, {args.holdout}-month holdout")
+    print(f"{'engine':<10}{'seconds':>10}{'MAE':>12}{'MAPE %':>10}")
+    for row in results:
+        print(
+            f"{row['engine']:<10}{row['seconds']:>10.3f}"
+            f"{row['mae']:>12.2f}{row['mape']:>10.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
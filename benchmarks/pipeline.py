@@ -0,0 +1,241 @@
+"""
+Time and memory-profile each pipeline stage against local fakes.
+
+Monarch responses come from FakeMonarch (synthetic, or replayed from
+recorded payloads with ``--payloads``) and loads go to FakeBigQueryClient,
+so runs need no credentials or network and are comparable across versions.
+Each stage is timed as the best of ``--repeat`` runs, then run once more
+under tracemalloc for its peak Python allocation.
+
+Usage:
+    python benchmarks/pipeline.py --scale medium --output results.json
+    python benchmarks/pipeline.py --transactions 20000 --accounts 10 --latency 0.05
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from fakes import FakeBigQueryClient, FakeMonarch  # noqa: E402
+from forecast_engines import make_spending  # noqa: E402
+
+import zwickfi  # noqa: E402
+from zwickfi import bigquery, cli, forecasts, instrumentation, monarch  # noqa: E402
+from zwickfi.schemas import MONARCH_TABLES, TRANSACTION_FIELDS  # noqa: E402
+from zwickfi.utils import flatten_records, json_to_dataframe  # noqa: E402
+
+# (transactions, accounts) for each --scale preset
+SCALES = {
+    "small": (1_000, 5),
+    "medium": (50_000, 100),
+    "large": (500_000, 100),
+}
+
+
+def measure(stage, repeat: int) -> dict[str, float]:
+    """Best wall time over repeat runs, plus peak traced memory of one run."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        stage()
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        stage()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "seconds": min(times),
+        "peak_mb": peak / 1024 / 1024,
+        "max_rss_mb": instrumentation.max_rss_mb(),
+    }
+
+
+@contextlib.contextmanager
+def _quiet():
+    """Silence the pipeline's progress prints while a stage runs."""
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=os.path.dirname(__file__),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_stages(mm: FakeMonarch, args: argparse.Namespace) -> dict[str, dict]:
+    """Run every pipeline stage against the fakes and collect measurements."""
+    results = {}
+
+    def record(name, stage):
+        with _quiet():
+            results[name] = measure(stage, args.repeat)
+        print(f"{name:<28}{results[name]['seconds']:>10.3f}s", file=sys.stderr)
+
+    # Raw pages are fetched once and reused as input for the flatten stages
+    pages = {}
+
+    def paginate():
+        pages["records"] = asyncio.run(
+            monarch._get_transaction_pages_async(
+                mm, mm.n_transactions, args.page_concurrency
+            )
+        )
+
+    record("pagination", paginate)
+    records = pages["records"]
+
+    record(
+        "json_to_dataframe",
+        lambda: json_to_dataframe(records, entity="transactions"),
+    )
+    record("json_to_dataframe_generic", lambda: json_to_dataframe(records))
+    record("get_budgets", lambda: monarch.get_budgets(mm))
+    record(
+        "account_history",
+        lambda: monarch.get_accounts_history(
+            mm,
+            [f"acct-{i}" for i in range(mm.n_accounts)],
+            concurrency=args.history_concurrency,
+        ),
+    )
+
+    spending = make_spending(args.cards, args.months)
+    credit_cards = spending["account_name"].unique().tolist()
+    for engine in args.engines:
+        record(
+            f"forecast_{engine}",
+            lambda engine=engine: forecasts.generate_forecasts(
+                spending, credit_cards, workers=1, engine=engine
+            ),
+        )
+
+    # The pipeline's own stage graph against the fakes, as `zwickfi extract`
+    # runs it. The warm run repeats a sync on the same client, as scheduled
+    # syncs do: unchanged dimension tables are skipped by fingerprint while
+    # the others are reloaded.
+    os.environ["TRANSACTIONS_SYNC_MODE"] = "full"
+    os.environ["ACCOUNT_HISTORY_SYNC_MODE"] = "full"
+
+    def sync(client):
+        cli._sync(client, mm, list(MONARCH_TABLES), forecast=False, load=True)
+
+    record("sync", lambda: sync(FakeBigQueryClient()))
+    warm_client = FakeBigQueryClient()
+    with _quiet():
+        sync(warm_client)
+    record("sync_unchanged_dimensions", lambda: sync(warm_client))
+
+    # Extract-and-load of transactions end to end, collected vs streamed;
+    # peak_mb shows how memory scales with history in each mode
+    def batch_transactions():
+        df = monarch.get_transactions(
+            mm, limit=mm.n_transactions, concurrency=args.page_concurrency
+        )
+        bigquery.write_to_bigquery(df, "monarch", "txns", FakeBigQueryClient())
+
+    record("transactions_batch", batch_transactions)
+    record(
+        "transactions_streaming",
+        lambda: asyncio.run(stream_transactions(mm, args.page_concurrency)),
+    )
+    return results
+
+
+async def stream_transactions(mm: FakeMonarch, concurrency: int) -> None:
+    """Stream transaction pages to a fake table, as TRANSACTIONS_STREAMING does."""
+    loader = bigquery.StreamingLoad("monarch", "txns", FakeBigQueryClient())
+    async for page in monarch.iter_transaction_pages_async(mm, concurrency=concurrency):
+        loader.append(flatten_records(page, TRANSACTION_FIELDS))
+    loader.finish()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scale", choices=SCALES, default="small")
+    parser.add_argument("--transactions", type=int, help="Overrides --scale")
+    parser.add_argument("--accounts", type=int, help="Overrides --scale")
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="Seconds per fake API call"
+    )
+    parser.add_argument("--payloads", help="Directory of recorded API responses")
+    parser.add_argument(
+        "--page-concurrency", type=int, default=monarch.DEFAULT_PAGE_CONCURRENCY
+    )
+    parser.add_argument(
+        "--history-concurrency",
+        type=int,
+        default=monarch.DEFAULT_HISTORY_CONCURRENCY,
+    )
+    parser.add_argument("--cards", type=int, default=10)
+    parser.add_argument("--months", type=int, default=48)
+    parser.add_argument("--engines", nargs="+", default=["linear"])
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--output", help="Write JSON results here, not stdout")
+    args = parser.parse_args()
+
+    n_transactions, n_accounts = SCALES[args.scale]
+    scale = {
+        "transactions": args.transactions or n_transactions,
+        "accounts": args.accounts or n_accounts,
+        "latency": args.latency,
+    }
+    if args.payloads:
+        mm = FakeMonarch.from_recording(
+            args.payloads,
+            n_transactions=scale["transactions"],
+            n_accounts=scale["accounts"],
+            latency=args.latency,
+        )
+    else:
+        mm = FakeMonarch(
+            n_transactions=scale["transactions"],
+            n_accounts=scale["accounts"],
+            latency=args.latency,
+        )
+
+    output = {
+        "zwickfi_version": zwickfi.__version__,
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "scale": scale,
+        "payloads": args.payloads,
+        "repeat": args.repeat,
+        "stages": run_stages(mm, args),
+    }
+
+    text = json.dumps(output, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
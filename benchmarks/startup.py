@@ -0,0 +1,67 @@
+"""
+Measure interpreter startup and import time for each CLI stage.
+
+Each case runs in a fresh interpreter and imports what that stage needs,
+so the numbers reflect a cold start. The median of ``--repeat`` runs is
+reported per case.
+
+Usage:
+    python benchmarks/startup.py --repeat 5 --json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+SRC = os.path.join(os.path.dirname(__file__), "..", "src")
+
+# Modules each stage imports on top of zwickfi.cli
+CASES = {
+    "cli": [],
+    "extract": ["zwickfi.auth", "zwickfi.monarch", "zwickfi.bigquery"],
+    "forecast_linear": ["zwickfi.auth", "zwickfi.forecasts", "zwickfi.bigquery"],
+    "forecast_prophet": [
+        "zwickfi.auth",
+        "zwickfi.forecasts",
+        "zwickfi.bigquery",
+        "prophet",
+    ],
+}
+
+
+def time_imports(modules: list[str]) -> float:
+    """Wall time of a fresh interpreter importing zwickfi.cli plus modules."""
+    code = "; ".join(f"import {module}" for module in ["zwickfi.cli", *modules])
+    env = {**os.environ, "PYTHONPATH": SRC}
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", code], env=env, check=True)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--cases", nargs="+", default=list(CASES), choices=CASES)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    results = {
+        case: statistics.median(time_imports(CASES[case]) for _ in range(args.repeat))
+        for case in args.cases
+    }
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'stage':<20}{'seconds':>10}")
+    for case, seconds in results.items():
+        print(f"{case:<20}{seconds:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
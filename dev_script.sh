@@ -1,2 +1,2 @@
 #!/bin/sh
-python src/zwickfi/zwickfi.py
+PYTHONPATH=src python -m zwickfi "$@"
@@ -1,23 +1,241 @@
 """Authentication utilities for Monarch Money and Google Cloud."""
 
 import asyncio
+import base64
+import json
 import os
+from pathlib import Path
+from typing import Any, Protocol
 
+from cryptography.fernet import Fernet, InvalidToken
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 from google.cloud import bigquery
 from google.oauth2 import service_account
+from gql import gql
+from gql.transport.exceptions import TransportServerError
 from monarchmoney import MonarchMoney
 
+# Smallest authenticated query, used to check a cached session still works
+_SESSION_CHECK_QUERY = gql("query GetSessionCheck { subscription { id } }")
 
-def get_monarch_client() -> MonarchMoney:
+
+class SessionStore(Protocol):
+    """Secure storage for a Monarch session between runs."""
+
+    def load(self) -> dict | None:
+        """Return the stored session, or None if there isn't a usable one."""
+        ...
+
+    def save(self, session: dict) -> None:
+        """Store a session, replacing any existing one."""
+        ...
+
+    def clear(self) -> None:
+        """Remove the stored session."""
+        ...
+
+
+# Random salt stored with each encrypted file, and the PBKDF2 iterations
+# its key is derived with
+SALT_BYTES = 16
+_KDF_ITERATIONS = 390_000
+
+
+def derive_fernet(secret: str, salt: bytes) -> Fernet:
+    """
+    Derive a Fernet cipher from a secret and salt with PBKDF2.
+
+    Args:
+        secret: Secret the key is derived from, e.g. MONARCH_SESSION_KEY.
+        salt: SALT_BYTES random bytes stored alongside the encrypted data.
+
+    Returns:
+        Fernet cipher for the derived key.
+    """
+    kdf = PBKDF2HMAC(
+        algorithm=hashes.SHA256(),
+        length=32,
+        salt=salt,
+        iterations=_KDF_ITERATIONS,
+    )
+    return Fernet(base64.urlsafe_b64encode(kdf.derive(secret.encode())))
+
+
+class EncryptedFileSessionStore:
+    """
+    Session store backed by a Fernet-encrypted local file.
+
+    The encryption key is derived from a secret with PBKDF2 and a random
+    salt stored at the start of the file. The file is only readable by the
+    current user.
+    """
+
+    def __init__(self, path: str | Path, secret: str):
+        self.path = Path(path).expanduser()
+        self._secret = secret
+
+    def load(self) -> dict | None:
+        try:
+            data = self.path.read_bytes()
+        except FileNotFoundError:
+            return None
+        salt, token = data[:SALT_BYTES], data[SALT_BYTES:]
+        try:
+            return json.loads(derive_fernet(self._secret, salt).decrypt(token))
+        except (InvalidToken, ValueError):
+            print(f"Ignoring unreadable Monarch session cache at {self.path}")
+            return None
+
+    def save(self, session: dict) -> None:
+        salt = os.urandom(SALT_BYTES)
+        token = derive_fernet(self._secret, salt).encrypt(json.dumps(session).encode())
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        # The mode given to open only applies to new files, so a temp file
+        # left by a crashed run is restricted explicitly
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "wb") as f:
+            os.fchmod(fd, 0o600)
+            f.write(salt + token)
+        tmp_path.replace(self.path)
+
+    def clear(self) -> None:
+        self.path.unlink(missing_ok=True)
+
+
+class SessionMonarchMoney(MonarchMoney):
+    """
+    MonarchMoney client that reuses a cached session and re-logs in on demand.
+
+    A cached token is reused when a cheap API call confirms it still works;
+    otherwise the client logs in with the stored credentials and caches the
+    new token. Any call that fails with HTTP 401 mid-run triggers one
+    transparent re-login, shared by concurrent callers, and is retried.
+    """
+
+    def __init__(
+        self,
+        email: str,
+        password: str,
+        mfa_secret_key: str,
+        session_store: SessionStore | None = None,
+        timeout: int = 60,
+    ):
+        super().__init__(timeout=timeout)
+        self._credentials = (email, password, mfa_secret_key)
+        self._session_store = session_store
+        self._relogin_task: asyncio.Future | None = None
+
+    async def start_session(self) -> None:
+        """Reuse a valid cached session, or log in and cache a new one."""
+        session = self._session_store.load() if self._session_store else None
+        if session and session.get("token"):
+            self._use_token(session["token"])
+            if await self._session_is_valid():
+                print("Reusing cached Monarch Money session.")
+                return
+            print("Cached Monarch Money session expired; logging in again.")
+        await self.relogin()
+
+    async def relogin(self) -> None:
+        """Log in with the stored credentials and cache the new session."""
+        email, password, mfa_secret_key = self._credentials
+        self._headers.pop("Authorization", None)
+        await self.login(
+            email=email,
+            password=password,
+            save_session=False,
+            use_saved_session=False,
+            mfa_secret_key=mfa_secret_key,
+        )
+        if self._session_store is not None:
+            self._session_store.save({"token": self.token})
+
+    async def gql_call(self, operation: str, graphql_query: Any, variables=None):
+        token = self.token
+        try:
+            return await super().gql_call(operation, graphql_query, variables or {})
+        except TransportServerError as e:
+            if e.code != 401:
+                raise
+            # Only the first caller to see the stale token logs in again
+            if self.token == token:
+                if self._relogin_task is None or self._relogin_task.done():
+                    print("Monarch Money session rejected; logging in again.")
+                    self._relogin_task = asyncio.ensure_future(self.relogin())
+                await self._relogin_task
+            return await super().gql_call(operation, graphql_query, variables or {})
+
+    def _use_token(self, token: str) -> None:
+        self.set_token(token)
+        self._headers["Authorization"] = f"Token {token}"
+
+    async def _session_is_valid(self) -> bool:
+        # Any failure means logging in again, which reports its own errors
+        try:
+            await super().gql_call("GetSessionCheck", _SESSION_CHECK_QUERY)
+        except TransportServerError as e:
+            if e.code not in (401, 403):
+                print(f"Couldn't check cached Monarch Money session: {e}")
+            return False
+        except Exception as e:
+            print(f"Couldn't check cached Monarch Money session: {e}")
+            return False
+        return True
+
+
+def get_session_store(secret: str, path: str | None = None) -> SessionStore | None:
+    """
+    Create the Monarch session store configured by environment variables.
+
+    - MONARCH_SESSION_FILE: encrypted session file
+      (default ~/.cache/zwickfi/monarch_session.enc); set to an empty string
+      to always log in
+    - MONARCH_SESSION_KEY: secret the encryption key is derived from;
+      defaults to the given secret (the Monarch password)
+
+    Args:
+        secret: Fallback secret to derive the encryption key from.
+        path: Session file to use instead of MONARCH_SESSION_FILE; an empty
+            string disables caching.
+
+    Returns:
+        Configured session store, or None if session caching is disabled.
+    """
+    if path is None:
+        path = os.getenv(
+            "MONARCH_SESSION_FILE",
+            str(Path.home() / ".cache" / "zwickfi" / "monarch_session.enc"),
+        )
+    if not path:
+        return None
+    return EncryptedFileSessionStore(path, os.getenv("MONARCH_SESSION_KEY") or secret)
+
+
+def get_monarch_client(
+    email: str | None = None,
+    password: str | None = None,
+    secret_key: str | None = None,
+    session_file: str | None = None,
+) -> MonarchMoney:
     """
     Create and authenticate a Monarch Money client.
 
-    Credentials are read from environment variables:
+    Credentials not passed in are read from environment variables:
     - MONARCH_EMAIL
     - MONARCH_PASSWORD
     - MONARCH_SECRET_KEY
 
-    If environment variables are not set, prompts for input.
+    If environment variables are not set, prompts for input. A session
+    cached by a previous run is reused while it remains valid (see
+    get_session_store), skipping the password and TOTP login.
+
+    Args:
+        email: Monarch Money email.
+        password: Monarch Money password.
+        secret_key: Monarch Money MFA TOTP secret.
+        session_file: Session cache file, overriding MONARCH_SESSION_FILE.
 
     Returns:
         Authenticated MonarchMoney client.
@@ -25,11 +243,9 @@ def get_monarch_client() -> MonarchMoney:
     Raises:
         Exception: If login fails.
     """
-    mm = MonarchMoney(timeout=60)
-
-    monarch_email = os.getenv("MONARCH_EMAIL")
-    monarch_password = os.getenv("MONARCH_PASSWORD")
-    monarch_secret_key = os.getenv("MONARCH_SECRET_KEY")
+    monarch_email = email or os.getenv("MONARCH_EMAIL")
+    monarch_password = password or os.getenv("MONARCH_PASSWORD")
+    monarch_secret_key = secret_key or os.getenv("MONARCH_SECRET_KEY")
 
     if not monarch_email:
         monarch_email = _prompt_required("MONARCH_EMAIL", "Monarch Money email")
@@ -44,16 +260,16 @@ def get_monarch_client() -> MonarchMoney:
             "MONARCH_SECRET_KEY", "Monarch Money secret key"
         )
 
+    mm = SessionMonarchMoney(
+        monarch_email,
+        monarch_password,
+        monarch_secret_key,
+        session_store=get_session_store(monarch_password, session_file),
+        timeout=60,
+    )
+
     try:
-        asyncio.run(
-            mm.login(
-                email=monarch_email,
-                password=monarch_password,
-                save_session=False,
-                use_saved_session=False,
-                mfa_secret_key=monarch_secret_key,
-            )
-        )
+        asyncio.run(mm.start_session())
         print("Successfully logged in to Monarch Money.")
     except Exception as e:
         print(f"Failed to log in to Monarch Money: {e}")
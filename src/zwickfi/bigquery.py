@@ -1,8 +1,33 @@
 """BigQuery operations for loading data."""
 
+import hashlib
+import io
+from datetime import date
+
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from google.api_core.exceptions import NotFound
 from google.cloud import bigquery
 
+from .instrumentation import span
+from .schemas import TABLE_FIELDS, TABLE_VOLATILE_COLUMNS
+from .utils import to_stored_types
+
+# BigQuery schema derived for each table, keyed by table ID, with the Arrow
+# schema it was derived from
+_table_schemas: dict[str, tuple[pa.Schema, list[bigquery.SchemaField]]] = {}
+
+# Table label holding the content fingerprint of the last load
+FINGERPRINT_LABEL = "zwickfi_fingerprint"
+
+# Columns that change on every sync without the data changing, in every
+# table; see TABLE_VOLATILE_COLUMNS for those of particular tables
+VOLATILE_COLUMNS = ("synced_at",)
+
+# Rows buffered by StreamingLoad before each append load job
+DEFAULT_STREAM_ROWS = 10_000
+
 
 def write_to_bigquery(
     df: pd.DataFrame,
@@ -10,9 +35,24 @@ def write_to_bigquery(
     table_name: str,
     client: bigquery.Client,
     project: str = "zwickfi",
+    write_disposition: str = "WRITE_TRUNCATE",
+    time_partitioning: bigquery.TimePartitioning | None = None,
+    skip_unchanged: bool = False,
+    clustering_fields: list[str] | None = None,
+    partition: str | None = None,
+    schema_update_options: list[str] | None = None,
 ) -> None:
     """
-    Write a DataFrame to a BigQuery table, replacing existing data.
+    Write a DataFrame to a BigQuery table, replacing existing data by default.
+
+    The frame is converted to Arrow and uploaded as Parquet with an explicit
+    schema, so BigQuery doesn't re-infer column types on every load. Tables
+    in TABLE_FIELDS have their date and timestamp columns converted back to
+    the strings the warehouse stores.
+
+    With ``skip_unchanged``, a fingerprint of the frame's content is stored
+    in a table label after each load, and the load is skipped when the
+    fingerprint matches the table's label.
 
     Args:
         df: DataFrame to write.
@@ -20,12 +60,699 @@ def write_to_bigquery(
         table_name: Target table name.
         client: Authenticated BigQuery client.
         project: GCP project ID.
+        write_disposition: "WRITE_TRUNCATE" to replace the table, or
+            "WRITE_APPEND" to add rows to it.
+        time_partitioning: Partitioning to create the table with, if any.
+        skip_unchanged: Whether to skip the load if the content is unchanged
+            since the last load; only meaningful with "WRITE_TRUNCATE".
+        clustering_fields: Columns to create the table clustered by, if any.
+        partition: Partition to write to (e.g. "20240131"), so that
+            "WRITE_TRUNCATE" replaces only that partition of an existing
+            partitioned table.
+        schema_update_options: Schema changes the load may make to an
+            existing table, e.g. ALLOW_FIELD_ADDITION; only valid with
+            "WRITE_APPEND" or a partition.
+    """
+    table_id = f"{project}.{schema}.{table_name}"
+    with span("bigquery.load", table=table_id) as load_span:
+        table = _to_arrow(to_stored_types(df, TABLE_FIELDS.get(table_name, {})))
+        fingerprint = None
+        if skip_unchanged:
+            fingerprint = _fingerprint(
+                table, TABLE_VOLATILE_COLUMNS.get(table_name, ())
+            )
+            if _stored_fingerprint(client, table_id) == fingerprint:
+                load_span.attributes["skipped"] = True
+                print(f"{table_id} is unchanged; skipping load")
+                return
+        table_schema = _table_schema(table_id, table.schema)
+
+        parquet_options = bigquery.ParquetOptions()
+        parquet_options.enable_list_inference = True
+        job_config = bigquery.LoadJobConfig(
+            write_disposition=write_disposition,
+            source_format=bigquery.SourceFormat.PARQUET,
+            schema=table_schema,
+            parquet_options=parquet_options,
+            time_partitioning=time_partitioning,
+            clustering_fields=clustering_fields,
+            schema_update_options=schema_update_options,
+        )
+        destination = f"{table_id}${partition}" if partition else table_id
+
+        buffer = io.BytesIO()
+        pq.write_table(table, buffer)
+        load_span.bytes = buffer.tell()
+        buffer.seek(0)
+        job = client.load_table_from_file(buffer, destination, job_config=job_config)
+        job.result()
+        load_span.rows = job.output_rows
+        if fingerprint is not None:
+            _store_fingerprint(client, table_id, fingerprint)
+
+    print(
+        f"Loaded {job.output_rows} rows and {len(table_schema)} columns "
+        f"to {destination}"
+    )
+
+
+def load_table(
+    df: pd.DataFrame,
+    schema: str,
+    table_name: str,
+    client: bigquery.Client,
+    merge_key: str | list[str] | None = None,
+    project: str = "zwickfi",
+    skip_unchanged: bool = False,
+) -> None:
+    """
+    Load a DataFrame to one BigQuery table.
+
+    Args:
+        df: DataFrame to load.
+        schema: BigQuery dataset/schema name.
+        table_name: Target table name.
+        client: Authenticated BigQuery client.
+        merge_key: Key column(s) to upsert on with merge_to_bigquery; if
+            None, the table is replaced with write_to_bigquery.
+        project: GCP project ID.
+        skip_unchanged: Whether a replaced table is only written when its
+            content changed; see write_to_bigquery.
+    """
+    if merge_key is not None:
+        merge_to_bigquery(df, schema, table_name, client, merge_key, project)
+    else:
+        write_to_bigquery(
+            df, schema, table_name, client, project, skip_unchanged=skip_unchanged
+        )
+
+
+def get_max_value(
+    client: bigquery.Client,
+    schema: str,
+    table_name: str,
+    column: str,
+    project: str = "zwickfi",
+):
+    """
+    Get the largest value of a column, for use as a sync watermark.
+
+    Args:
+        client: Authenticated BigQuery client.
+        schema: BigQuery dataset/schema name.
+        table_name: Table to inspect.
+        column: Column to take the maximum of.
+        project: GCP project ID.
+
+    Returns:
+        The maximum value, or None if the table doesn't exist or is empty.
+    """
+    table_id = f"{project}.{schema}.{table_name}"
+    try:
+        client.get_table(table_id)
+    except NotFound:
+        return None
+
+    query = f"SELECT MAX(`{column}`) AS watermark FROM `{table_id}`"
+    rows = client.query(query).result()
+    return next(iter(rows)).watermark
+
+
+def get_max_values_by_key(
+    client: bigquery.Client,
+    schema: str,
+    table_name: str,
+    key: str,
+    column: str,
+    project: str = "zwickfi",
+) -> dict:
+    """
+    Get the largest value of a column for each key, e.g. per-account watermarks.
+
+    Args:
+        client: Authenticated BigQuery client.
+        schema: BigQuery dataset/schema name.
+        table_name: Table to inspect.
+        key: Column to group by.
+        column: Column to take the maximum of.
+        project: GCP project ID.
+
+    Returns:
+        Dict mapping each key to its maximum value; empty if the table
+        doesn't exist.
+    """
+    table_id = f"{project}.{schema}.{table_name}"
+    try:
+        client.get_table(table_id)
+    except NotFound:
+        return {}
+
+    query = (
+        f"SELECT `{key}` AS key, MAX(`{column}`) AS watermark "
+        f"FROM `{table_id}` GROUP BY `{key}`"
+    )
+    return {row.key: row.watermark for row in client.query(query).result()}
+
+
+def merge_to_bigquery(
+    df: pd.DataFrame,
+    schema: str,
+    table_name: str,
+    client: bigquery.Client,
+    key: str | list[str] = "id",
+    project: str = "zwickfi",
+) -> None:
+    """
+    Upsert a DataFrame into a BigQuery table keyed on unique column(s).
+
+    Rows are loaded into a staging table using the target table's column
+    types, then merged into the target: matching keys are updated and new
+    keys inserted. Rows missing from ``df`` are left untouched, so deletions
+    need a periodic full write_to_bigquery pass. If the target table doesn't
+    exist yet, this falls back to write_to_bigquery. Columns are stored as
+    write_to_bigquery stores them.
+
+    Args:
+        df: DataFrame to upsert.
+        schema: BigQuery dataset/schema name.
+        table_name: Target table name.
+        client: Authenticated BigQuery client.
+        key: Column, or list of columns, that uniquely identifies a row.
+        project: GCP project ID.
     """
     table_id = f"{project}.{schema}.{table_name}"
-    job_config = bigquery.LoadJobConfig(write_disposition="WRITE_TRUNCATE")
+    try:
+        target = client.get_table(table_id)
+    except NotFound:
+        write_to_bigquery(df, schema, table_name, client, project=project)
+        return
+
+    if df.empty:
+        print(f"No rows to merge into {table_id}")
+        return
+    df = to_stored_types(df, TABLE_FIELDS.get(table_name, {}))
+
+    # Columns the target doesn't have yet are picked up by the next full load
+    target_fields = {field.name: field for field in target.schema}
+    new_columns = [column for column in df.columns if column not in target_fields]
+    if new_columns:
+        print(f"Skipping columns not yet in {table_id}: {', '.join(new_columns)}")
+    columns = [column for column in df.columns if column in target_fields]
+
+    with span("bigquery.merge", table=table_id) as merge_span:
+        merge_span.rows = len(df)
+        staging_id = _load_staging(df[columns], table_id, target_fields, client)
+        try:
+            merge_job = client.query(
+                _merge_statement(table_id, staging_id, columns, key)
+            )
+            merge_job.result()
+        finally:
+            client.delete_table(staging_id, not_found_ok=True)
+
+    print(
+        f"Merged {len(df)} rows into {table_id} "
+        f"({merge_job.num_dml_affected_rows} rows affected)"
+    )
+
+
+def replace_month_window(
+    df: pd.DataFrame,
+    schema: str,
+    table_name: str,
+    client: bigquery.Client,
+    start_date: str,
+    end_date: str,
+    project: str = "zwickfi",
+) -> None:
+    """
+    Replace the rows of a monthly table whose month falls in a date window.
+
+    Rows are loaded into a staging table, then a single MERGE inserts them
+    and deletes the target's existing rows for months in the window, so
+    months outside it are kept and readers never see a half-replaced window.
+    If the target table doesn't exist yet, it's created partitioned by month.
+
+    Args:
+        df: Rows for every month in the window, with a date "month" column.
+        schema: BigQuery dataset/schema name.
+        table_name: Target table name.
+        client: Authenticated BigQuery client.
+        start_date: First day of the window as "yyyy-mm-dd".
+        end_date: Last day of the window as "yyyy-mm-dd".
+        project: GCP project ID.
+    """
+    table_id = f"{project}.{schema}.{table_name}"
+    try:
+        target = client.get_table(table_id)
+    except NotFound:
+        if df.empty:
+            print(f"No rows to create {table_id} with")
+            return
+        partitioning = bigquery.TimePartitioning(
+            type_=bigquery.TimePartitioningType.MONTH, field="month"
+        )
+        write_to_bigquery(
+            df, schema, table_name, client, project, time_partitioning=partitioning
+        )
+        return
+
+    target_fields = {field.name: field for field in target.schema}
+    columns = [column for column in df.columns if column in target_fields]
+
+    with span("bigquery.merge", table=table_id) as merge_span:
+        merge_span.rows = len(df)
+        staging_id = _load_staging(df[columns], table_id, target_fields, client)
+        job_config = bigquery.QueryJobConfig(
+            query_parameters=[
+                bigquery.ScalarQueryParameter("start_date", "DATE", start_date),
+                bigquery.ScalarQueryParameter("end_date", "DATE", end_date),
+            ]
+        )
+        try:
+            merge_job = client.query(
+                _window_statement(table_id, staging_id, columns),
+                job_config=job_config,
+            )
+            merge_job.result()
+        finally:
+            client.delete_table(staging_id, not_found_ok=True)
+
+    print(
+        f"Replaced {start_date} to {end_date} in {table_id} with {len(df)} rows "
+        f"({merge_job.num_dml_affected_rows} rows affected)"
+    )
+
+
+def replace_partition(
+    df: pd.DataFrame,
+    schema: str,
+    table_name: str,
+    client: bigquery.Client,
+    partition_date: date,
+    field: str,
+    clustering_fields: list[str] | None = None,
+    expiration_days: int | None = None,
+    project: str = "zwickfi",
+) -> None:
+    """
+    Replace one day's partition of a day-partitioned table.
+
+    The frame's ``field`` column must hold partition_date in every row.
+    Other days' partitions are left as they are. If the table doesn't exist
+    yet, it's created partitioned by ``field`` and clustered by
+    ``clustering_fields``. The load may add columns to the table and relax
+    required ones, but the frame's existing columns must keep their types.
+
+    Args:
+        df: Rows of the partition.
+        schema: BigQuery dataset/schema name.
+        table_name: Target table name.
+        client: Authenticated BigQuery client.
+        partition_date: Day whose partition is replaced.
+        field: DATE column the table is partitioned by.
+        clustering_fields: Columns the table is clustered by.
+        expiration_days: Days partitions are kept; None keeps them forever.
+            Applied to the existing table when it differs.
+        project: GCP project ID.
+    """
+    table_id = f"{project}.{schema}.{table_name}"
+    partitioning = bigquery.TimePartitioning(
+        type_=bigquery.TimePartitioningType.DAY,
+        field=field,
+        expiration_ms=expiration_days * 24 * 3600 * 1000 if expiration_days else None,
+    )
+    try:
+        target = client.get_table(table_id)
+    except NotFound:
+        write_to_bigquery(
+            df,
+            schema,
+            table_name,
+            client,
+            project,
+            time_partitioning=partitioning,
+            clustering_fields=clustering_fields,
+        )
+        return
+
+    current = target.time_partitioning
+    if current is not None and current.expiration_ms != partitioning.expiration_ms:
+        current.expiration_ms = partitioning.expiration_ms
+        target.time_partitioning = current
+        client.update_table(target, ["time_partitioning"])
+
+    write_to_bigquery(
+        df,
+        schema,
+        table_name,
+        client,
+        project,
+        partition=f"{partition_date:%Y%m%d}",
+        schema_update_options=[
+            bigquery.SchemaUpdateOption.ALLOW_FIELD_ADDITION,
+            bigquery.SchemaUpdateOption.ALLOW_FIELD_RELAXATION,
+        ],
+    )
+
+
+class StreamingLoad:
+    """
+    Load a table from a stream of DataFrame chunks in bounded memory.
+
+    Each appended chunk (e.g. one API page) is converted to Arrow right
+    away, and buffered chunks are appended to a staging table every
+    ``rows_per_load`` rows, so at most one buffer of rows is held at a time.
+    :meth:`finish` then replaces the target with the staging table (a copy
+    job) or, given a merge key, merges into it.
+
+    Chunks may differ in columns. The staging schema only grows: columns
+    seen in earlier chunks are null-filled in later ones, and columns with
+    no values yet (all null, or only empty lists) are held back until a
+    chunk gives them a type. Columns are stored as write_to_bigquery stores
+    them.
+    """
+
+    def __init__(
+        self,
+        schema: str,
+        table_name: str,
+        client: bigquery.Client,
+        merge_key: str | list[str] | None = None,
+        project: str = "zwickfi",
+        rows_per_load: int = DEFAULT_STREAM_ROWS,
+    ):
+        self.table_id = f"{project}.{schema}.{table_name}"
+        self.staging_id = f"{self.table_id}__stream"
+        self.client = client
+        self.merge_key = merge_key
+        self.fields = TABLE_FIELDS.get(table_name, {})
+        self.rows_per_load = rows_per_load
+        self.rows = 0
+        self._buffer: list[pa.Table] = []
+        self._buffered_rows = 0
+        self._schema: pa.Schema | None = None
+
+    def append(self, df: pd.DataFrame) -> None:
+        """Add a chunk of rows, loading the buffer once it's full."""
+        if df.empty:
+            return
+        df = to_stored_types(df, self.fields)
+        self._buffer.append(
+            _decode_dictionaries(pa.Table.from_pandas(df, preserve_index=False))
+        )
+        self._buffered_rows += len(df)
+        if self._buffered_rows >= self.rows_per_load:
+            self._flush()
+
+    def finish(self) -> None:
+        """Load any buffered rows, then publish the staging table to the target."""
+        if self._buffer:
+            self._flush()
+        if self._schema is None:
+            print(f"No rows streamed to {self.table_id}")
+            return
+
+        try:
+            with span("bigquery.publish", table=self.table_id) as publish_span:
+                publish_span.rows = self.rows
+                self._publish()
+        finally:
+            self.client.delete_table(self.staging_id, not_found_ok=True)
+
+    def _flush(self) -> None:
+        """Append the buffered chunks to the staging table as one load job."""
+        table = pa.concat_tables(self._buffer, promote_options="permissive")
+        self._buffer, self._buffered_rows = [], 0
+
+        first_load = self._schema is None
+        table = self._conform(table)
+        parquet_options = bigquery.ParquetOptions()
+        parquet_options.enable_list_inference = True
+        job_config = bigquery.LoadJobConfig(
+            source_format=bigquery.SourceFormat.PARQUET,
+            schema=[_schema_field(field) for field in table.schema],
+            parquet_options=parquet_options,
+        )
+        if first_load:
+            # Replaces any staging table left behind by a failed run
+            job_config.write_disposition = "WRITE_TRUNCATE"
+        else:
+            job_config.write_disposition = "WRITE_APPEND"
+            job_config.schema_update_options = [
+                bigquery.SchemaUpdateOption.ALLOW_FIELD_ADDITION
+            ]
+
+        with span("bigquery.stream_load", table=self.table_id) as load_span:
+            buffer = io.BytesIO()
+            pq.write_table(table, buffer)
+            load_span.bytes = buffer.tell()
+            buffer.seek(0)
+            job = self.client.load_table_from_file(
+                buffer, self.staging_id, job_config=job_config
+            )
+            job.result()
+            load_span.rows = job.output_rows
+        self.rows += table.num_rows
+
+    def _conform(self, table: pa.Table) -> pa.Table:
+        """Cast a chunk to the grown staging schema, null-filling missing columns."""
+        schema = table.schema
+        if self._schema is not None:
+            schema = pa.unify_schemas(
+                [self._schema, schema], promote_options="permissive"
+            )
+        schema = pa.schema(
+            [
+                field.with_type(_without_null_types(field.type))
+                for field in schema
+                if not _is_untyped(field.type)
+            ]
+        )
+        self._schema = schema
+        return pa.table(
+            [
+                table.column(field.name).cast(field.type)
+                if field.name in table.column_names
+                else pa.nulls(table.num_rows, field.type)
+                for field in schema
+            ],
+            schema=schema,
+        )
+
+    def _publish(self) -> None:
+        """Replace or merge into the target from the staging table."""
+        try:
+            target = self.client.get_table(self.table_id)
+        except NotFound:
+            target = None
+
+        if self.merge_key is None or target is None:
+            job_config = bigquery.CopyJobConfig(write_disposition="WRITE_TRUNCATE")
+            self.client.copy_table(
+                self.staging_id, self.table_id, job_config=job_config
+            ).result()
+            print(f"Loaded {self.rows} streamed rows to {self.table_id}")
+            return
+
+        target_fields = {field.name for field in target.schema}
+        columns = [name for name in self._schema.names if name in target_fields]
+        merge_job = self.client.query(
+            _merge_statement(self.table_id, self.staging_id, columns, self.merge_key)
+        )
+        merge_job.result()
+        print(
+            f"Merged {self.rows} streamed rows into {self.table_id} "
+            f"({merge_job.num_dml_affected_rows} rows affected)"
+        )
+
+
+def _is_untyped(arrow_type: pa.DataType) -> bool:
+    """Whether a column has no values to type it by: all null or empty lists."""
+    if pa.types.is_list(arrow_type) or pa.types.is_large_list(arrow_type):
+        arrow_type = arrow_type.value_type
+    return pa.types.is_null(arrow_type)
+
+
+def _load_staging(
+    df: pd.DataFrame,
+    table_id: str,
+    target_fields: dict[str, bigquery.SchemaField],
+    client: bigquery.Client,
+) -> str:
+    """Load rows into the target's staging table with the target's types."""
+    staging_id = f"{table_id}__staging"
+    job_config = bigquery.LoadJobConfig(
+        write_disposition="WRITE_TRUNCATE",
+        schema=[target_fields[column] for column in df.columns],
+    )
+    client.load_table_from_dataframe(df, staging_id, job_config=job_config).result()
+    return staging_id
+
+
+def _merge_statement(
+    table_id: str, staging_id: str, columns: list[str], key: str | list[str]
+) -> str:
+    """Build a MERGE that upserts staging rows into the target on key."""
+    keys = [key] if isinstance(key, str) else key
+    condition = " AND ".join(f"T.`{k}` = S.`{k}`" for k in keys)
+    updates = ", ".join(f"`{c}` = S.`{c}`" for c in columns if c not in keys)
+    column_list = ", ".join(f"`{c}`" for c in columns)
+    values = ", ".join(f"S.`{c}`" for c in columns)
+    return (
+        f"MERGE `{table_id}` T USING `{staging_id}` S ON {condition} "
+        f"WHEN MATCHED THEN UPDATE SET {updates} "
+        f"WHEN NOT MATCHED THEN INSERT ({column_list}) VALUES ({values})"
+    )
+
+
+def _window_statement(table_id: str, staging_id: str, columns: list[str]) -> str:
+    """Build a MERGE that swaps the target's month window for staging rows."""
+    column_list = ", ".join(f"`{c}`" for c in columns)
+    values = ", ".join(f"S.`{c}`" for c in columns)
+    return (
+        f"MERGE `{table_id}` T USING `{staging_id}` S ON FALSE "
+        f"WHEN NOT MATCHED THEN INSERT ({column_list}) VALUES ({values}) "
+        "WHEN NOT MATCHED BY SOURCE "
+        "AND T.`month` BETWEEN @start_date AND @end_date THEN DELETE"
+    )
+
+
+def _fingerprint(table: pa.Table, volatile: tuple[str, ...] = ()) -> str:
+    """
+    Hash a table's content and schema, ignoring volatile columns and row order.
+
+    VOLATILE_COLUMNS and the given table-specific volatile columns are
+    dropped, rows are sorted by ``id`` when there is one, and the table is
+    hashed as an Arrow IPC stream without schema metadata. The digest fits
+    in a BigQuery label value.
+    """
+    table = table.drop_columns(
+        [name for name in (*VOLATILE_COLUMNS, *volatile) if name in table.column_names]
+    )
+    if "id" in table.column_names:
+        table = table.sort_by("id")
+    table = table.replace_schema_metadata(None)
+
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return hashlib.blake2b(sink.getvalue(), digest_size=16).hexdigest()
+
+
+def _stored_fingerprint(client: bigquery.Client, table_id: str) -> str | None:
+    """Get the fingerprint label of a table, or None if it has none."""
+    try:
+        table = client.get_table(table_id)
+    except NotFound:
+        return None
+    return (table.labels or {}).get(FINGERPRINT_LABEL)
+
+
+def _store_fingerprint(
+    client: bigquery.Client, table_id: str, fingerprint: str
+) -> None:
+    """Label a table with the fingerprint of the content just loaded."""
+    try:
+        table = client.get_table(table_id)
+        table.labels = {**(table.labels or {}), FINGERPRINT_LABEL: fingerprint}
+        client.update_table(table, ["labels"])
+    except Exception as e:
+        # The load itself succeeded; the next run just loads again
+        print(f"Failed to record fingerprint of {table_id}: {e}")
+
+
+def _to_arrow(df: pd.DataFrame) -> pa.Table:
+    """Convert a DataFrame to Arrow, typing all-null columns as strings."""
+    table = _decode_dictionaries(pa.Table.from_pandas(df, preserve_index=False))
+    schema = pa.schema(
+        [field.with_type(_without_null_types(field.type)) for field in table.schema]
+    )
+    return table.cast(schema) if schema != table.schema else table
+
+
+def _decode_dictionaries(table: pa.Table) -> pa.Table:
+    """
+    Convert dictionary (categorical) columns back to their value type.
+
+    Parquet dictionary-encodes repeated values by itself, and plain columns
+    keep schemas comparable across chunks whose dictionaries differ.
+    """
+    schema = pa.schema(
+        [
+            field.with_type(field.type.value_type)
+            if pa.types.is_dictionary(field.type)
+            else field
+            for field in table.schema
+        ],
+        metadata=table.schema.metadata,
+    )
+    return table.cast(schema) if schema != table.schema else table
+
+
+def _without_null_types(arrow_type: pa.DataType) -> pa.DataType:
+    """Replace Arrow's null type, which BigQuery can't load, with string."""
+    if pa.types.is_null(arrow_type):
+        return pa.string()
+    if pa.types.is_struct(arrow_type):
+        return pa.struct(
+            [
+                arrow_type.field(i).with_type(
+                    _without_null_types(arrow_type.field(i).type)
+                )
+                for i in range(arrow_type.num_fields)
+            ]
+        )
+    if pa.types.is_list(arrow_type) or pa.types.is_large_list(arrow_type):
+        return pa.list_(_without_null_types(arrow_type.value_type))
+    return arrow_type
+
+
+def _table_schema(table_id: str, arrow_schema: pa.Schema) -> list[bigquery.SchemaField]:
+    """Get the BigQuery schema for a table, reusing it while columns are unchanged."""
+    cached = _table_schemas.get(table_id)
+    if cached is not None and cached[0].equals(arrow_schema):
+        return cached[1]
+
+    table_schema = [_schema_field(field) for field in arrow_schema]
+    _table_schemas[table_id] = (arrow_schema, table_schema)
+    return table_schema
+
+
+def _schema_field(field: pa.Field) -> bigquery.SchemaField:
+    """Map an Arrow field to the equivalent BigQuery schema field."""
+    arrow_type = field.type
+    mode = "NULLABLE"
+    if pa.types.is_list(arrow_type) or pa.types.is_large_list(arrow_type):
+        mode = "REPEATED"
+        arrow_type = arrow_type.value_type
+
+    if pa.types.is_struct(arrow_type):
+        subfields = [
+            _schema_field(arrow_type.field(i)) for i in range(arrow_type.num_fields)
+        ]
+        return bigquery.SchemaField(field.name, "RECORD", mode=mode, fields=subfields)
+    return bigquery.SchemaField(field.name, _bigquery_type(arrow_type), mode=mode)
 
-    job = client.load_table_from_dataframe(df, table_id, job_config=job_config)
-    job.result()
 
-    table = client.get_table(table_id)
-    print(f"Loaded {table.num_rows} rows and {len(table.schema)} columns to {table_id}")
+def _bigquery_type(arrow_type: pa.DataType) -> str:
+    """Map a scalar Arrow type to a BigQuery column type."""
+    if pa.types.is_dictionary(arrow_type):
+        arrow_type = arrow_type.value_type
+    if pa.types.is_boolean(arrow_type):
+        return "BOOLEAN"
+    if pa.types.is_integer(arrow_type):
+        return "INTEGER"
+    if pa.types.is_floating(arrow_type):
+        return "FLOAT"
+    if pa.types.is_decimal(arrow_type):
+        return "NUMERIC"
+    if pa.types.is_timestamp(arrow_type):
+        return "TIMESTAMP" if arrow_type.tz is not None else "DATETIME"
+    if pa.types.is_date(arrow_type):
+        return "DATE"
+    if pa.types.is_time(arrow_type):
+        return "TIME"
+    if pa.types.is_binary(arrow_type) or pa.types.is_large_binary(arrow_type):
+        return "BYTES"
+    return "STRING"
@@ -0,0 +1,150 @@
+"""Normalized budget fact tables built from the Monarch budgets response.
+
+The budgets endpoint returns one deeply nested document. These functions
+turn it into flat, typed tables keyed by month, so a sync can replace only
+the months it fetched:
+
+- budget_category_months: one row per category and month
+- budget_group_months: one row per category group and month
+- budget_goal_months: planned and actual goal contributions per month
+- budget_goals: one row per goal, without monthly amounts
+"""
+
+from datetime import date
+
+import pandas as pd
+
+from .schemas import (
+    BUDGET_MONTH_FIELDS,
+    CATEGORY_FIELDS,
+    GOAL_CONTRIBUTION_SUMMARY_FIELDS,
+    GOAL_FIELDS,
+    GOAL_PLANNED_CONTRIBUTION_FIELDS,
+)
+from .utils import flatten_records
+
+# Fact tables keyed by month, whose synced month window is replaced each run
+BUDGET_FACT_TABLES = (
+    "budget_category_months",
+    "budget_group_months",
+    "budget_goal_months",
+)
+
+
+def month_window(today: date, months_back: int, months_ahead: int) -> tuple[str, str]:
+    """
+    Get the dates bounding a range of whole months around today.
+
+    Args:
+        today: Reference date.
+        months_back: Whole months before today's month to include.
+        months_ahead: Whole months after today's month to include.
+
+    Returns:
+        ("yyyy-mm-dd", "yyyy-mm-dd") first day of the first month and last
+        day of the last month.
+    """
+    this_month = pd.Timestamp(today).to_period("M")
+    start = (this_month - months_back).start_time.date()
+    end = (this_month + months_ahead).end_time.date()
+    return start.isoformat(), end.isoformat()
+
+
+def budget_fact_tables(budgets: dict) -> dict[str, pd.DataFrame]:
+    """
+    Build normalized budget tables from a get_budgets response.
+
+    Each nested monthly list is gathered into one flat record list and
+    flattened column-wise with its declared field spec, tagged with the ID
+    of the category, group or goal it came from.
+
+    Args:
+        budgets: Response from MonarchMoney.get_budgets.
+
+    Returns:
+        Dict mapping table names (BUDGET_FACT_TABLES plus budget_goals) to
+        DataFrames. Month columns hold dates.
+    """
+    budget_data = budgets.get("budgetData") or {}
+    goals = budgets.get("goalsV2") or []
+
+    category_months = _monthly_rows(
+        budget_data.get("monthlyAmountsByCategory") or [],
+        "monthlyAmounts",
+        lambda entry: entry["category"]["id"],
+        ("categoryId", CATEGORY_FIELDS["id"]),
+        BUDGET_MONTH_FIELDS,
+    )
+    group_months = _monthly_rows(
+        budget_data.get("monthlyAmountsByCategoryGroup") or [],
+        "monthlyAmounts",
+        lambda entry: entry["categoryGroup"]["id"],
+        ("categoryGroupId", CATEGORY_FIELDS["group"]["id"]),
+        BUDGET_MONTH_FIELDS,
+    )
+
+    planned = _monthly_rows(
+        goals,
+        "plannedContributions",
+        lambda goal: goal["id"],
+        ("goalId", GOAL_FIELDS["id"]),
+        GOAL_PLANNED_CONTRIBUTION_FIELDS,
+    )
+    contributed = _monthly_rows(
+        goals,
+        "monthlyContributionSummaries",
+        lambda goal: goal["id"],
+        ("goalId", GOAL_FIELDS["id"]),
+        GOAL_CONTRIBUTION_SUMMARY_FIELDS,
+    )
+    goal_months = pd.merge(
+        planned[["goalId", "month", "amount"]].rename(
+            columns={"amount": "plannedAmount"}
+        ),
+        contributed[["goalId", "month", "sum"]].rename(
+            columns={"sum": "contributedAmount"}
+        ),
+        on=["goalId", "month"],
+        how="outer",
+    )
+
+    goal_table = flatten_records(goals, GOAL_FIELDS)
+    goal_table = goal_table[[name for name in GOAL_FIELDS if name != "__typename"]]
+
+    return {
+        "budget_category_months": category_months,
+        "budget_group_months": group_months,
+        "budget_goal_months": goal_months,
+        "budget_goals": goal_table,
+    }
+
+
+def _monthly_rows(
+    entries: list[dict],
+    list_field: str,
+    parent_id,
+    id_field: tuple[str, str],
+    fields: dict,
+) -> pd.DataFrame:
+    """
+    Flatten every entry's monthly list into one table tagged with parent IDs.
+
+    ``id_field`` names the parent ID column and gives the type the parent's
+    own field spec declares for its ID. Only declared fields are kept;
+    __typename is dropped and months are parsed into dates.
+    """
+    id_column, id_kind = id_field
+    records = [row for entry in entries for row in entry.get(list_field) or []]
+    parent_ids = [
+        {id_column: parent_id(entry)}
+        for entry in entries
+        for _ in entry.get(list_field) or []
+    ]
+
+    df = flatten_records(records, fields)
+    columns = [name for name in fields if name not in ("__typename", "month")]
+    df = df.reindex(columns=["month", *columns])
+    ids = flatten_records(parent_ids, {id_column: id_kind})
+    df.insert(0, id_column, ids[id_column])
+    df["month"] = pd.to_datetime(df["month"]).dt.date
+    return df
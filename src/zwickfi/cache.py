@@ -0,0 +1,109 @@
+"""Local caching of computed artifacts between runs."""
+
+import os
+import time
+from pathlib import Path
+from typing import Protocol
+
+
+class Cache(Protocol):
+    """Storage backend for cached artifacts, keyed by string."""
+
+    def get(self, key: str) -> bytes | None:
+        """Return the stored bytes for key, or None on a miss."""
+        ...
+
+    def put(self, key: str, data: bytes) -> None:
+        """Store bytes under key, replacing any existing entry."""
+        ...
+
+
+class LocalDiskCache:
+    """
+    Cache backed by files in a local directory.
+
+    Entries unused for longer than ``max_age_seconds`` are evicted, and when
+    the directory grows past ``max_bytes`` the least recently used entries
+    are removed until it fits. Reading an entry counts as using it.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path,
+        max_bytes: int = 256 * 1024 * 1024,
+        max_age_seconds: float = 30 * 24 * 3600,
+    ):
+        self.directory = Path(directory).expanduser()
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.bin"
+
+    def get(self, key: str) -> bytes | None:
+        path = self._path(key)
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            return None
+        if time.time() - path.stat().st_mtime > self.max_age_seconds:
+            path.unlink(missing_ok=True)
+            return None
+        os.utime(path)
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        path = self._path(key)
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_bytes(data)
+        tmp_path.replace(path)
+        self.evict()
+
+    def evict(self) -> None:
+        """Remove expired entries, then the oldest ones while over max_bytes."""
+        now = time.time()
+        entries = []
+        for path in self.directory.glob("*.bin"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            if now - stat.st_mtime > self.max_age_seconds:
+                path.unlink(missing_ok=True)
+            else:
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+
+def get_forecast_cache() -> LocalDiskCache | None:
+    """
+    Create the forecast cache configured by environment variables.
+
+    - FORECAST_CACHE_DIR: cache directory (default ~/.cache/zwickfi/forecasts);
+      set to an empty string to disable caching
+    - FORECAST_CACHE_MAX_MB: size limit in megabytes (default 256)
+    - FORECAST_CACHE_MAX_AGE_DAYS: evict entries unused this long (default 30)
+
+    Returns:
+        Configured cache, or None if caching is disabled.
+    """
+    directory = os.getenv(
+        "FORECAST_CACHE_DIR", str(Path.home() / ".cache" / "zwickfi" / "forecasts")
+    )
+    if not directory:
+        return None
+
+    max_mb = float(os.getenv("FORECAST_CACHE_MAX_MB", "256"))
+    max_age_days = float(os.getenv("FORECAST_CACHE_MAX_AGE_DAYS", "30"))
+    return LocalDiskCache(
+        directory,
+        max_bytes=int(max_mb * 1024 * 1024),
+        max_age_seconds=max_age_days * 24 * 3600,
+    )
@@ -1,71 +1,808 @@
-"""Main CLI entry point for zwickfi-monarch data sync."""
+"""Main CLI entry point for zwickfi-monarch data sync.
 
-from datetime import date
+Heavy dependencies (pandas, the Google Cloud and Monarch clients, Prophet)
+are imported inside the stages that use them, so a run only pays for the
+stages it selects and ``--help`` returns immediately.
+"""
 
-import pandas as pd
+import argparse
+import asyncio
+import os
+from datetime import UTC, date, datetime, timedelta
+from typing import TYPE_CHECKING
 
-from . import bigquery, forecasts, monarch
-from .auth import get_bigquery_client, get_monarch_client
+from . import instrumentation
+from .instrumentation import span
+from .scheduler import Stage, StageResults, run_stages
+from .schemas import DIMENSION_TABLES, MONARCH_TABLES, TRANSACTION_FIELDS
 
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
 
-def main() -> None:
+    from monarchmoney import MonarchMoney
+
+    from .spool import CheckpointSpool
+    from .syncstate import SyncState
+
+# Forecasts of every run, partitioned by run_date and clustered by card
+FORECAST_TABLE = "credit_card_forecasts"
+
+# forecasts.FORECAST_ENGINES, listed here so parsing arguments doesn't
+# import the forecasting stack
+FORECAST_ENGINES = ("prophet", "linear")
+
+
+def main(argv: list[str] | None = None) -> None:
+    """
+    Run the zwickfi command line.
+
+    - ``zwickfi`` or ``zwickfi sync``: extract, forecast and load everything
+    - ``zwickfi extract [TABLE ...]``: extract and load some or all
+      monarch_money tables, without forecasting
+    - ``zwickfi forecast``: generate and load forecasts only
+    - ``zwickfi serve``: run a sync per HTTP request (see zwickfi.server)
+    - ``zwickfi batch CONFIG``: sync every household listed in a config
+      file (see zwickfi.households)
+
+    ``--no-load`` on sync, extract and forecast skips the BigQuery load.
+    ``--resume RUN_ID`` on sync and extract reruns a failed run, reading the
+    pages it already fetched from its checkpoint spool. Full runs skip
+    entities that are still fresh (see zwickfi.syncstate); ``--force`` on
+    sync, extract and batch syncs them anyway. ``--engine`` on sync and
+    forecast picks the forecast engine, overriding FORECAST_ENGINE.
+
+    Args:
+        argv: Command-line arguments; defaults to sys.argv.
+    """
+    parser = argparse.ArgumentParser(
+        prog="zwickfi", description="Sync Monarch Money data to BigQuery."
+    )
+    parser.set_defaults(
+        command="sync",
+        tables=None,
+        forecast=True,
+        load=True,
+        resume=None,
+        force=False,
+        engine=None,
+    )
+    commands = parser.add_subparsers(dest="command")
+
+    no_load = argparse.ArgumentParser(add_help=False)
+    no_load.add_argument(
+        "--no-load",
+        dest="load",
+        action="store_false",
+        help="skip loading results to BigQuery",
+    )
+
+    force = argparse.ArgumentParser(add_help=False)
+    force.add_argument(
+        "--force",
+        action="store_true",
+        help="sync every entity, even those synced recently enough to be fresh",
+    )
+
+    resume = argparse.ArgumentParser(add_help=False)
+    resume.add_argument(
+        "--resume",
+        metavar="RUN_ID",
+        help="resume a failed run, reusing the pages it checkpointed",
+    )
+
+    engine = argparse.ArgumentParser(add_help=False)
+    engine.add_argument(
+        "--engine",
+        choices=FORECAST_ENGINES,
+        help="forecast engine (default: $FORECAST_ENGINE or prophet)",
+    )
+
+    commands.add_parser(
+        "sync",
+        parents=[no_load, resume, force, engine],
+        help="run every stage (default)",
+    )
+    extract = commands.add_parser(
+        "extract",
+        parents=[no_load, resume, force],
+        help="extract monarch_money tables",
+    )
+    extract.add_argument(
+        "tables",
+        nargs="*",
+        metavar="TABLE",
+        help=f"tables to extract (default: all); any of {', '.join(MONARCH_TABLES)}",
+    )
+    extract.set_defaults(forecast=False)
+    forecast = commands.add_parser(
+        "forecast", parents=[no_load, engine], help="generate credit card forecasts"
+    )
+    forecast.set_defaults(tables=[])
+    serve = commands.add_parser("serve", help="serve syncs over HTTP")
+    serve.add_argument(
+        "--port",
+        type=int,
+        default=int(os.getenv("PORT", "8080")),
+        help="port to listen on (default: $PORT or 8080)",
+    )
+    batch = commands.add_parser(
+        "batch", parents=[no_load, force], help="sync several households"
+    )
+    batch.add_argument("config", help="TOML file listing the households")
+    batch.add_argument(
+        "--max-concurrent",
+        type=int,
+        default=2,
+        help="households synced at once (default: 2)",
+    )
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        from .server import serve
+
+        serve(port=args.port)
+        return
+
+    if args.command == "batch":
+        _batch(args.config, args.max_concurrent, args.load, args.force)
+        return
+
+    tables = args.tables
+    if args.command == "extract":
+        unknown = [table for table in tables if table not in MONARCH_TABLES]
+        if unknown:
+            extract.error(f"unknown tables: {', '.join(unknown)}")
+        # Listing no tables extracts all of them
+        tables = tables or None
+    sync(
+        resume=args.resume,
+        tables=tables,
+        forecast=args.forecast,
+        load=args.load,
+        force=args.force,
+        engine=args.engine,
+    )
+
+
+def _batch(config: str, max_concurrent: int, load: bool, force: bool) -> None:
+    """Sync the households in config, exiting non-zero if any of them failed."""
+    import json
+
+    from .households import load_households, sync_households
+
+    summaries = sync_households(
+        load_households(config),
+        max_concurrent=max_concurrent,
+        load=load,
+        force=force,
+    )
+    print(json.dumps(summaries, indent=2, default=str))
+    if any(summary["status"] != "ok" for summary in summaries.values()):
+        raise SystemExit(1)
+
+
+def sync(
+    bq_client=None,
+    mm: "MonarchMoney | None" = None,
+    run_id: str | None = None,
+    tables: list[str] | None = None,
+    forecast: bool = True,
+    load: bool = True,
+    dataset: str = "monarch_money",
+    project: str = "zwickfi",
+    load_executor: "Executor | None" = None,
+    force: bool = False,
+    resume: str | None = None,
+    engine: str | None = None,
+) -> dict | None:
     """
-    Run the full data sync pipeline.
+    Run the data sync pipeline, or a chosen subset of its stages.
 
-    1. Authenticate with Google Cloud and Monarch Money
+    1. Authenticate with Google Cloud and, when extracting, Monarch Money
     2. Extract data from Monarch Money API
     3. Generate credit card spending forecasts
     4. Load all data to BigQuery
+
+    Steps 2-4 run as a dependency graph (see _sync), so they overlap.
+
+    Each stage is timed as an instrumentation span. The spans are logged as
+    JSON lines when the run ends and, if RUN_LOG_TABLE is set, appended to
+    that BigQuery table.
+
+    Transaction pages and account histories are checkpointed to a local
+    spool keyed by run ID (see zwickfi.spool) as they arrive. If the run
+    fails, passing its ID as resume skips the checkpointed requests; the
+    resumed run gets its own run ID, and its log records the run it resumed.
+    The spool is removed once a run succeeds.
+
+    When every table is selected (tables is None) and the results are
+    loaded, entities synced within their freshness policy are skipped (see
+    zwickfi.syncstate), and each entity's successful sync is recorded.
+
+    Args:
+        bq_client: Authenticated BigQuery client to reuse; authenticates a
+            new one if omitted.
+        mm: Authenticated MonarchMoney client to reuse; logs in if omitted
+            and any tables are extracted.
+        run_id: ID for this run's log and checkpoints; generated if omitted.
+        tables: monarch_money tables to extract; None extracts all of them
+            and an empty list skips extraction.
+        forecast: Whether to generate forecasts.
+        load: Whether to load the results to BigQuery.
+        dataset: BigQuery dataset the Monarch tables are loaded to.
+        project: GCP project of that dataset.
+        load_executor: Executor to run the load stages in, so concurrent
+            syncs can share one pool of load jobs; defaults to the event
+            loop's own.
+        force: Whether to sync every selected entity, even fresh ones.
+        resume: ID of a failed run whose checkpointed requests to reuse.
+        engine: Forecast engine, one of FORECAST_ENGINES; defaults to
+            FORECAST_ENGINE, or "prophet".
+
+    Returns:
+        JSON-serializable run summary with the rows produced per table and
+        the time spent in each stage, or None if Google Cloud
+        authentication failed.
+
+    Raises:
+        ExceptionGroup: If any stage failed, once the others have finished.
     """
-    # Authenticate
+    full_run = tables is None
+    tables = list(MONARCH_TABLES) if tables is None else tables
+    run = instrumentation.start_run(run_id, resumed_from=resume)
     try:
-        bq_client = get_bigquery_client()
-    except Exception as e:
-        print(f"Failed to authenticate with Google Cloud: {e}")
-        return
+        # Authenticate
+        if bq_client is None:
+            try:
+                with span("auth.bigquery"):
+                    from .auth import get_bigquery_client
+
+                    bq_client = get_bigquery_client()
+            except Exception as e:
+                print(f"Failed to authenticate with Google Cloud: {e}")
+                return None
+
+        sync_state = None
+        fresh = []
+        if load:
+            from .syncstate import get_sync_state
+
+            sync_state = get_sync_state(bq_client, dataset, project)
+        if sync_state is not None and full_run and not force:
+            with span("syncstate.read"):
+                tables, forecast, fresh = _stale_only(
+                    sync_state, tables, forecast, run.started_at
+                )
+            if fresh:
+                print(f"Skipping fresh entities: {', '.join(fresh)}")
+
+        if mm is None and tables:
+            with span("auth.monarch"):
+                from .auth import get_monarch_client
+
+                mm = get_monarch_client()
+            print("Logged into Monarch.")
+
+        spool = None
+        if tables:
+            from .spool import get_checkpoint_spool
+
+            spool = get_checkpoint_spool(resume or run.run_id)
+        try:
+            rows = _sync(
+                bq_client,
+                mm,
+                tables,
+                forecast,
+                load,
+                spool,
+                dataset=dataset,
+                project=project,
+                load_executor=load_executor,
+                sync_state=sync_state,
+                synced_at=run.started_at,
+                engine=engine,
+            )
+        except Exception:
+            if spool is not None:
+                print(f"Fetched pages were kept; resume with --resume {spool.run_id}")
+            raise
+        if spool is not None:
+            spool.clear()
+    finally:
+        instrumentation.end_run()
+        run.emit()
+        if bq_client is not None:
+            _append_run_log(run, bq_client, project)
+
+    return {
+        "run_id": run.run_id,
+        "status": "ok",
+        "seconds": (datetime.now(UTC) - run.started_at).total_seconds(),
+        "tables": rows,
+        "fresh": fresh,
+        "stages": {s.name: s.seconds for s in run.spans if s.parent is None},
+    }
+
+
+def _stale_only(
+    sync_state, tables: list[str], forecast: bool, now: datetime
+) -> tuple[list[str], bool, list[str]]:
+    """Narrow the selected tables and forecast to those due for a sync at now."""
+    from .syncstate import get_freshness, stale_entities
+
+    entities = [*tables, "forecast"] if forecast else tables
+    stale = stale_entities(sync_state, entities, get_freshness(), now)
+    fresh = [entity for entity in entities if entity not in stale]
+    return (
+        [table for table in tables if table in stale],
+        "forecast" in stale,
+        fresh,
+    )
+
+
+def _sync(
+    bq_client,
+    mm: "MonarchMoney | None",
+    tables: list[str],
+    forecast: bool,
+    load: bool,
+    spool: "CheckpointSpool | None" = None,
+    dataset: str = "monarch_money",
+    project: str = "zwickfi",
+    load_executor: "Executor | None" = None,
+    sync_state: "SyncState | None" = None,
+    synced_at: datetime | None = None,
+    engine: str | None = None,
+) -> dict[str, int]:
+    """
+    Run the selected stages as a dependency graph.
+
+    Each table loads as soon as its own extraction finishes, and the
+    forecast query and fits run alongside Monarch extraction. A failed stage
+    only skips the stages that depend on it; failures are raised together
+    once everything else has finished. Entities whose stages all succeeded
+    are recorded in sync_state as synced at synced_at (the run's start,
+    which staleness was checked at), even when others failed.
+
+    Returns:
+        Rows produced per table.
+
+    Raises:
+        ExceptionGroup: If any stage failed.
+    """
+    stages = []
+    if tables:
+        stages += _extract_stages(
+            bq_client, mm, tables, load, spool, dataset, project, load_executor
+        )
+    if forecast:
+        stages += _forecast_stages(bq_client, load, project, engine)
+
+    synced_at = synced_at or datetime.now(UTC)
+    outcome = asyncio.run(_run_stages(stages, mm if tables else None))
+    if sync_state is not None:
+        failed = {_stage_entity(name) for name in [*outcome.errors, *outcome.skipped]}
+        entities = [*tables, "forecast"] if forecast else tables
+        synced = [entity for entity in entities if entity not in failed]
+        if synced:
+            sync_state.record(synced, synced_at)
+    outcome.raise_for_errors()
+
+    rows = {}
+    for table in tables:
+        extracted = outcome.results.get(f"extract.{table}")
+        if isinstance(extracted, dict):
+            # Budget fact tables are reported individually
+            rows.update({name: len(df) for name, df in extracted.items()})
+        elif isinstance(extracted, int):
+            # Streamed tables report a row count instead of a frame
+            rows[table] = extracted
+        elif extracted is not None:
+            rows[table] = len(extracted)
+    if "forecast.fit" in outcome.results:
+        rows[FORECAST_TABLE] = len(outcome.results["forecast.fit"])
+    return rows
+
+
+def _stage_entity(stage_name: str) -> str:
+    """Entity a stage belongs to, e.g. "accounts" for "load.accounts"."""
+    kind, entity = stage_name.split(".", 1)
+    return "forecast" if kind == "forecast" else entity
+
+
+async def _run_stages(stages: list[Stage], mm: "MonarchMoney | None") -> StageResults:
+    """Run stages, sharing one Monarch connection pool and controller if extracting."""
+    if mm is None:
+        return await run_stages(stages)
+
+    from .monarch import controlled_requests, shared_connection_pool
+
+    async with shared_connection_pool(mm), controlled_requests():
+        return await run_stages(stages)
+
+
+def _extract_stages(
+    bq_client,
+    mm: "MonarchMoney",
+    tables: list[str],
+    load: bool,
+    spool: "CheckpointSpool | None" = None,
+    dataset: str = "monarch_money",
+    project: str = "zwickfi",
+    load_executor: "Executor | None" = None,
+) -> list[Stage]:
+    """Stages that extract, and optionally load, the given Monarch tables."""
+    from . import bigquery, monarch
 
-    mm = get_monarch_client()
-    print("Logged into Monarch.")
-
-    # Extract transaction data
-    total_transactions = monarch.get_total_transactions(mm)
-    transactions = monarch.get_transactions(mm, limit=total_transactions)
-    transaction_categories = monarch.get_transaction_categories(mm)
-    transaction_tags = monarch.get_transaction_tags(mm)
-
-    # Extract account data
-    accounts = monarch.get_accounts(mm)
-
-    # Extract budget data
-    budgets = monarch.get_budgets(mm)
-
-    # Extract account history for all accounts
-    account_ids = accounts["id"].tolist()
-    account_history = pd.DataFrame()
-
-    for account_id in account_ids:
-        print(f"Getting account history for account ID {account_id}.")
-        history = monarch.get_account_history(mm, account_id)
-        account_history = pd.concat([account_history, history], ignore_index=True)
-
-    # Generate forecasts
-    forecast_data, credit_cards = forecasts.get_forecast_data(bq_client)
-    forecast_df = forecasts.generate_forecasts(forecast_data, credit_cards)
-
-    # Load to BigQuery
-    today = date.today()
-    datasets = [
-        (transactions, "monarch_money", "transactions"),
-        (transaction_categories, "monarch_money", "transaction_categories"),
-        (transaction_tags, "monarch_money", "transaction_tags"),
-        (accounts, "monarch_money", "accounts"),
-        (budgets, "monarch_money", "budgets"),
-        (account_history, "monarch_money", "account_balance_history"),
-        (forecast_df, "forecasts", f"credit_card_forecast_{today}"),
+    page_concurrency = int(
+        os.getenv("MONARCH_PAGE_CONCURRENCY", monarch.DEFAULT_PAGE_CONCURRENCY)
+    )
+    history_concurrency = int(
+        os.getenv("MONARCH_HISTORY_CONCURRENCY", monarch.DEFAULT_HISTORY_CONCURRENCY)
+    )
+    budget_facts = os.getenv("BUDGETS_FORMAT", "nested") == "facts"
+    streaming = os.getenv("TRANSACTIONS_STREAMING", "false").lower() == "true"
+    budget_window = _budget_window()
+
+    async def extract_transactions(results):
+        since = results["watermarks.transactions"]
+        if since is not None:
+            return await monarch.get_transactions_since_async(
+                mm, start_date=since, concurrency=page_concurrency, spool=spool
+            )
+        total = await monarch.get_total_transactions_async(mm)
+        return await monarch.get_transactions_async(
+            mm, limit=total, concurrency=page_concurrency, spool=spool
+        )
+
+    async def stream_transactions(results):
+        # Each page is flattened and handed to the loader on a worker thread
+        # before the next one is consumed, so the event loop keeps fetching
+        # and memory holds a few pages at a time. The loader appends every
+        # two pages, so its buffer stays as small as the prefetch window.
+        from .utils import flatten_records
+
+        since = results["watermarks.transactions"]
+        loader = None
+        if load:
+            loader = bigquery.StreamingLoad(
+                dataset,
+                "transactions",
+                bq_client,
+                merge_key="id" if since is not None else None,
+                project=project,
+                rows_per_load=2 * monarch.TRANSACTIONS_PAGE_SIZE,
+            )
+
+        def flatten_and_load(page: list[dict]) -> int:
+            df = flatten_records(page, TRANSACTION_FIELDS)
+            if loader is not None:
+                loader.append(df)
+            return len(df)
+
+        rows = 0
+        async for page in monarch.iter_transaction_pages_async(
+            mm, since=since, concurrency=page_concurrency, spool=spool
+        ):
+            rows += await asyncio.to_thread(flatten_and_load, page)
+        if loader is not None:
+            await asyncio.to_thread(loader.finish)
+        return rows
+
+    def extract_account_history(results):
+        return monarch.get_accounts_history_async(
+            mm,
+            results["extract.accounts"]["id"].tolist(),
+            concurrency=history_concurrency,
+            since=results["watermarks.account_balance_history"],
+            spool=spool,
+        )
+
+    # Each table's extraction, given the results of the stages it runs after
+    extract = {
+        "transactions": stream_transactions if streaming else extract_transactions,
+        "transaction_categories": (
+            lambda _: monarch.get_transaction_categories_async(mm)
+        ),
+        "transaction_tags": lambda _: monarch.get_transaction_tags_async(mm),
+        "accounts": lambda _: monarch.get_accounts_async(mm),
+        "budgets": (
+            (lambda _: monarch.get_budget_facts_async(mm, *budget_window))
+            if budget_facts
+            else (lambda _: monarch.get_budgets_async(mm))
+        ),
+        "account_balance_history": extract_account_history,
+    }
+    # Incremental tables read their watermark before extracting, and are
+    # merged rather than replaced when one was found
+    watermarks = {
+        "transactions": (
+            lambda _: _transactions_start_date(bq_client, dataset, project),
+            "id",
+        ),
+        "account_balance_history": (
+            lambda _: _account_history_watermarks(bq_client, dataset, project),
+            ["accountId", "date"],
+        ),
+    }
+    after = {
+        "transactions": ("watermarks.transactions",),
+        "account_balance_history": (
+            "watermarks.account_balance_history",
+            "extract.accounts",
+        ),
+    }
+
+    # Account history needs the account list even when accounts aren't loaded
+    needed = set(tables)
+    if "account_balance_history" in needed:
+        needed.add("accounts")
+
+    stages = []
+    for table in MONARCH_TABLES:
+        if table not in needed:
+            continue
+        if table in watermarks:
+            stages.append(
+                Stage(f"watermarks.{table}", watermarks[table][0], blocking=True)
+            )
+        stages.append(
+            Stage(f"extract.{table}", extract[table], after=after.get(table, ()))
+        )
+        # Streamed transactions are loaded by their extract stage
+        if load and table in tables and not (table == "transactions" and streaming):
+
+            def load_table(results, table=table):
+                if table == "budgets" and budget_facts:
+                    _load_budget_facts(
+                        results["extract.budgets"],
+                        bq_client,
+                        budget_window,
+                        dataset,
+                        project,
+                    )
+                    return
+                merge_key = None
+                if table in watermarks and results[f"watermarks.{table}"] is not None:
+                    merge_key = watermarks[table][1]
+                bigquery.load_table(
+                    results[f"extract.{table}"],
+                    dataset,
+                    table,
+                    bq_client,
+                    merge_key=merge_key,
+                    project=project,
+                    skip_unchanged=table in DIMENSION_TABLES,
+                )
+
+            stages.append(
+                Stage(
+                    f"load.{table}",
+                    load_table,
+                    after=(f"extract.{table}", *after.get(table, ())),
+                    blocking=True,
+                    executor=load_executor,
+                )
+            )
+    return stages
+
+
+def _budget_window() -> tuple[str, str]:
+    """Month window of budgets to sync, from BUDGETS_MONTHS_BACK/AHEAD."""
+    from .budgets import month_window
+
+    return month_window(
+        date.today(),
+        int(os.getenv("BUDGETS_MONTHS_BACK", "1")),
+        int(os.getenv("BUDGETS_MONTHS_AHEAD", "1")),
+    )
+
+
+def _load_budget_facts(
+    tables: dict,
+    bq_client,
+    window: tuple[str, str],
+    dataset: str = "monarch_money",
+    project: str = "zwickfi",
+) -> None:
+    """Replace the synced month window of each budget fact table."""
+    from . import bigquery
+    from .budgets import BUDGET_FACT_TABLES
+
+    for table, df in tables.items():
+        if table in BUDGET_FACT_TABLES:
+            bigquery.replace_month_window(
+                df, dataset, table, bq_client, *window, project=project
+            )
+        else:
+            bigquery.write_to_bigquery(
+                df, dataset, table, bq_client, project=project, skip_unchanged=True
+            )
+
+
+def _forecast_stages(
+    bq_client, load: bool, project: str = "zwickfi", engine: str | None = None
+) -> list[Stage]:
+    """
+    Stages that query history, fit forecasts and optionally load them.
+
+    History is read from, and forecasts loaded to, the given project.
+    Forecasts are fit with engine, or FORECAST_ENGINE when it's None.
+    """
+    engine = engine or os.getenv("FORECAST_ENGINE", "prophet")
+
+    def query(_):
+        from . import forecasts
+
+        history_months = os.getenv("FORECAST_HISTORY_MONTHS", "")
+        return forecasts.get_forecast_data(
+            bq_client, int(history_months) if history_months else None, project
+        )
+
+    def fit(results):
+        from . import forecasts
+        from .cache import get_forecast_cache
+
+        forecast_data, credit_cards = results["forecast.query"]
+        return forecasts.generate_forecasts(
+            forecast_data,
+            credit_cards,
+            cache=get_forecast_cache(),
+            warm_start=os.getenv("FORECAST_WARM_START", "false").lower() == "true",
+            engine=engine,
+        )
+
+    def load_forecast(results):
+        from . import bigquery
+        from .forecasts import FORECAST_COLUMNS
+
+        run_date = date.today()
+        expiry_days = os.getenv("FORECAST_PARTITION_EXPIRY_DAYS", "")
+        forecast = results["forecast.fit"]
+        bigquery.replace_partition(
+            forecast[list(FORECAST_COLUMNS)]
+            .astype(FORECAST_COLUMNS)
+            .assign(run_date=run_date),
+            "forecasts",
+            FORECAST_TABLE,
+            bq_client,
+            run_date,
+            "run_date",
+            clustering_fields=["account_name"],
+            expiration_days=int(expiry_days) if expiry_days else None,
+            project=project,
+        )
+
+    stages = [
+        Stage("forecast.query", query, blocking=True),
+        Stage("forecast.fit", fit, after=("forecast.query",), blocking=True),
     ]
+    if load:
+        stages.append(
+            Stage(
+                "load.forecast", load_forecast, after=("forecast.fit",), blocking=True
+            )
+        )
+    return stages
+
+
+def _append_run_log(
+    run: instrumentation.RunLog, bq_client, project: str = "zwickfi"
+) -> None:
+    """
+    Append a run's spans to the BigQuery table named by RUN_LOG_TABLE.
+
+    RUN_LOG_TABLE is "dataset.table" in the run's project; unset or empty
+    skips the append. A failed append is reported but not raised, so it
+    can't fail the run.
+    """
+    run_log_table = os.getenv("RUN_LOG_TABLE", "")
+    if not run_log_table or not run.spans:
+        return
+
+    from . import bigquery
+
+    schema, table_name = run_log_table.split(".", 1)
+    try:
+        bigquery.write_to_bigquery(
+            run.to_dataframe(),
+            schema,
+            table_name,
+            bq_client,
+            project=project,
+            write_disposition="WRITE_APPEND",
+            # Logs created before a column was added gain it on append
+            schema_update_options=["ALLOW_FIELD_ADDITION"],
+        )
+    except Exception as e:
+        print(f"Failed to append run log to {run_log_table}: {e}")
+
+
+def _full_sync_due(mode_var: str) -> bool:
+    """
+    Check whether an entity should be fully reloaded on this run.
+
+    A full sync runs when the entity's mode variable is set to "full", or
+    during TRANSACTIONS_FULL_SYNC_HOUR (default 3), the daily pass that also
+    reconciles deleted rows.
+    """
+    mode = os.getenv(mode_var, "incremental")
+    full_sync_hour = int(os.getenv("TRANSACTIONS_FULL_SYNC_HOUR", "3"))
+    return mode != "incremental" or datetime.now().hour == full_sync_hour
+
+
+def _transactions_start_date(
+    bq_client, dataset: str = "monarch_money", project: str = "zwickfi"
+) -> str | None:
+    """
+    Decide whether this run syncs transactions incrementally.
+
+    Configured through environment variables:
+    - TRANSACTIONS_SYNC_MODE: "incremental" (default) or "full"
+    - TRANSACTIONS_LOOKBACK_DAYS: days re-fetched before the watermark (default 30)
+    - TRANSACTIONS_FULL_SYNC_HOUR: hour of day (0-23) that always runs a full
+      sync, which also reconciles deleted transactions (default 3)
+
+    Returns:
+        Start date for an incremental sync, or None for a full sync.
+    """
+    if _full_sync_due("TRANSACTIONS_SYNC_MODE"):
+        print("Running a full transaction sync.")
+        return None
+
+    import pandas as pd
+
+    from . import bigquery
+
+    watermark = bigquery.get_max_value(
+        bq_client, dataset, "transactions", "date", project
+    )
+    if watermark is None:
+        print("No transaction watermark found; running a full transaction sync.")
+        return None
+
+    lookback_days = int(os.getenv("TRANSACTIONS_LOOKBACK_DAYS", "30"))
+    start = pd.Timestamp(watermark).date() - timedelta(days=lookback_days)
+    print(f"Running an incremental transaction sync from {start}.")
+    return start.isoformat()
+
+
+def _account_history_watermarks(
+    bq_client, dataset: str = "monarch_money", project: str = "zwickfi"
+) -> dict[str, str] | None:
+    """
+    Decide whether this run syncs account balance history incrementally.
+
+    Controlled by ACCOUNT_HISTORY_SYNC_MODE ("incremental" by default or
+    "full") and the shared TRANSACTIONS_FULL_SYNC_HOUR daily full pass.
+
+    Returns:
+        Mapping of account ID to last loaded balance date, or None for a
+        full sync.
+    """
+    if _full_sync_due("ACCOUNT_HISTORY_SYNC_MODE"):
+        print("Running a full account history sync.")
+        return None
+
+    import pandas as pd
+
+    from . import bigquery
+
+    watermarks = bigquery.get_max_values_by_key(
+        bq_client, dataset, "account_balance_history", "accountId", "date", project
+    )
+    if not watermarks:
+        print("No account history watermarks found; running a full sync.")
+        return None
 
-    for df, schema, table_name in datasets:
-        bigquery.write_to_bigquery(df, schema, table_name, bq_client)
+    print(
+        f"Running an incremental account history sync for {len(watermarks)} accounts."
+    )
+    return {
+        str(account_id): pd.Timestamp(watermark).date().isoformat()
+        for account_id, watermark in watermarks.items()
+    }
 
 
 if __name__ == "__main__":
@@ -0,0 +1,184 @@
+"""Batch mode: sync many households' Monarch accounts in one process.
+
+Households are listed in a TOML file (see households.example.toml), each
+with the BigQuery dataset it loads to and the names of the environment
+variables holding its Monarch credentials, so the file itself holds no
+secrets. :func:`sync_households` runs a bounded number of households at
+once. They share one BigQuery client and one pool of load jobs, while each
+keeps its own Monarch session, run log and checkpoint spool. A household
+that fails is reported in the summary without stopping the others.
+"""
+
+import os
+import tomllib
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+from . import cli
+from .schemas import MONARCH_TABLES
+
+DEFAULT_MAX_CONCURRENT = 2
+DEFAULT_LOAD_WORKERS = 4
+
+
+@dataclass
+class Household:
+    """
+    One Monarch login and the BigQuery dataset its tables are loaded to.
+
+    Credentials are read from the environment variables named by the
+    ``*_env`` fields. Each household caches its Monarch session in its own
+    file, ``~/.cache/zwickfi/<name>_session.enc`` unless ``session_file``
+    says otherwise.
+    """
+
+    name: str
+    dataset: str
+    project: str = "zwickfi"
+    email_env: str = "MONARCH_EMAIL"
+    password_env: str = "MONARCH_PASSWORD"
+    secret_key_env: str = "MONARCH_SECRET_KEY"
+    session_file: str | None = None
+    tables: list[str] | None = None
+
+    def credentials(self) -> tuple[str, str, str]:
+        """
+        Read the household's Monarch credentials from the environment.
+
+        Raises:
+            ValueError: If any of the variables is unset, since batch runs
+                can't prompt for them.
+        """
+        names = (self.email_env, self.password_env, self.secret_key_env)
+        missing = [name for name in names if not os.getenv(name)]
+        if missing:
+            raise ValueError(
+                f"Household {self.name!r} is missing credentials: {', '.join(missing)}"
+            )
+        return tuple(os.environ[name] for name in names)
+
+    def monarch_client(self):
+        """Log in to the household's Monarch account, reusing its cached session."""
+        from .auth import get_monarch_client
+
+        email, password, secret_key = self.credentials()
+        session_file = self.session_file
+        if session_file is None:
+            session_file = str(
+                Path.home() / ".cache" / "zwickfi" / f"{self.name}_session.enc"
+            )
+        return get_monarch_client(email, password, secret_key, session_file)
+
+
+def load_households(path: str | Path) -> list[Household]:
+    """
+    Read the households listed in a TOML config file.
+
+    Each ``[households.<name>]`` table needs a ``dataset`` and may set the
+    other :class:`Household` fields.
+
+    Args:
+        path: Config file to read.
+
+    Returns:
+        Households in the order they're listed.
+
+    Raises:
+        ValueError: If the file lists no households, or one has unknown or
+            missing settings or unknown tables.
+    """
+    with open(path, "rb") as f:
+        config = tomllib.load(f)
+
+    entries = config.get("households", {})
+    if not entries:
+        raise ValueError(f"{path} lists no [households.<name>] tables")
+
+    households = []
+    for name, settings in entries.items():
+        try:
+            household = Household(name=name, **settings)
+        except TypeError as e:
+            raise ValueError(f"Invalid settings for household {name!r}: {e}") from e
+        unknown = [t for t in household.tables or () if t not in MONARCH_TABLES]
+        if unknown:
+            raise ValueError(
+                f"Unknown tables for household {name!r}: {', '.join(unknown)}"
+            )
+        households.append(household)
+    return households
+
+
+def sync_households(
+    households: list[Household],
+    bq_client=None,
+    max_concurrent: int = DEFAULT_MAX_CONCURRENT,
+    load_workers: int = DEFAULT_LOAD_WORKERS,
+    load: bool = True,
+    force: bool = False,
+) -> dict[str, dict]:
+    """
+    Sync several households, at most max_concurrent at a time.
+
+    Each household runs :func:`zwickfi.cli.sync` on its own worker thread
+    and event loop, so its Monarch connection pool and request controller
+    only pace its own account. The load stages of every household share one
+    pool of load_workers threads, which bounds the BigQuery load jobs in
+    flight however many households are running. Forecasts are skipped,
+    since they read a single shared analytics view.
+
+    Args:
+        households: Households to sync.
+        bq_client: Authenticated BigQuery client to share; authenticates a
+            new one if omitted.
+        max_concurrent: Households synced at once.
+        load_workers: Load stages run at once across all households.
+        load: Whether to load the results to BigQuery.
+        force: Whether to sync every entity, even those still fresh.
+
+    Returns:
+        Each household's run summary, or for a failed household a summary
+        with status "error" and the error message.
+    """
+    if bq_client is None:
+        from .auth import get_bigquery_client
+
+        bq_client = get_bigquery_client()
+
+    def sync_household(household: Household) -> dict:
+        run_id = uuid.uuid4().hex
+        try:
+            mm = household.monarch_client() if household.tables != [] else None
+            return cli.sync(
+                bq_client,
+                mm,
+                run_id=run_id,
+                tables=household.tables,
+                forecast=False,
+                load=load,
+                dataset=household.dataset,
+                project=household.project,
+                load_executor=load_pool,
+                force=force,
+            )
+        except Exception as e:
+            print(f"Household {household.name!r} failed:")
+            traceback.print_exc()
+            return {
+                "run_id": run_id,
+                "status": "error",
+                "error": f"{type(e).__name__}: {e}",
+            }
+
+    with (
+        ThreadPoolExecutor(load_workers, thread_name_prefix="load") as load_pool,
+        ThreadPoolExecutor(max_concurrent, thread_name_prefix="household") as pool,
+    ):
+        summaries = pool.map(sync_household, households)
+        return {
+            household.name: summary
+            for household, summary in zip(households, summaries, strict=True)
+        }
@@ -0,0 +1,195 @@
+"""Timing, memory and throughput spans for pipeline runs.
+
+Work is wrapped in ``with span("name") as s:``; the block may set
+``s.rows``, ``s.bytes`` or ``s.attributes``. Spans are collected by the
+active :class:`RunLog` started with :func:`start_run` in the current context;
+threads started with a copy of it, e.g. by asyncio.to_thread, share the
+run. Without an active run they are timed and discarded, so library
+functions can be instrumented unconditionally.
+"""
+
+import json
+import resource
+import sys
+import threading
+import time
+import uuid
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from datetime import UTC, datetime
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Name of the innermost open span, recorded as the parent of new spans
+_parent: ContextVar[str | None] = ContextVar("zwickfi_parent_span", default=None)
+
+# Run collecting spans; a context variable, so concurrent runs in separate
+# threads (e.g. one per household) each collect their own spans
+_active_run: ContextVar["RunLog | None"] = ContextVar(
+    "zwickfi_active_run", default=None
+)
+
+
+@dataclass
+class Span:
+    """One timed unit of work."""
+
+    name: str
+    started_at: datetime
+    parent: str | None = None
+    seconds: float = 0.0
+    rows: int | None = None
+    bytes: int | None = None
+    max_rss_mb: float | None = None
+    status: str = "ok"
+    error: str | None = None
+    attributes: dict = field(default_factory=dict)
+
+
+class RunLog:
+    """Spans collected over one pipeline run."""
+
+    def __init__(self, run_id: str | None = None, resumed_from: str | None = None):
+        self.run_id = run_id or uuid.uuid4().hex
+        self.resumed_from = resumed_from
+        self.started_at = datetime.now(UTC)
+        self.spans: list[Span] = []
+        self._lock = threading.Lock()
+
+    def add(self, span: Span) -> None:
+        """Record a finished span; safe to call from worker threads."""
+        with self._lock:
+            self.spans.append(span)
+
+    def emit(self, stream=None) -> None:
+        """Write each span as one JSON line, for structured log ingestion."""
+        stream = stream or sys.stdout
+        for span in self.spans:
+            record = {
+                "run_id": self.run_id,
+                "resumed_from": self.resumed_from,
+                "event": "span",
+                **asdict(span),
+            }
+            print(json.dumps(record, default=str), file=stream)
+
+    def to_dataframe(self) -> "pd.DataFrame":
+        """One row per span, with attributes serialized as a JSON string."""
+        import pandas as pd
+
+        rows = [
+            {
+                "run_id": self.run_id,
+                "resumed_from": self.resumed_from,
+                "run_started_at": self.started_at,
+                **asdict(span),
+                "attributes": json.dumps(span.attributes, default=str),
+            }
+            for span in self.spans
+        ]
+        columns = ["run_id", "resumed_from", "run_started_at", *Span.__annotations__]
+        # Fixed dtypes keep the schema stable across appends, even when a
+        # column happens to be all null in one run
+        return pd.DataFrame(rows, columns=columns).astype(
+            {
+                "rows": "Int64",
+                "bytes": "Int64",
+                "max_rss_mb": "float64",
+                "resumed_from": "string",
+                "parent": "string",
+                "error": "string",
+            }
+        )
+
+
+def start_run(run_id: str | None = None, resumed_from: str | None = None) -> RunLog:
+    """
+    Start collecting spans into a new run log, and return it.
+
+    Args:
+        run_id: ID of the run; generated if omitted.
+        resumed_from: ID of the failed run this one resumes, if any.
+    """
+    run = RunLog(run_id, resumed_from)
+    _active_run.set(run)
+    return run
+
+
+def end_run() -> RunLog | None:
+    """Stop collecting spans and return the finished run log, if any."""
+    run = _active_run.get()
+    _active_run.set(None)
+    return run
+
+
+@contextmanager
+def span(name: str, **attributes) -> Iterator[Span]:
+    """
+    Time a block of work as a span of the active run.
+
+    Args:
+        name: Span name, e.g. "monarch.transactions_page".
+        **attributes: Extra fields to record with the span.
+
+    Yields:
+        The open span, whose rows, bytes and attributes may be filled in.
+    """
+    current = Span(
+        name=name,
+        started_at=datetime.now(UTC),
+        parent=_parent.get(),
+        attributes=attributes,
+    )
+    token = _parent.set(name)
+    start = time.perf_counter()
+    try:
+        yield current
+    except BaseException as e:
+        current.status = "error"
+        current.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        current.seconds = time.perf_counter() - start
+        current.max_rss_mb = max_rss_mb()
+        _parent.reset(token)
+        run = _active_run.get()
+        if run is not None:
+            run.add(current)
+
+
+def record(name: str, seconds: float, **fields) -> None:
+    """
+    Record a span timed elsewhere, e.g. in a worker process.
+
+    Args:
+        name: Span name.
+        seconds: Measured duration.
+        **fields: ``rows`` and ``bytes`` fill those span fields; anything
+            else is stored as an attribute.
+    """
+    run = _active_run.get()
+    if run is None:
+        return
+    known = {key: fields.pop(key) for key in ("rows", "bytes") if key in fields}
+    run.add(
+        Span(
+            name=name,
+            started_at=datetime.now(UTC),
+            parent=_parent.get(),
+            seconds=seconds,
+            max_rss_mb=max_rss_mb(),
+            attributes=fields,
+            **known,
+        )
+    )
+
+
+def max_rss_mb() -> float:
+    """Peak resident set size of this process so far, in megabytes."""
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes on Linux
+    return max_rss / 1024 / 1024 if sys.platform == "darwin" else max_rss / 1024
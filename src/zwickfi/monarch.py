@@ -1,16 +1,142 @@
-"""Monarch Money API wrapper for extracting financial data."""
+"""Monarch Money API wrapper for extracting financial data.
 
-import asyncio
-import math
-from datetime import datetime
+Each endpoint has an async implementation (``*_async``) and a synchronous
+wrapper with the original name. The sync wrappers run their own event loop
+and are kept for backward compatibility; the pipeline (zwickfi.cli) runs
+the async calls as stages on one loop and one connection pool.
+"""
 
+import asyncio
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from datetime import date, datetime, timedelta
+from itertools import islice
+from typing import TYPE_CHECKING, TypeVar
+
+import aiohttp
 import pandas as pd
 from monarchmoney import MonarchMoney
 
-from .utils import json_to_dataframe
+from . import instrumentation
+from .budgets import budget_fact_tables
+from .instrumentation import span
+from .ratelimit import RequestController, get_request_controller
+from .utils import concat_frames, json_to_dataframe
 
+if TYPE_CHECKING:
+    from .spool import CheckpointSpool
 
-def get_total_transactions(mm: MonarchMoney) -> int:
+# Upper bound on simultaneous HTTP connections to the Monarch API
+DEFAULT_CONNECTION_LIMIT = 10
+
+# Largest page the transactions endpoint serves per request
+TRANSACTIONS_PAGE_SIZE = 1000
+
+# Default number of transaction pages requested at once
+DEFAULT_PAGE_CONCURRENCY = 4
+
+# Consecutive streamed transaction pages whose IDs are kept for
+# deduplication
+DEDUP_PAGES = 2
+
+# Default number of account histories requested at once
+DEFAULT_HISTORY_CONCURRENCY = 8
+
+# Controller that requests in the current context go through
+_controller: ContextVar[RequestController | None] = ContextVar(
+    "zwickfi_request_controller", default=None
+)
+
+T = TypeVar("T")
+
+
+@asynccontextmanager
+async def shared_connection_pool(
+    mm: MonarchMoney, limit: int = DEFAULT_CONNECTION_LIMIT
+) -> AsyncIterator[MonarchMoney]:
+    """
+    Route every GraphQL call made by a client through one connection pool.
+
+    MonarchMoney builds a fresh aiohttp transport (and TCP connector) for
+    each call. Inside this context the client's transports share a single
+    connector, so concurrent calls reuse keep-alive connections instead of
+    opening new ones.
+
+    Args:
+        mm: Authenticated MonarchMoney client.
+        limit: Maximum number of simultaneous connections.
+
+    Yields:
+        The same client, patched to use the shared pool.
+    """
+    connector = aiohttp.TCPConnector(limit=limit)
+    build_client = mm._get_graphql_client
+
+    def _pooled_client():
+        client = build_client()
+        client.transport.client_session_args = {
+            **(client.transport.client_session_args or {}),
+            "connector": connector,
+            "connector_owner": False,
+        }
+        return client
+
+    mm._get_graphql_client = _pooled_client
+    try:
+        yield mm
+    finally:
+        del mm._get_graphql_client
+        await connector.close()
+
+
+@asynccontextmanager
+async def controlled_requests(
+    controller: RequestController | None = None,
+) -> AsyncIterator[RequestController]:
+    """
+    Send every Monarch request made in this context through one controller.
+
+    Requests are paced, bounded and retried as described in
+    zwickfi.ratelimit. When the context exits, the controller's metrics are
+    recorded as a "monarch.requests" span.
+
+    Args:
+        controller: Controller to use; one configured from the environment
+            by default.
+
+    Yields:
+        The controller in use.
+    """
+    if controller is None:
+        controller = get_request_controller(DEFAULT_CONNECTION_LIMIT)
+    token = _controller.set(controller)
+    started = time.perf_counter()
+    try:
+        yield controller
+    finally:
+        _controller.reset(token)
+        metrics = controller.metrics()
+        instrumentation.record(
+            "monarch.requests", time.perf_counter() - started, **metrics
+        )
+        print(
+            f"Monarch requests: {metrics['successes']} succeeded, "
+            f"{metrics['retries']} retried, {metrics['throttled']} throttled"
+        )
+
+
+async def _request(call: Callable[..., Awaitable[T]], *args, **kwargs) -> T:
+    """Make a Monarch request through the active controller, if any."""
+    controller = _controller.get()
+    if controller is None:
+        return await call(*args, **kwargs)
+    return await controller.call(call, *args, **kwargs)
+
+
+async def get_total_transactions_async(mm: MonarchMoney) -> int:
     """
     Get the total number of transactions.
 
@@ -20,48 +146,287 @@ def get_total_transactions(mm: MonarchMoney) -> int:
     Returns:
         Total transaction count.
     """
-    summary = asyncio.run(mm.get_transactions_summary())
+    with span("monarch.transactions_summary"):
+        summary = await _request(mm.get_transactions_summary)
     total = summary["aggregates"][0]["summary"]["count"]
     print(f"Total transactions: {total}")
     return total
 
 
-def get_transactions(mm: MonarchMoney, limit: int = 1000) -> pd.DataFrame:
+async def _get_transaction_pages_async(
+    mm: MonarchMoney,
+    limit: int,
+    concurrency: int,
+    start_offset: int = 0,
+    spool: "CheckpointSpool | None" = None,
+    **filters,
+) -> list[dict]:
+    """Fetch transaction records from start_offset up to limit, in page order."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch_page(offset: int) -> list[dict]:
+        async with semaphore:
+            return await _fetch_transaction_page(mm, offset, limit, spool, filters)
+
+    pages = await asyncio.gather(
+        *(
+            fetch_page(offset)
+            for offset in range(start_offset, limit, TRANSACTIONS_PAGE_SIZE)
+        )
+    )
+    return [record for page in pages for record in page]
+
+
+async def _iter_transaction_pages_async(
+    mm: MonarchMoney,
+    limit: int,
+    concurrency: int,
+    start_offset: int = 0,
+    spool: "CheckpointSpool | None" = None,
+    **filters,
+) -> AsyncIterator[list[dict]]:
     """
-    Retrieve transactions with pagination support.
+    Yield transaction pages from start_offset up to limit, in page order.
+
+    Pages are prefetched in a sliding window: at most ``concurrency`` pages
+    are requested ahead of the one being consumed, so memory holds a few
+    pages however many there are.
+    """
+    offsets = iter(range(start_offset, limit, TRANSACTIONS_PAGE_SIZE))
+
+    def request(offset: int) -> asyncio.Task:
+        return asyncio.create_task(
+            _fetch_transaction_page(mm, offset, limit, spool, filters)
+        )
+
+    window = deque(request(offset) for offset in islice(offsets, concurrency))
+    try:
+        while window:
+            page = await window.popleft()
+            next_offset = next(offsets, None)
+            if next_offset is not None:
+                window.append(request(next_offset))
+            yield page
+    finally:
+        for task in window:
+            task.cancel()
+
+
+async def _fetch_transaction_page(
+    mm: MonarchMoney,
+    offset: int,
+    limit: int,
+    spool: "CheckpointSpool | None",
+    filters: dict,
+) -> list[dict]:
+    """Fetch the page of transactions at offset, or read it from the spool."""
+    page, _ = await _fetch_transaction_page_and_total(mm, offset, limit, spool, filters)
+    return page
+
+
+async def _fetch_transaction_page_and_total(
+    mm: MonarchMoney,
+    offset: int,
+    limit: int,
+    spool: "CheckpointSpool | None",
+    filters: dict,
+) -> tuple[list[dict], int | None]:
+    """
+    Fetch the page at offset and the total the API reports with it.
+
+    Pages are read back from the spool when they're there. The first page's
+    total is spooled before the page itself, so a spooled first page always
+    comes back with its total; other spooled pages come back with None.
+    """
+    prefix = _transactions_unit(filters)
+    unit = f"{prefix}/{offset}"
+    if spool is not None:
+        spooled = spool.get(unit)
+        if spooled is not None:
+            total = spool.get(f"{prefix}/total") if offset == 0 else None
+            return spooled, total[0] if total else None
+    page_size = min(TRANSACTIONS_PAGE_SIZE, limit - offset)
+    print(f"Getting transactions {offset} through {offset + page_size - 1}.")
+    with span("monarch.transactions_page", offset=offset) as page_span:
+        transactions = await _request(
+            mm.get_transactions, limit=page_size, offset=offset, **filters
+        )
+        results = transactions["allTransactions"]["results"]
+        total = transactions["allTransactions"].get("totalCount")
+        page_span.rows = len(results)
+    if spool is not None:
+        if offset == 0:
+            spool.put(f"{prefix}/total", [total])
+        spool.put(unit, results)
+    return results, total
+
+
+def _transactions_unit(filters: dict) -> str:
+    """Spool unit prefix for transaction pages fetched with the given filters."""
+    if "start_date" in filters:
+        return f"transactions_since_{filters['start_date']}"
+    return "transactions"
+
+
+async def get_transactions_async(
+    mm: MonarchMoney,
+    limit: int = TRANSACTIONS_PAGE_SIZE,
+    concurrency: int = DEFAULT_PAGE_CONCURRENCY,
+    spool: "CheckpointSpool | None" = None,
+) -> pd.DataFrame:
+    """
+    Retrieve transactions with concurrent pagination.
+
+    The offsets of every page are known up front from ``limit`` (normally
+    the count from get_total_transactions), so pages are requested
+    concurrently, at most ``concurrency`` at a time. Records are kept in page
+    order and flattened into a single DataFrame once all pages arrive.
+
+    With a spool, each page is checkpointed as it arrives and pages already
+    in the spool aren't requested again. Offsets shift when transactions are
+    added or deleted between requests, or between attempts of a resumed
+    fetch, so the same transaction can land on two pages; records are
+    deduplicated on ID.
 
     Args:
         mm: Authenticated MonarchMoney client.
         limit: Maximum number of transactions to retrieve.
+        concurrency: Maximum number of pages in flight at once.
+        spool: Optional checkpoint spool of the current run.
 
     Returns:
         DataFrame containing transaction data.
     """
-    max_per_request = 1000
-    df = pd.DataFrame()
-
-    if limit > max_per_request:
-        iterations = math.ceil(limit / max_per_request)
-        for i in range(iterations):
-            offset = i * max_per_request
-            print(
-                f"Getting transactions {offset} through {offset + max_per_request - 1}."
-            )
-            transactions = asyncio.run(
-                mm.get_transactions(limit=max_per_request, offset=offset)
-            )
-            df_temp = json_to_dataframe(transactions, key=None)
-            # Handle nested structure
-            df_temp = json_to_dataframe(transactions["allTransactions"]["results"])
-            df = pd.concat([df, df_temp], ignore_index=True)
-    else:
-        transactions = asyncio.run(mm.get_transactions(limit=limit, offset=0))
-        df = json_to_dataframe(transactions["allTransactions"]["results"])
+    records = await _get_transaction_pages_async(mm, limit, concurrency, spool=spool)
+    records = _unique_by_id(records)
+    return json_to_dataframe(records, entity="transactions")
 
-    return df
 
+async def get_transactions_since_async(
+    mm: MonarchMoney,
+    start_date: str,
+    concurrency: int = DEFAULT_PAGE_CONCURRENCY,
+    spool: "CheckpointSpool | None" = None,
+) -> pd.DataFrame:
+    """
+    Retrieve transactions dated on or after a given date.
 
-def get_transaction_categories(mm: MonarchMoney) -> pd.DataFrame:
+    The first page reports the filtered total, after which the remaining
+    pages are fetched concurrently like get_transactions_async. The first
+    page is checkpointed with its total, so a resumed fetch pages through
+    the same total as the attempt it resumes.
+
+    Args:
+        mm: Authenticated MonarchMoney client.
+        start_date: Earliest transaction date in "yyyy-mm-dd" format.
+        concurrency: Maximum number of pages in flight at once.
+        spool: Optional checkpoint spool of the current run; see
+            get_transactions_async.
+
+    Returns:
+        DataFrame containing transaction data.
+    """
+    filters = _since_filters(start_date)
+    records, total = await _first_transactions_page_async(mm, filters, spool)
+
+    records += await _get_transaction_pages_async(
+        mm,
+        total,
+        concurrency,
+        start_offset=TRANSACTIONS_PAGE_SIZE,
+        spool=spool,
+        **filters,
+    )
+    records = _unique_by_id(records)
+    return json_to_dataframe(records, entity="transactions")
+
+
+async def iter_transaction_pages_async(
+    mm: MonarchMoney,
+    since: str | None = None,
+    concurrency: int = DEFAULT_PAGE_CONCURRENCY,
+    spool: "CheckpointSpool | None" = None,
+) -> AsyncIterator[list[dict]]:
+    """
+    Yield raw transaction pages in order, for streaming extraction.
+
+    Unlike get_transactions_async, pages aren't collected: each is yielded
+    as soon as it and the pages before it have arrived, with at most
+    ``concurrency`` pages prefetched. The consumer should flatten and hand
+    off each page before asking for the next.
+
+    Args:
+        mm: Authenticated MonarchMoney client.
+        since: Earliest transaction date in "yyyy-mm-dd" format; all
+            transactions if None.
+        concurrency: Maximum number of pages in flight at once.
+        spool: Optional checkpoint spool of the current run.
+
+    Yields:
+        Lists of transaction records, up to one page each. Records already
+        yielded on the page before are dropped, so a page may come up short.
+    """
+    # Offsets only shift by the transactions added or deleted while paging
+    # (or before a resume), far fewer than a page, so a record can only be duplicated on the page
+    # next to it. The IDs of the last DEDUP_PAGES pages are kept, not every
+    # ID seen.
+    recent: deque[set[str]] = deque(maxlen=DEDUP_PAGES)
+
+    def unseen(page: list[dict]) -> list[dict]:
+        fresh = [
+            record for record in page if not any(record["id"] in ids for ids in recent)
+        ]
+        recent.append({record["id"] for record in page})
+        return fresh
+
+    if since is not None:
+        filters = _since_filters(since)
+        first_page, total = await _first_transactions_page_async(mm, filters, spool)
+        yield unseen(first_page)
+        start_offset = TRANSACTIONS_PAGE_SIZE
+    else:
+        filters = {}
+        total = await get_total_transactions_async(mm)
+        start_offset = 0
+
+    async for page in _iter_transaction_pages_async(
+        mm, total, concurrency, start_offset=start_offset, spool=spool, **filters
+    ):
+        yield unseen(page)
+
+
+def _since_filters(start_date: str) -> dict[str, str]:
+    """Transaction filters for dates on or after start_date."""
+    # The API requires both bounds; leave room for future-dated transactions
+    return {
+        "start_date": start_date,
+        "end_date": (date.today() + timedelta(days=365)).isoformat(),
+    }
+
+
+async def _first_transactions_page_async(
+    mm: MonarchMoney, filters: dict, spool: "CheckpointSpool | None" = None
+) -> tuple[list[dict], int]:
+    """Fetch the first filtered page, and the total it reports."""
+    first_page, total = await _fetch_transaction_page_and_total(
+        mm, 0, TRANSACTIONS_PAGE_SIZE, spool, filters
+    )
+    print(f"Transactions since {filters['start_date']}: {total}")
+    return first_page, total
+
+
+def _unique_by_id(records: list[dict]) -> list[dict]:
+    """Drop records whose ID was already seen, keeping the first."""
+    seen = set()
+    unique = []
+    for record in records:
+        if record["id"] not in seen:
+            seen.add(record["id"])
+            unique.append(record)
+    return unique
+
+
+async def get_transaction_categories_async(mm: MonarchMoney) -> pd.DataFrame:
     """
     Retrieve transaction categories.
 
@@ -71,11 +436,12 @@ def get_transaction_categories(mm: MonarchMoney) -> pd.DataFrame:
     Returns:
         DataFrame containing category data.
     """
-    categories = asyncio.run(mm.get_transaction_categories())
-    return json_to_dataframe(categories, key="categories")
+    with span("monarch.transaction_categories"):
+        categories = await _request(mm.get_transaction_categories)
+    return json_to_dataframe(categories, key="categories", entity="categories")
 
 
-def get_transaction_tags(mm: MonarchMoney) -> pd.DataFrame:
+async def get_transaction_tags_async(mm: MonarchMoney) -> pd.DataFrame:
     """
     Retrieve transaction tags.
 
@@ -85,11 +451,12 @@ def get_transaction_tags(mm: MonarchMoney) -> pd.DataFrame:
     Returns:
         DataFrame containing tag data.
     """
-    tags = asyncio.run(mm.get_transaction_tags())
-    return json_to_dataframe(tags, key="householdTransactionTags")
+    with span("monarch.transaction_tags"):
+        tags = await _request(mm.get_transaction_tags)
+    return json_to_dataframe(tags, key="householdTransactionTags", entity="tags")
 
 
-def get_accounts(mm: MonarchMoney) -> pd.DataFrame:
+async def get_accounts_async(mm: MonarchMoney) -> pd.DataFrame:
     """
     Retrieve all accounts.
 
@@ -99,26 +466,87 @@ def get_accounts(mm: MonarchMoney) -> pd.DataFrame:
     Returns:
         DataFrame containing account data.
     """
-    accounts = asyncio.run(mm.get_accounts())
-    return json_to_dataframe(accounts, key="accounts")
+    with span("monarch.accounts"):
+        accounts = await _request(mm.get_accounts)
+    return json_to_dataframe(accounts, key="accounts", entity="accounts")
 
 
-def get_account_history(mm: MonarchMoney, account_id: str) -> pd.DataFrame:
+async def get_account_history_async(
+    mm: MonarchMoney, account_id: str, spool: "CheckpointSpool | None" = None
+) -> pd.DataFrame:
     """
     Retrieve balance history for a specific account.
 
     Args:
         mm: Authenticated MonarchMoney client.
         account_id: Account ID to get history for.
+        spool: Optional checkpoint spool of the current run; history already
+            in it isn't requested again.
 
     Returns:
         DataFrame containing account history.
     """
-    history = asyncio.run(mm.get_account_history(account_id))
-    return json_to_dataframe(history)
+    unit = f"account_history/{account_id}"
+    history = spool.get(unit) if spool is not None else None
+    if history is None:
+        with span("monarch.account_history", account_id=account_id) as history_span:
+            history = await _request(mm.get_account_history, account_id)
+            history_span.rows = len(history)
+        if spool is not None:
+            spool.put(unit, history)
+    return json_to_dataframe(history, entity="account_history")
+
+
+async def get_accounts_history_async(
+    mm: MonarchMoney,
+    account_ids: list[str],
+    concurrency: int = DEFAULT_HISTORY_CONCURRENCY,
+    since: dict[str, str] | None = None,
+    spool: "CheckpointSpool | None" = None,
+) -> pd.DataFrame:
+    """
+    Retrieve balance history for many accounts concurrently.
 
+    At most ``concurrency`` accounts are requested at once, and the
+    per-account frames are concatenated once at the end in account order.
+    The API always returns an account's full history, so ``since`` trims
+    each account to balance dates on or after its last loaded date (that
+    date is kept because the current day's balance keeps changing).
 
-def get_budgets(
+    Args:
+        mm: Authenticated MonarchMoney client.
+        account_ids: Account IDs to get history for.
+        concurrency: Maximum number of accounts in flight at once.
+        since: Optional mapping of account ID to last loaded "yyyy-mm-dd"
+            date. Accounts missing from the mapping return full history.
+        spool: Optional checkpoint spool of the current run; accounts whose
+            history is already in it aren't requested again.
+
+    Returns:
+        DataFrame containing history for all requested accounts.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    since = since or {}
+
+    async def fetch_history(account_id: str) -> pd.DataFrame:
+        async with semaphore:
+            print(f"Getting account history for account ID {account_id}.")
+            history = await get_account_history_async(mm, account_id, spool=spool)
+        last_loaded = since.get(account_id)
+        if last_loaded is not None and not history.empty:
+            history = history[history["date"] >= date.fromisoformat(last_loaded)]
+        return history
+
+    histories = await asyncio.gather(
+        *(fetch_history(account_id) for account_id in account_ids)
+    )
+    histories = [history for history in histories if not history.empty]
+    if not histories:
+        return pd.DataFrame()
+    return concat_frames(histories)
+
+
+async def get_budgets_async(
     mm: MonarchMoney,
     start_date: str | None = None,
     end_date: str | None = None,
@@ -145,7 +573,10 @@ def get_budgets(
         DataFrame containing enriched budget data with synced_at timestamp.
     """
     synced_at = datetime.now()
-    budgets = asyncio.run(mm.get_budgets(start_date=start_date, end_date=end_date))
+    with span("monarch.budgets"):
+        budgets = await _request(
+            mm.get_budgets, start_date=start_date, end_date=end_date
+        )
 
     # Build a lookup table from categoryGroups for full category details
     category_lookup = {}
@@ -187,3 +618,106 @@ def get_budgets(
     df = pd.DataFrame([budgets])
     df["synced_at"] = synced_at
     return df
+
+
+async def get_budget_facts_async(
+    mm: MonarchMoney, start_date: str, end_date: str
+) -> dict[str, pd.DataFrame]:
+    """
+    Retrieve budgets for a month window as normalized fact tables.
+
+    Args:
+        mm: Authenticated MonarchMoney client.
+        start_date: First day of the window in "yyyy-mm-dd" format.
+        end_date: Last day of the window in "yyyy-mm-dd" format.
+
+    Returns:
+        Tables from :func:`zwickfi.budgets.budget_fact_tables`, each with a
+        synced_at timestamp.
+    """
+    synced_at = datetime.now()
+    with span("monarch.budgets"):
+        budgets = await _request(
+            mm.get_budgets, start_date=start_date, end_date=end_date
+        )
+
+    with span("flatten", entity="budgets"):
+        tables = budget_fact_tables(budgets)
+    for df in tables.values():
+        df["synced_at"] = synced_at
+    return tables
+
+
+def get_total_transactions(mm: MonarchMoney) -> int:
+    """Synchronous wrapper for :func:`get_total_transactions_async`."""
+    return asyncio.run(get_total_transactions_async(mm))
+
+
+def get_transactions(
+    mm: MonarchMoney,
+    limit: int = TRANSACTIONS_PAGE_SIZE,
+    concurrency: int = DEFAULT_PAGE_CONCURRENCY,
+) -> pd.DataFrame:
+    """Synchronous wrapper for :func:`get_transactions_async`."""
+    return asyncio.run(get_transactions_async(mm, limit=limit, concurrency=concurrency))
+
+
+def get_transactions_since(
+    mm: MonarchMoney,
+    start_date: str,
+    concurrency: int = DEFAULT_PAGE_CONCURRENCY,
+) -> pd.DataFrame:
+    """Synchronous wrapper for :func:`get_transactions_since_async`."""
+    return asyncio.run(
+        get_transactions_since_async(mm, start_date=start_date, concurrency=concurrency)
+    )
+
+
+def get_transaction_categories(mm: MonarchMoney) -> pd.DataFrame:
+    """Synchronous wrapper for :func:`get_transaction_categories_async`."""
+    return asyncio.run(get_transaction_categories_async(mm))
+
+
+def get_transaction_tags(mm: MonarchMoney) -> pd.DataFrame:
+    """Synchronous wrapper for :func:`get_transaction_tags_async`."""
+    return asyncio.run(get_transaction_tags_async(mm))
+
+
+def get_accounts(mm: MonarchMoney) -> pd.DataFrame:
+    """Synchronous wrapper for :func:`get_accounts_async`."""
+    return asyncio.run(get_accounts_async(mm))
+
+
+def get_account_history(mm: MonarchMoney, account_id: str) -> pd.DataFrame:
+    """Synchronous wrapper for :func:`get_account_history_async`."""
+    return asyncio.run(get_account_history_async(mm, account_id))
+
+
+def get_accounts_history(
+    mm: MonarchMoney,
+    account_ids: list[str],
+    concurrency: int = DEFAULT_HISTORY_CONCURRENCY,
+    since: dict[str, str] | None = None,
+) -> pd.DataFrame:
+    """Synchronous wrapper for :func:`get_accounts_history_async`."""
+    return asyncio.run(
+        get_accounts_history_async(
+            mm, account_ids, concurrency=concurrency, since=since
+        )
+    )
+
+
+def get_budgets(
+    mm: MonarchMoney,
+    start_date: str | None = None,
+    end_date: str | None = None,
+) -> pd.DataFrame:
+    """Synchronous wrapper for :func:`get_budgets_async`."""
+    return asyncio.run(get_budgets_async(mm, start_date=start_date, end_date=end_date))
+
+
+def get_budget_facts(
+    mm: MonarchMoney, start_date: str, end_date: str
+) -> dict[str, pd.DataFrame]:
+    """Synchronous wrapper for :func:`get_budget_facts_async`."""
+    return asyncio.run(get_budget_facts_async(mm, start_date, end_date))
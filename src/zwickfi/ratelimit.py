@@ -0,0 +1,222 @@
+"""Adaptive rate limiting and retries for Monarch API requests.
+
+A :class:`RequestController` is shared by every request in a run. It paces
+requests with a token bucket, caps how many are in flight with a limit that
+grows while requests succeed and halves when the API pushes back (HTTP 429
+or 5xx, timeouts), and retries failed reads with jittered exponential
+backoff until a per-call deadline. Its metrics report the throughput the
+run actually achieved.
+"""
+
+import asyncio
+import os
+import random
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any, TypeVar
+
+import aiohttp
+from gql.transport.exceptions import TransportServerError
+
+T = TypeVar("T")
+
+
+class TokenBucket:
+    """
+    Allow ``rate`` acquisitions per second on average, in bursts of ``burst``.
+
+    A rate of zero or less disables pacing.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+
+    async def acquire(self) -> None:
+        """Wait until a token is available, then take it."""
+        if self.rate <= 0:
+            return
+        while True:
+            now = time.monotonic()
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class RequestController:
+    """
+    Pace, bound and retry requests made on one event loop.
+
+    The concurrency limit follows additive-increase/multiplicative-decrease:
+    each success raises it by ``1 / limit`` (about one per round of
+    requests), and each throttled or timed-out attempt halves it, within
+    ``min_concurrency`` and ``max_concurrency``.
+    """
+
+    def __init__(
+        self,
+        requests_per_second: float = 25.0,
+        max_concurrency: int = 10,
+        min_concurrency: int = 1,
+        max_attempts: int = 4,
+        base_backoff: float = 0.5,
+        max_backoff: float = 30.0,
+        deadline: float = 180.0,
+    ):
+        self.bucket = TokenBucket(requests_per_second, max(1, max_concurrency))
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.max_attempts = max_attempts
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.deadline = deadline
+
+        self.limit = float(max_concurrency)
+        self.in_flight = 0
+        self._slots: asyncio.Condition | None = None
+
+        self.started_at: float | None = None
+        self.requests = 0
+        self.successes = 0
+        self.retries = 0
+        self.throttled = 0
+        self.failures = 0
+        self.latency = 0.0
+
+    async def call(self, request: Callable[..., Awaitable[T]], *args, **kwargs) -> T:
+        """
+        Make a read request, retrying it while it fails transiently.
+
+        Only idempotent requests should be made through the controller,
+        since an attempt that timed out may still have reached the API.
+
+        Args:
+            request: Async function making the request.
+            *args: Positional arguments for request.
+            **kwargs: Keyword arguments for request.
+
+        Returns:
+            The request's result.
+
+        Raises:
+            Exception: The last attempt's error, if it wasn't transient or
+                the attempts or deadline ran out.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.deadline
+        if self.started_at is None:
+            self.started_at = time.monotonic()
+
+        attempt = 0
+        while True:
+            attempt += 1
+            await self.bucket.acquire()
+            await self._acquire_slot()
+            started = time.monotonic()
+            self.requests += 1
+            try:
+                async with asyncio.timeout_at(deadline):
+                    result = await request(*args, **kwargs)
+            except Exception as e:
+                error = e
+            else:
+                self.latency += time.monotonic() - started
+                self.successes += 1
+                self.limit = min(self.max_concurrency, self.limit + 1 / self.limit)
+                return result
+            finally:
+                await self._release_slot()
+
+            throttled = _is_throttled(error)
+            if throttled:
+                self.throttled += 1
+                self.limit = max(self.min_concurrency, self.limit / 2)
+
+            delay = random.uniform(
+                0, min(self.max_backoff, self.base_backoff * 2**attempt)
+            )
+            if (
+                not (throttled or _is_transient(error))
+                or attempt >= self.max_attempts
+                or loop.time() + delay >= deadline
+            ):
+                self.failures += 1
+                raise error
+
+            self.retries += 1
+            print(f"Retrying request in {delay:.1f}s after {type(error).__name__}")
+            await asyncio.sleep(delay)
+
+    async def _acquire_slot(self) -> None:
+        if self._slots is None:
+            self._slots = asyncio.Condition()
+        async with self._slots:
+            await self._slots.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+
+    async def _release_slot(self) -> None:
+        async with self._slots:
+            self.in_flight -= 1
+            self._slots.notify_all()
+
+    def metrics(self) -> dict[str, Any]:
+        """Request counts, final concurrency limit and achieved throughput."""
+        elapsed = time.monotonic() - self.started_at if self.started_at else 0.0
+        return {
+            "requests": self.requests,
+            "successes": self.successes,
+            "retries": self.retries,
+            "throttled": self.throttled,
+            "failures": self.failures,
+            "concurrency_limit": round(self.limit, 2),
+            "requests_per_second": (
+                round(self.successes / elapsed, 2) if elapsed else None
+            ),
+            "mean_latency_seconds": (
+                round(self.latency / self.successes, 3) if self.successes else None
+            ),
+        }
+
+
+def _is_throttled(error: Exception) -> bool:
+    """Whether the API pushed back: rate limited, overloaded or too slow."""
+    if isinstance(error, TransportServerError):
+        return error.code == 429 or (error.code or 0) >= 500
+    return isinstance(error, TimeoutError)
+
+
+def _is_transient(error: Exception) -> bool:
+    """Whether an error is worth retrying even though it isn't throttling."""
+    return isinstance(error, aiohttp.ClientConnectionError)
+
+
+def get_request_controller(max_concurrency: int = 10) -> RequestController:
+    """
+    Create a request controller configured by environment variables.
+
+    - MONARCH_REQUESTS_PER_SECOND: average request rate (default 25); 0
+      disables pacing
+    - MONARCH_MAX_ATTEMPTS: attempts per request, including the first
+      (default 4)
+    - MONARCH_CALL_DEADLINE: seconds a request may take across all its
+      attempts (default 180)
+
+    Args:
+        max_concurrency: Upper bound on requests in flight.
+
+    Returns:
+        Configured controller.
+    """
+    return RequestController(
+        requests_per_second=float(os.getenv("MONARCH_REQUESTS_PER_SECOND", "25")),
+        max_concurrency=max_concurrency,
+        max_attempts=int(os.getenv("MONARCH_MAX_ATTEMPTS", "4")),
+        deadline=float(os.getenv("MONARCH_CALL_DEADLINE", "180")),
+    )
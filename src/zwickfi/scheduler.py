@@ -0,0 +1,131 @@
+"""Dependency-aware scheduling of pipeline stages.
+
+A pipeline is a list of :class:`Stage` objects, each naming the stages it
+runs after. :func:`run_stages` starts every stage as soon as its
+dependencies have finished, so independent work overlaps and total time
+approaches the critical path. Async stages share the event loop; blocking
+stages run in worker threads. A failed stage doesn't stop the others: only
+the stages that depend on it are skipped.
+"""
+
+import asyncio
+import contextvars
+import inspect
+from collections.abc import Callable
+from concurrent.futures import Executor
+from dataclasses import dataclass, field
+from graphlib import TopologicalSorter
+from typing import Any
+
+from .instrumentation import span
+
+
+@dataclass
+class Stage:
+    """
+    One unit of pipeline work.
+
+    ``run`` is called with a mapping of finished stage names to their
+    results, and may return a value or an awaitable. Blocking stages are run
+    in a worker thread so they don't stall the event loop: in ``executor``
+    if given, e.g. a pool shared by several pipelines, or the loop's
+    default executor otherwise.
+    """
+
+    name: str
+    run: Callable[[dict[str, Any]], Any]
+    after: tuple[str, ...] = ()
+    blocking: bool = False
+    executor: Executor | None = None
+
+
+@dataclass
+class StageResults:
+    """Outcome of a pipeline run, by stage name."""
+
+    results: dict[str, Any] = field(default_factory=dict)
+    errors: dict[str, Exception] = field(default_factory=dict)
+    skipped: list[str] = field(default_factory=list)
+
+    def raise_for_errors(self) -> None:
+        """
+        Raise every stage failure together, if there were any.
+
+        Raises:
+            ExceptionGroup: If any stage failed.
+        """
+        if self.errors:
+            raise ExceptionGroup(
+                f"Pipeline stages failed: {', '.join(self.errors)}",
+                list(self.errors.values()),
+            )
+
+
+async def run_stages(stages: list[Stage]) -> StageResults:
+    """
+    Run stages concurrently, each once all of its dependencies succeed.
+
+    Each stage is timed as an instrumentation span named after it. A stage
+    whose dependency failed or was skipped is skipped too.
+
+    Args:
+        stages: Stages to run; names must be unique.
+
+    Returns:
+        Results, errors and skipped stages of the run.
+
+    Raises:
+        ValueError: If a stage depends on a stage that isn't in the list.
+        graphlib.CycleError: If the dependencies form a cycle.
+    """
+    by_name = {stage.name: stage for stage in stages}
+    for stage in stages:
+        missing = [name for name in stage.after if name not in by_name]
+        if missing:
+            raise ValueError(
+                f"Stage {stage.name!r} depends on unknown stages {missing}"
+            )
+    order = TopologicalSorter({stage.name: stage.after for stage in stages})
+
+    outcome = StageResults()
+    tasks: dict[str, asyncio.Task] = {}
+
+    async def run(stage: Stage) -> None:
+        if stage.after:
+            await asyncio.wait([tasks[name] for name in stage.after])
+        failed = [name for name in stage.after if name not in outcome.results]
+        if failed:
+            print(f"Skipping stage {stage.name}: {', '.join(failed)} did not finish")
+            outcome.skipped.append(stage.name)
+            return
+
+        inputs = dict(outcome.results)
+        try:
+            with span(stage.name):
+                if stage.blocking:
+                    result = await _run_in_thread(stage, inputs)
+                else:
+                    result = stage.run(inputs)
+                    if inspect.isawaitable(result):
+                        result = await result
+        except Exception as e:
+            print(f"Stage {stage.name} failed: {e}")
+            outcome.errors[stage.name] = e
+        else:
+            outcome.results[stage.name] = result
+
+    # Dependencies come first, so each stage can look up its dependencies' tasks
+    for name in order.static_order():
+        tasks[name] = asyncio.create_task(run(by_name[name]))
+    await asyncio.gather(*tasks.values())
+    return outcome
+
+
+async def _run_in_thread(stage: Stage, inputs: dict[str, Any]) -> Any:
+    """Run a blocking stage in its executor, keeping the current context."""
+    if stage.executor is None:
+        return await asyncio.to_thread(stage.run, inputs)
+    context = contextvars.copy_context()
+    return await asyncio.get_running_loop().run_in_executor(
+        stage.executor, context.run, stage.run, inputs
+    )
@@ -0,0 +1,230 @@
+"""Declared field specs for Monarch Money API entities.
+
+Each spec mirrors the fields selected by the monarchmoney client's GraphQL
+queries. Nested dicts describe nested objects, and leaves name the column
+type: "string", "float", "int", "bool", or "list" for values kept as-is.
+Low-cardinality strings that repeat across rows (names, types, enums) are
+declared "category", and ISO date and timestamp strings "date" and
+"timestamp", so they're held in compact dtypes rather than Python objects.
+These only change how columns are held in memory: the warehouse stores them
+as STRING, as it did before they were declared, so tables flattened from a
+spec (TABLE_FIELDS) are converted back at load.
+Flattened column names join the path with underscores, e.g.
+``category_name``.
+"""
+
+_ID_NAME = {"id": "category", "name": "category", "__typename": "category"}
+
+TRANSACTION_FIELDS = {
+    "id": "string",
+    "ownedByUser": _ID_NAME,
+    "ownershipOverriddenAt": "timestamp",
+    "amount": "float",
+    "pending": "bool",
+    "date": "date",
+    "hideFromReports": "bool",
+    "plaidName": "string",
+    "notes": "string",
+    "isRecurring": "bool",
+    "reviewStatus": "category",
+    "needsReview": "bool",
+    "attachments": "list",
+    "isSplitTransaction": "bool",
+    "createdAt": "timestamp",
+    "updatedAt": "timestamp",
+    "category": _ID_NAME,
+    "merchant": {
+        "name": "category",
+        "id": "category",
+        "transactionsCount": "int",
+        "__typename": "category",
+    },
+    "account": {
+        "id": "category",
+        "displayName": "category",
+        "__typename": "category",
+    },
+    "businessEntity": _ID_NAME,
+    "tags": "list",
+    "__typename": "category",
+}
+
+_NAME_DISPLAY = {
+    "name": "category",
+    "display": "category",
+    "__typename": "category",
+}
+
+ACCOUNT_FIELDS = {
+    "id": "string",
+    "displayName": "string",
+    "syncDisabled": "bool",
+    "deactivatedAt": "timestamp",
+    "isHidden": "bool",
+    "isAsset": "bool",
+    "mask": "string",
+    "createdAt": "timestamp",
+    "updatedAt": "timestamp",
+    "displayLastUpdatedAt": "timestamp",
+    "currentBalance": "float",
+    "displayBalance": "float",
+    "includeInNetWorth": "bool",
+    "hideFromList": "bool",
+    "hideTransactionsFromReports": "bool",
+    "includeBalanceInNetWorth": "bool",
+    "includeInGoalBalance": "bool",
+    "dataProvider": "category",
+    "dataProviderAccountId": "string",
+    "isManual": "bool",
+    "transactionsCount": "int",
+    "holdingsCount": "int",
+    "manualInvestmentsTrackingMethod": "string",
+    "order": "int",
+    "logoUrl": "string",
+    "type": _NAME_DISPLAY,
+    "subtype": _NAME_DISPLAY,
+    "credential": {
+        "id": "string",
+        "updateRequired": "bool",
+        "disconnectedFromDataProviderAt": "string",
+        "dataProvider": "string",
+        "institution": {
+            "id": "string",
+            "plaidInstitutionId": "string",
+            "name": "string",
+            "status": "string",
+            "__typename": "category",
+        },
+        "__typename": "category",
+    },
+    "institution": {
+        "id": "string",
+        "name": "string",
+        "primaryColor": "string",
+        "url": "string",
+        "__typename": "category",
+    },
+    "ownedByUser": {
+        "id": "string",
+        "displayName": "string",
+        "profilePictureUrl": "string",
+        "__typename": "category",
+    },
+    "limit": "float",
+    "dataProviderCreditLimit": "float",
+    "apr": "float",
+    "interestRate": "float",
+    "minimumPayment": "float",
+    "plannedPayment": "float",
+    "excludeFromDebtPaydown": "bool",
+    "__typename": "category",
+}
+
+CATEGORY_FIELDS = {
+    "id": "string",
+    "order": "int",
+    "name": "string",
+    "systemCategory": "string",
+    "isSystemCategory": "bool",
+    "isDisabled": "bool",
+    "updatedAt": "timestamp",
+    "createdAt": "timestamp",
+    "group": {
+        "id": "category",
+        "name": "category",
+        "type": "category",
+        "__typename": "category",
+    },
+    "__typename": "category",
+}
+
+TAG_FIELDS = {
+    "id": "string",
+    "name": "string",
+    "color": "string",
+    "order": "int",
+    "transactionCount": "int",
+    "__typename": "category",
+}
+
+ACCOUNT_HISTORY_FIELDS = {
+    "date": "date",
+    "signedBalance": "float",
+    "__typename": "category",
+    "accountId": "category",
+    "accountName": "category",
+}
+
+BUDGET_MONTH_FIELDS = {
+    "month": "string",
+    "plannedCashFlowAmount": "float",
+    "plannedSetAsideAmount": "float",
+    "actualAmount": "float",
+    "remainingAmount": "float",
+    "previousMonthRolloverAmount": "float",
+    "rolloverType": "category",
+    "__typename": "category",
+}
+
+GOAL_FIELDS = {
+    "id": "string",
+    "name": "string",
+    "archivedAt": "timestamp",
+    "completedAt": "timestamp",
+    "priority": "int",
+    "imageStorageProvider": "string",
+    "imageStorageProviderId": "string",
+    "__typename": "category",
+}
+
+GOAL_PLANNED_CONTRIBUTION_FIELDS = {
+    "id": "string",
+    "month": "string",
+    "amount": "float",
+    "__typename": "category",
+}
+
+GOAL_CONTRIBUTION_SUMMARY_FIELDS = {
+    "month": "string",
+    "sum": "float",
+    "__typename": "category",
+}
+
+ENTITY_FIELDS = {
+    "transactions": TRANSACTION_FIELDS,
+    "accounts": ACCOUNT_FIELDS,
+    "categories": CATEGORY_FIELDS,
+    "tags": TAG_FIELDS,
+    "account_history": ACCOUNT_HISTORY_FIELDS,
+}
+
+# Field spec each monarch_money table is flattened with
+TABLE_FIELDS = {
+    "transactions": TRANSACTION_FIELDS,
+    "transaction_categories": CATEGORY_FIELDS,
+    "transaction_tags": TAG_FIELDS,
+    "accounts": ACCOUNT_FIELDS,
+    "account_balance_history": ACCOUNT_HISTORY_FIELDS,
+    "budget_goals": GOAL_FIELDS,
+}
+
+# monarch_money tables the pipeline extracts, in load order
+MONARCH_TABLES = (
+    "transactions",
+    "transaction_categories",
+    "transaction_tags",
+    "accounts",
+    "budgets",
+    "account_balance_history",
+)
+
+# Small, rarely changing tables that are only reloaded when their content
+# differs from the last load
+DIMENSION_TABLES = ("transaction_categories", "transaction_tags", "accounts")
+
+# Columns of a table that change on every Monarch refresh without its data
+# changing, ignored when deciding whether the table is unchanged (synced_at
+# is ignored in every table)
+TABLE_VOLATILE_COLUMNS = {
+    "accounts": ("updatedAt", "displayLastUpdatedAt"),
+}
@@ -0,0 +1,145 @@
+"""HTTP service mode: run a sync per request in one long-lived process.
+
+Started with ``python -m zwickfi serve``. Modules stay imported and the
+BigQuery and Monarch clients stay authenticated between requests, so a
+warm request goes straight to extraction. A GET or POST to ``/`` runs a
+sync and returns its JSON summary; a request that arrives while a sync is
+running gets 409 Conflict instead of starting an overlapping run.
+``/healthz`` reports whether a sync is in progress, and any other path gets
+404 Not Found.
+"""
+
+import json
+import os
+import threading
+import traceback
+import uuid
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from . import cli
+from .auth import get_bigquery_client, get_monarch_client
+
+
+class SyncService:
+    """Warm clients shared by every request, and a lock against overlap."""
+
+    def __init__(self):
+        self.bq_client = None
+        self.mm = None
+        self._running = threading.Lock()
+
+    @property
+    def busy(self) -> bool:
+        return self._running.locked()
+
+    def run(self) -> tuple[HTTPStatus, dict]:
+        """
+        Run one sync unless another is in progress.
+
+        Clients are authenticated on the first run and reused after that;
+        the Monarch client logs in again by itself if its session expires.
+
+        Returns:
+            HTTP status and JSON-serializable response body.
+        """
+        if not self._running.acquire(blocking=False):
+            return HTTPStatus.CONFLICT, {
+                "status": "busy",
+                "error": "A sync is already running",
+            }
+
+        run_id = uuid.uuid4().hex
+        try:
+            if self.bq_client is None:
+                self.bq_client = get_bigquery_client()
+            if self.mm is None:
+                self.mm = get_monarch_client()
+            summary = cli.sync(self.bq_client, self.mm, run_id=run_id)
+            return HTTPStatus.OK, summary
+        except Exception as e:
+            traceback.print_exc()
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {
+                "run_id": run_id,
+                "status": "error",
+                "error": f"{type(e).__name__}: {e}",
+            }
+        finally:
+            self._running.release()
+
+
+class SyncRequestHandler(BaseHTTPRequestHandler):
+    """Route requests to the server's SyncService."""
+
+    server: "SyncServer"
+
+    def do_GET(self):
+        if self._route() == "/healthz":
+            self._respond(HTTPStatus.OK, {"status": "ok", "busy": self.server.busy})
+        elif self._route() == "/":
+            self._respond(*self.server.service.run())
+        else:
+            self._not_found()
+
+    def do_POST(self):
+        if self._route() == "/":
+            self._respond(*self.server.service.run())
+        else:
+            self._not_found()
+
+    def _route(self) -> str:
+        return self.path.split("?", 1)[0]
+
+    def _not_found(self) -> None:
+        self._respond(HTTPStatus.NOT_FOUND, {"status": "error", "error": "Not found"})
+
+    def _respond(self, status: HTTPStatus, body: dict) -> None:
+        data = json.dumps(body, default=str).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class SyncServer(ThreadingHTTPServer):
+    """
+    Threaded HTTP server holding one SyncService.
+
+    Requests are handled on their own threads so that an overlapping request
+    is rejected right away rather than queued behind the running sync.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], service: SyncService | None = None):
+        super().__init__(address, SyncRequestHandler)
+        self.service = service or SyncService()
+
+    @property
+    def busy(self) -> bool:
+        return self.service.busy
+
+
+def serve(host: str = "", port: int = 8080) -> None:
+    """
+    Serve syncs over HTTP until interrupted.
+
+    The stage modules, and Prophet when it's the forecast engine, are
+    imported up front so the first request doesn't pay for them.
+
+    Args:
+        host: Interface to bind; all interfaces by default.
+        port: Port to listen on.
+    """
+    from . import bigquery, forecasts, monarch  # noqa: F401
+
+    if os.getenv("FORECAST_ENGINE", "prophet") == "prophet":
+        import prophet  # noqa: F401
+
+    with SyncServer((host, port)) as server:
+        print(f"Serving zwickfi syncs on port {server.server_address[1]}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,147 @@
+"""Local checkpoints of fetched API pages, so a failed run can resume.
+
+Each unit of extraction work (a transactions page, an account's history) is
+written to the spool as soon as it arrives, under the run's ID. Rerunning
+with the same run ID reads finished units back instead of requesting them
+again, so only the work that hadn't finished is repeated.
+
+Checkpoints hold raw financial records, so they're encrypted with the same
+key material as the Monarch session cache (see zwickfi.auth).
+"""
+
+import io
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from cryptography.fernet import Fernet, InvalidToken
+
+from .auth import SALT_BYTES, derive_fernet
+
+
+class CheckpointSpool:
+    """
+    Encrypted Parquet files of raw API records for one run, one per unit.
+
+    Records are stored as JSON strings in a single column, so they're read
+    back exactly as the API returned them. Each file is the Fernet token of
+    the compressed Parquet data, under a key derived from ``secret`` and a
+    salt kept in the run's directory; the key is derived once per spool,
+    not per unit. Files are only readable by the current user and are
+    written to a temporary name and renamed, so a unit is either complete
+    or missing.
+    """
+
+    def __init__(self, directory: str | Path, run_id: str, secret: str):
+        self.root = Path(directory).expanduser()
+        self.run_id = run_id
+        self.directory = self.root / run_id
+        self._secret = secret
+        self._cipher: Fernet | None = None
+
+    def _path(self, unit: str) -> Path:
+        return self.directory / f"{unit}.parquet.enc"
+
+    def _fernet(self) -> Fernet:
+        """Derive the run's cipher, creating its salt on first use."""
+        if self._cipher is None:
+            salt_path = self.directory / "salt"
+            try:
+                salt = salt_path.read_bytes()
+            except FileNotFoundError:
+                salt = os.urandom(SALT_BYTES)
+                _write_private(salt_path, salt)
+            self._cipher = derive_fernet(self._secret, salt)
+        return self._cipher
+
+    def get(self, unit: str) -> list | None:
+        """Return the records spooled for unit, or None if it isn't done."""
+        try:
+            token = self._path(unit).read_bytes()
+        except FileNotFoundError:
+            return None
+        try:
+            data = self._fernet().decrypt(token)
+        except InvalidToken:
+            print(f"Ignoring checkpoint {unit} of run {self.run_id}: wrong key")
+            return None
+        table = pq.read_table(io.BytesIO(data))
+        return [json.loads(record) for record in table.column("record").to_pylist()]
+
+    def put(self, unit: str, records: list) -> None:
+        """Spool a finished unit's records."""
+        table = pa.table({"record": [json.dumps(record) for record in records]})
+        buffer = io.BytesIO()
+        pq.write_table(table, buffer, compression="zstd")
+        _write_private(self._path(unit), self._fernet().encrypt(buffer.getvalue()))
+
+    def clear(self) -> None:
+        """Remove this run's checkpoints once it no longer needs them."""
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def evict(self, max_age_seconds: float) -> None:
+        """Remove the checkpoints of other runs untouched for max_age_seconds."""
+        if not self.root.is_dir():
+            return
+        now = time.time()
+        for run_directory in self.root.iterdir():
+            if run_directory == self.directory:
+                continue
+            try:
+                modified = run_directory.stat().st_mtime
+            except FileNotFoundError:
+                continue
+            if now - modified > max_age_seconds:
+                shutil.rmtree(run_directory, ignore_errors=True)
+
+
+def _write_private(path: Path, data: bytes) -> None:
+    """Write a file only the current user can read, replacing it atomically."""
+    path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    # The mode given to open only applies to new files, so a temp file
+    # left by a crashed run is restricted explicitly
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "wb") as f:
+        os.fchmod(fd, 0o600)
+        f.write(data)
+    tmp_path.replace(path)
+
+
+def get_checkpoint_spool(run_id: str) -> CheckpointSpool | None:
+    """
+    Create the checkpoint spool for a run, configured by environment variables.
+
+    Spools of abandoned runs are evicted as a side effect.
+
+    - SPOOL_DIR: spool directory (default ~/.cache/zwickfi/spool); set to an
+      empty string to disable checkpointing
+    - SPOOL_MAX_AGE_DAYS: evict other runs' spools this old (default 7)
+    - MONARCH_SESSION_KEY, or else MONARCH_PASSWORD: secret the encryption
+      key is derived from, as for the session cache; checkpointing is
+      disabled when neither is set, rather than spooling in plain text
+
+    Args:
+        run_id: ID of the run to checkpoint.
+
+    Returns:
+        Configured spool, or None if checkpointing is disabled.
+    """
+    directory = os.getenv(
+        "SPOOL_DIR", str(Path.home() / ".cache" / "zwickfi" / "spool")
+    )
+    if not directory:
+        return None
+    secret = os.getenv("MONARCH_SESSION_KEY") or os.getenv("MONARCH_PASSWORD")
+    if not secret:
+        print("No MONARCH_SESSION_KEY or MONARCH_PASSWORD to encrypt checkpoints")
+        return None
+
+    spool = CheckpointSpool(directory, run_id, secret)
+    max_age_days = float(os.getenv("SPOOL_MAX_AGE_DAYS", "7"))
+    spool.evict(max_age_days * 24 * 3600)
+    return spool
@@ -0,0 +1,254 @@
+"""Each entity's last successful sync, so entities still fresh can be skipped.
+
+A freshness policy gives each entity (a monarch_money table, or "forecast")
+how long its last sync stays fresh. A full sync only runs the entities whose
+policy has lapsed; the rest keep what's loaded. The state lives in a local
+JSON file, or in a BigQuery table when runs don't share a disk (e.g. Cloud
+Run), and is scoped per target dataset so batch households don't share it.
+"""
+
+import json
+import os
+import re
+import threading
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from typing import Protocol
+
+# How long each entity stays fresh unless SYNC_FRESHNESS says otherwise;
+# entities not listed are synced on every run
+DEFAULT_FRESHNESS = {
+    "transaction_categories": timedelta(days=1),
+    "transaction_tags": timedelta(days=1),
+    "budgets": timedelta(hours=6),
+    "forecast": timedelta(days=1),
+}
+
+_DURATION_UNITS = {"s": "seconds", "m": "minutes", "h": "hours", "d": "days"}
+
+# Slack for scheduled runs that start a little sooner after the last sync
+# than its policy, e.g. an hourly run whose predecessor logged in slowly;
+# capped at a tenth of the policy
+FRESHNESS_GRACE = timedelta(minutes=5)
+
+# Serializes read-modify-write of state files by concurrent syncs
+_file_lock = threading.Lock()
+
+
+class SyncState(Protocol):
+    """Storage backend for the last successful sync of each entity."""
+
+    def last_synced(self) -> dict[str, datetime]:
+        """Return when each entity last synced successfully."""
+        ...
+
+    def record(self, entities: list[str], synced_at: datetime) -> None:
+        """Record that entities synced successfully at synced_at."""
+        ...
+
+
+class LocalSyncState:
+    """Sync state in a local JSON file, shared by every scope."""
+
+    def __init__(self, path: str | Path, scope: str):
+        self.path = Path(path).expanduser()
+        self.scope = scope
+
+    def _read(self) -> dict:
+        try:
+            return json.loads(self.path.read_text())
+        except FileNotFoundError:
+            return {}
+
+    def last_synced(self) -> dict[str, datetime]:
+        entries = self._read().get(self.scope, {})
+        return {entity: datetime.fromisoformat(at) for entity, at in entries.items()}
+
+    def record(self, entities: list[str], synced_at: datetime) -> None:
+        with _file_lock:
+            state = self._read()
+            entries = state.setdefault(self.scope, {})
+            entries.update({entity: synced_at.isoformat() for entity in entities})
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(".tmp")
+            tmp_path.write_text(json.dumps(state, indent=2, sort_keys=True))
+            tmp_path.replace(self.path)
+
+
+class BigQuerySyncState:
+    """
+    Sync state as rows appended to a BigQuery table.
+
+    Each successful sync appends (scope, entity, synced_at) rows, and the
+    latest row per entity is read back, so concurrent writers never
+    conflict.
+    """
+
+    def __init__(self, client, table: str, scope: str, project: str = "zwickfi"):
+        self.client = client
+        self.dataset, self.table_name = table.split(".", 1)
+        self.scope = scope
+        self.project = project
+
+    def last_synced(self) -> dict[str, datetime]:
+        from google.api_core.exceptions import NotFound
+        from google.cloud import bigquery
+
+        table_id = f"{self.project}.{self.dataset}.{self.table_name}"
+        try:
+            self.client.get_table(table_id)
+        except NotFound:
+            return {}
+
+        query = (
+            "SELECT entity, MAX(synced_at) AS synced_at "
+            f"FROM `{table_id}` WHERE scope = @scope GROUP BY entity"
+        )
+        job_config = bigquery.QueryJobConfig(
+            query_parameters=[
+                bigquery.ScalarQueryParameter("scope", "STRING", self.scope)
+            ]
+        )
+        rows = self.client.query(query, job_config=job_config).result()
+        return {row.entity: row.synced_at for row in rows}
+
+    def record(self, entities: list[str], synced_at: datetime) -> None:
+        import pandas as pd
+
+        from . import bigquery
+
+        rows = pd.DataFrame(
+            {
+                "scope": self.scope,
+                "entity": entities,
+                "synced_at": pd.Series([synced_at] * len(entities)),
+            }
+        )
+        bigquery.write_to_bigquery(
+            rows,
+            self.dataset,
+            self.table_name,
+            self.client,
+            project=self.project,
+            write_disposition="WRITE_APPEND",
+        )
+
+
+def parse_freshness(spec: str) -> dict[str, timedelta]:
+    """
+    Parse a freshness policy such as "accounts=1h,budgets=6h,forecast=1d".
+
+    Durations are a number followed by s, m, h or d; a bare number is
+    seconds, and 0 syncs the entity on every run.
+
+    Args:
+        spec: Comma-separated entity=duration pairs.
+
+    Returns:
+        Freshness per entity.
+
+    Raises:
+        ValueError: If a pair or duration is malformed.
+    """
+    freshness = {}
+    for pair in filter(None, (part.strip() for part in spec.split(","))):
+        entity, _, duration = pair.partition("=")
+        match = re.fullmatch(r"(\d+(?:\.\d+)?)([smhd]?)", duration.strip())
+        if not entity.strip() or match is None:
+            raise ValueError(f"Invalid freshness policy {pair!r}; expected entity=6h")
+        amount, unit = match.groups()
+        freshness[entity.strip()] = timedelta(
+            **{_DURATION_UNITS[unit or "s"]: float(amount)}
+        )
+    return freshness
+
+
+def get_freshness() -> dict[str, timedelta]:
+    """
+    Freshness policies, from DEFAULT_FRESHNESS overridden by SYNC_FRESHNESS.
+
+    SYNC_FRESHNESS is parsed with parse_freshness, e.g.
+    "accounts=1h,budgets=6h,forecast=1d".
+    """
+    return {
+        **DEFAULT_FRESHNESS,
+        **parse_freshness(os.getenv("SYNC_FRESHNESS", "")),
+    }
+
+
+def stale_entities(
+    state: SyncState,
+    entities: list[str],
+    freshness: dict[str, timedelta],
+    now: datetime | None = None,
+) -> list[str]:
+    """
+    Select the entities due for a sync under their freshness policies.
+
+    Policies of whole days follow the calendar: a 1d entity is due on the
+    first run of each local day, however close to the previous day's sync,
+    so a scheduled run that starts a little earlier than yesterday's isn't
+    skipped. Other policies compare the time since the last sync, which
+    counts as lapsed up to FRESHNESS_GRACE early for the same reason.
+
+    Args:
+        state: Sync state to read last syncs from.
+        entities: Candidate entities, in order.
+        freshness: How long each entity stays fresh; missing entities are
+            always due.
+        now: Current time; defaults to now in UTC.
+
+    Returns:
+        The entities whose last sync is older than their freshness, or
+        that have never synced.
+    """
+    now = now or datetime.now(UTC)
+    last_synced = state.last_synced()
+    return [
+        entity
+        for entity in entities
+        if entity not in last_synced
+        or _lapsed(last_synced[entity], now, freshness.get(entity, timedelta(0)))
+    ]
+
+
+def _lapsed(last: datetime, now: datetime, freshness: timedelta) -> bool:
+    """Whether a sync at last is no longer fresh at now."""
+    if freshness and freshness % timedelta(days=1) == timedelta(0):
+        # Local dates, like the run_date forecasts are partitioned by
+        days = (now.astimezone().date() - last.astimezone().date()).days
+        return days >= freshness.days
+    return now - last >= freshness - min(FRESHNESS_GRACE, freshness / 10)
+
+
+def get_sync_state(
+    bq_client, dataset: str = "monarch_money", project: str = "zwickfi"
+) -> SyncState | None:
+    """
+    Create the sync state store configured by environment variables.
+
+    - SYNC_STATE_TABLE: "dataset.table" in the sync's project to keep state
+      in BigQuery, for runs that don't share a disk
+    - SYNC_STATE_FILE: local state file otherwise
+      (default ~/.cache/zwickfi/sync_state.json); set both to empty
+      strings to sync every entity on every run
+
+    Args:
+        bq_client: Authenticated BigQuery client, used by the table store.
+        dataset: Target dataset of the sync, which scopes its state.
+        project: GCP project of that dataset.
+
+    Returns:
+        Configured store, or None if sync state is disabled.
+    """
+    scope = f"{project}.{dataset}"
+    table = os.getenv("SYNC_STATE_TABLE", "")
+    if table:
+        return BigQuerySyncState(bq_client, table, scope, project)
+
+    path = os.getenv(
+        "SYNC_STATE_FILE", str(Path.home() / ".cache" / "zwickfi" / "sync_state.json")
+    )
+    if not path:
+        return None
+    return LocalSyncState(path, scope)
@@ -1,6 +1,22 @@
 """Shared utility functions."""
 
 import pandas as pd
+import pyarrow as pa
+from pandas.api.types import union_categoricals
+
+from .instrumentation import span
+from .schemas import ENTITY_FIELDS
+
+_ARROW_TYPES = {
+    "string": pa.string(),
+    "float": pa.float64(),
+    "int": pa.int64(),
+    "bool": pa.bool_(),
+}
+
+# Nullable pandas dtypes, so that nulls don't widen ints to float or bools
+# to object
+_NULLABLE_TYPES = {pa.int64(): pd.Int64Dtype(), pa.bool_(): pd.BooleanDtype()}
 
 
 def normalize_dataframe(df: pd.DataFrame) -> pd.DataFrame:
@@ -18,18 +34,179 @@ def normalize_dataframe(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
-def json_to_dataframe(data: dict | list, key: str | None = None) -> pd.DataFrame:
+def json_to_dataframe(
+    data: dict | list, key: str | None = None, entity: str | None = None
+) -> pd.DataFrame:
     """
     Convert JSON data to a normalized DataFrame.
 
     Args:
         data: JSON data (dict or list).
         key: Optional key to extract from dict before normalizing.
+        entity: Optional entity name from schemas.ENTITY_FIELDS. Known
+            entities are flattened with flatten_records; others go through
+            pd.json_normalize.
 
     Returns:
         Normalized DataFrame.
     """
     if key is not None:
         data = data[key]
-    df = pd.json_normalize(data)
-    return normalize_dataframe(df)
+    with span("flatten", entity=entity) as flatten_span:
+        if entity is not None:
+            df = flatten_records(data, ENTITY_FIELDS[entity])
+        else:
+            df = normalize_dataframe(pd.json_normalize(data))
+        flatten_span.rows = len(df)
+    return df
+
+
+def concat_frames(frames: list[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Concatenate frames, keeping categorical columns categorical.
+
+    pd.concat turns categoricals into objects unless every frame has the
+    same categories, so the categories of each column are unioned first.
+
+    Args:
+        frames: Frames to concatenate, in order.
+
+    Returns:
+        Concatenated frame with a fresh index.
+    """
+    columns = {column for frame in frames for column in frame.columns}
+    for column in columns:
+        series = [frame[column] for frame in frames if column in frame]
+        if not all(isinstance(s.dtype, pd.CategoricalDtype) for s in series):
+            continue
+        categories = union_categoricals(series, ignore_order=True).categories
+        frames = [
+            frame.assign(**{column: frame[column].cat.set_categories(categories)})
+            if column in frame
+            else frame
+            for frame in frames
+        ]
+    return pd.concat(frames, ignore_index=True)
+
+
+def flatten_records(records: list[dict], fields: dict) -> pd.DataFrame:
+    """
+    Flatten JSON records into typed columns using a declared field spec.
+
+    Each declared field is gathered across all records with a single list
+    comprehension, reusing the parent object's values for nested fields, and
+    built directly as a typed Arrow array. Fields the spec doesn't declare
+    are collected per record and flattened with pd.json_normalize, so new
+    API fields still come through.
+
+    Args:
+        records: List of JSON objects.
+        fields: Field spec, as described in the schemas module.
+
+    Returns:
+        DataFrame with underscore-joined column names.
+    """
+    columns: dict[str, pd.Series] = {}
+    extras: dict[int, dict] = {}
+    _collect_columns(records, fields, (), columns, extras)
+
+    df = pd.DataFrame(columns, index=pd.RangeIndex(len(records)))
+    if extras:
+        unknown = pd.json_normalize([extras.get(i, {}) for i in range(len(records))])
+        df = pd.concat([df, normalize_dataframe(unknown)], axis=1)
+    return df
+
+
+def _collect_columns(
+    objects: list[dict | None],
+    fields: dict,
+    path: tuple[str, ...],
+    columns: dict[str, pd.Series],
+    extras: dict[int, dict],
+) -> None:
+    """Gather the columns of one level of a field spec, recursing into objects."""
+    for name, kind in fields.items():
+        values = [obj.get(name) if obj is not None else None for obj in objects]
+        if isinstance(kind, dict):
+            children = [value if isinstance(value, dict) else None for value in values]
+            _collect_columns(children, kind, (*path, name), columns, extras)
+        else:
+            columns["_".join((*path, name))] = _typed_column(values, kind)
+
+    known = frozenset(fields)
+    for i, obj in enumerate(objects):
+        if obj is not None and not known.issuperset(obj):
+            extra = extras.setdefault(i, {})
+            for name in obj.keys() - known:
+                extra[".".join((*path, name))] = obj[name]
+
+
+def _typed_column(values: list, kind: str) -> pd.Series:
+    """
+    Build a column of a declared type, falling back to inference.
+
+    Columns are built in a compact form: "category" strings as
+    categoricals, "date" strings as Arrow dates, and "timestamp" strings as
+    UTC datetimes. "int" is always nullable Int64, so every batch of an
+    entity gets the same column types whatever its values.
+    """
+    try:
+        if kind in ("category", "date"):
+            array = pa.array(values, type=pa.string())
+            if kind == "date":
+                return array.cast(pa.date32()).to_pandas(types_mapper=pd.ArrowDtype)
+            if array.null_count == len(array):
+                # No categories to type the column by; keep it a string
+                return array.to_pandas()
+            return array.dictionary_encode().to_pandas()
+        if kind == "timestamp":
+            timestamps = pd.to_datetime(values, utc=True, format="ISO8601")
+            return pd.Series(timestamps.as_unit("us"))
+        if kind in _ARROW_TYPES:
+            return pa.array(values, type=_ARROW_TYPES[kind]).to_pandas(
+                types_mapper=_NULLABLE_TYPES.get
+            )
+    except (pa.ArrowInvalid, pa.ArrowTypeError, TypeError, ValueError):
+        pass
+    return pd.Series(values, dtype=object if kind == "list" else None)
+
+
+def to_stored_types(df: pd.DataFrame, fields: dict) -> pd.DataFrame:
+    """
+    Convert a flattened frame's date and timestamp columns back to strings.
+
+    The warehouse stores "date" and "timestamp" fields as the ISO 8601
+    strings the API returns, so loads keep the existing column types. Dates
+    are written as yyyy-mm-dd and timestamps in Python's isoformat, the
+    form Monarch returns them in. Columns whose values couldn't be parsed
+    are still the original strings and are left as they are.
+
+    Args:
+        df: Frame built by flatten_records.
+        fields: Field spec it was built with.
+
+    Returns:
+        Frame with those columns as strings.
+    """
+    converted = {}
+    for column in _columns_of_kind(fields, ("date", "timestamp")):
+        if column in df and isinstance(
+            df[column].dtype, (pd.ArrowDtype, pd.DatetimeTZDtype)
+        ):
+            converted[column] = df[column].map(
+                lambda value: value.isoformat(), na_action="ignore"
+            )
+    return df.assign(**converted) if converted else df
+
+
+def _columns_of_kind(
+    fields: dict, kinds: tuple[str, ...], path: tuple[str, ...] = ()
+) -> list[str]:
+    """Get the flattened names of a field spec's columns of the given kinds."""
+    columns = []
+    for name, kind in fields.items():
+        if isinstance(kind, dict):
+            columns += _columns_of_kind(kind, kinds, (*path, name))
+        elif kind in kinds:
+            columns.append("_".join((*path, name)))
+    return columns
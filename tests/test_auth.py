@@ -0,0 +1,144 @@
+"""Offline tests for Monarch session caching and re-login."""
+
+import asyncio
+from unittest import mock
+
+import pytest
+from gql.transport.exceptions import TransportServerError
+from monarchmoney import MonarchMoney
+
+from zwickfi.auth import EncryptedFileSessionStore, SessionMonarchMoney
+
+
+class MemoryStore:
+    """In-memory SessionStore."""
+
+    def __init__(self, session=None):
+        self.session = session
+
+    def load(self):
+        return self.session
+
+    def save(self, session):
+        self.session = session
+
+    def clear(self):
+        self.session = None
+
+
+@pytest.fixture
+def client_factory():
+    def make(store, valid_tokens):
+        mm = SessionMonarchMoney("me@example.com", "pw", "totp", session_store=store)
+        mm.logins = 0
+
+        async def login(**kwargs):
+            mm.logins += 1
+            mm.set_token(f"fresh-{mm.logins}")
+
+        async def gql_call(self, operation, graphql_query, variables=None):
+            await asyncio.sleep(0)
+            if self.token not in valid_tokens and not self.token.startswith("fresh"):
+                raise TransportServerError("Unauthorized", 401)
+            return {"operation": operation}
+
+        mm.login = login
+        patcher = mock.patch.object(MonarchMoney, "gql_call", gql_call)
+        patcher.start()
+        return mm, patcher
+
+    return make
+
+
+class TestEncryptedFileSessionStore:
+    """Test the encrypted local session file."""
+
+    def test_round_trip(self, tmp_path):
+        store = EncryptedFileSessionStore(tmp_path / "session.enc", "secret")
+        store.save({"token": "abc"})
+
+        assert store.load() == {"token": "abc"}
+        assert b"abc" not in (tmp_path / "session.enc").read_bytes()
+        assert (tmp_path / "session.enc").stat().st_mode & 0o077 == 0
+
+    def test_leftover_temp_file_is_restricted(self, tmp_path):
+        leftover = tmp_path / "session.tmp"
+        leftover.write_bytes(b"partial")
+        leftover.chmod(0o644)
+
+        EncryptedFileSessionStore(tmp_path / "session.enc", "secret").save(
+            {"token": "abc"}
+        )
+
+        assert (tmp_path / "session.enc").stat().st_mode & 0o077 == 0
+
+    def test_wrong_secret_is_a_miss(self, tmp_path):
+        EncryptedFileSessionStore(tmp_path / "session.enc", "secret").save(
+            {"token": "abc"}
+        )
+
+        store = EncryptedFileSessionStore(tmp_path / "session.enc", "other")
+
+        assert store.load() is None
+
+    def test_missing_file_is_a_miss(self, tmp_path):
+        assert EncryptedFileSessionStore(tmp_path / "none.enc", "s").load() is None
+
+
+class TestSessionMonarchMoney:
+    """Test session reuse and transparent re-login."""
+
+    def test_reuses_valid_cached_token(self, client_factory):
+        mm, patcher = client_factory(MemoryStore({"token": "cached"}), {"cached"})
+        try:
+            asyncio.run(mm.start_session())
+        finally:
+            patcher.stop()
+
+        assert mm.logins == 0
+        assert mm.token == "cached"
+
+    def test_logs_in_when_cached_token_expired(self, client_factory):
+        store = MemoryStore({"token": "expired"})
+        mm, patcher = client_factory(store, set())
+        try:
+            asyncio.run(mm.start_session())
+        finally:
+            patcher.stop()
+
+        assert mm.logins == 1
+        assert store.session == {"token": "fresh-1"}
+
+    def test_logs_in_when_session_check_fails(self, client_factory):
+        store = MemoryStore({"token": "cached"})
+        mm, patcher = client_factory(store, {"cached"})
+
+        async def unavailable(self, operation, graphql_query, variables=None):
+            if operation == "GetSessionCheck":
+                raise TransportServerError("Service Unavailable", 503)
+            return {"operation": operation}
+
+        try:
+            with mock.patch.object(MonarchMoney, "gql_call", unavailable):
+                asyncio.run(mm.start_session())
+        finally:
+            patcher.stop()
+
+        assert mm.logins == 1
+        assert store.session == {"token": "fresh-1"}
+
+    def test_401_mid_run_relogs_in_once(self, client_factory):
+        mm, patcher = client_factory(MemoryStore({"token": "cached"}), {"cached"})
+
+        async def run():
+            await mm.start_session()
+            mm.set_token("revoked")
+            return await asyncio.gather(*(mm.gql_call("Op", None) for _ in range(5)))
+
+        try:
+            results = asyncio.run(run())
+        finally:
+            patcher.stop()
+
+        assert mm.logins == 1
+        assert results == [{"operation": "Op"}] * 5
@@ -0,0 +1,388 @@
+"""Offline tests for BigQuery loading helpers."""
+
+from datetime import date
+from unittest import mock
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+from google.api_core.exceptions import NotFound
+
+from zwickfi import bigquery
+from zwickfi.schemas import ACCOUNT_FIELDS, TRANSACTION_FIELDS
+from zwickfi.utils import flatten_records
+
+
+class TestMergeStatement:
+    """Test the MERGE used for incremental upserts."""
+
+    def test_updates_and_inserts_on_key(self):
+        sql = bigquery._merge_statement(
+            "p.d.t", "p.d.t__staging", ["id", "amount", "date"], "id"
+        )
+
+        assert "MERGE `p.d.t` T USING `p.d.t__staging` S ON T.`id` = S.`id`" in sql
+        assert "UPDATE SET `amount` = S.`amount`, `date` = S.`date`" in sql
+        assert "`id` = S.`id`," not in sql
+        assert "INSERT (`id`, `amount`, `date`)" in sql
+
+    def test_composite_key(self):
+        sql = bigquery._merge_statement(
+            "p.d.t",
+            "p.d.t__staging",
+            ["accountId", "date", "balance"],
+            ["accountId", "date"],
+        )
+
+        assert "ON T.`accountId` = S.`accountId` AND T.`date` = S.`date`" in sql
+        assert "UPDATE SET `balance` = S.`balance` " in sql
+
+
+class TestReplaceMonthWindow:
+    """Test month-window replacement of budget fact tables."""
+
+    def test_statement_deletes_only_window(self):
+        sql = bigquery._window_statement(
+            "p.d.t", "p.d.t__staging", ["categoryId", "month"]
+        )
+
+        assert "ON FALSE" in sql
+        assert "INSERT (`categoryId`, `month`)" in sql
+        assert "BETWEEN @start_date AND @end_date THEN DELETE" in sql
+
+    def test_missing_table_is_created_partitioned(self):
+        client = mock.Mock()
+        client.get_table.side_effect = NotFound("missing")
+        df = pd.DataFrame({"month": [pd.Timestamp("2024-01-01").date()]})
+
+        with mock.patch.object(bigquery, "write_to_bigquery") as write:
+            bigquery.replace_month_window(
+                df, "d", "t", client, "2024-01-01", "2024-01-31"
+            )
+
+        partitioning = write.call_args.kwargs["time_partitioning"]
+        assert partitioning.field == "month"
+        assert partitioning.type_ == "MONTH"
+        client.query.assert_not_called()
+
+
+class TestReplacePartition:
+    """Test run-date partition replacement of the forecast table."""
+
+    @pytest.fixture
+    def df(self):
+        return pd.DataFrame(
+            {"account_name": ["Card A"], "run_date": [date(2024, 1, 31)]}
+        )
+
+    def test_missing_table_is_created_partitioned_and_clustered(self, df):
+        client = mock.Mock()
+        client.get_table.side_effect = NotFound("missing")
+
+        with mock.patch.object(bigquery, "write_to_bigquery") as write:
+            bigquery.replace_partition(
+                df,
+                "d",
+                "t",
+                client,
+                date(2024, 1, 31),
+                "run_date",
+                clustering_fields=["account_name"],
+                expiration_days=30,
+            )
+
+        partitioning = write.call_args.kwargs["time_partitioning"]
+        assert partitioning.field == "run_date"
+        assert partitioning.type_ == "DAY"
+        assert partitioning.expiration_ms == 30 * 24 * 3600 * 1000
+        assert write.call_args.kwargs["clustering_fields"] == ["account_name"]
+
+    def test_existing_table_truncates_only_the_run_date_partition(self, df):
+        client = mock.Mock()
+        client.get_table.return_value.time_partitioning = (
+            bigquery.bigquery.TimePartitioning(field="run_date")
+        )
+        client.load_table_from_file.return_value.output_rows = 1
+
+        bigquery.replace_partition(df, "d", "t", client, date(2024, 1, 31), "run_date")
+
+        destination = client.load_table_from_file.call_args.args[1]
+        job_config = client.load_table_from_file.call_args.kwargs["job_config"]
+        assert destination == "zwickfi.d.t$20240131"
+        assert job_config.write_disposition == "WRITE_TRUNCATE"
+        client.update_table.assert_not_called()
+
+    def test_changed_expiry_is_applied_to_existing_table(self, df):
+        client = mock.Mock()
+        client.get_table.return_value.time_partitioning = (
+            bigquery.bigquery.TimePartitioning(field="run_date")
+        )
+
+        with mock.patch.object(bigquery, "write_to_bigquery"):
+            bigquery.replace_partition(
+                df, "d", "t", client, date(2024, 1, 31), "run_date", expiration_days=1
+            )
+
+        table = client.update_table.call_args.args[0]
+        assert table.time_partitioning.expiration_ms == 24 * 3600 * 1000
+
+
+class TestGetMaxValue:
+    """Test watermark lookups."""
+
+    def test_missing_table_returns_none(self):
+        client = mock.Mock()
+        client.get_table.side_effect = NotFound("missing")
+
+        assert bigquery.get_max_value(client, "d", "t", "date") is None
+        client.query.assert_not_called()
+
+    def test_missing_table_returns_no_keyed_watermarks(self):
+        client = mock.Mock()
+        client.get_table.side_effect = NotFound("missing")
+
+        assert bigquery.get_max_values_by_key(client, "d", "t", "k", "date") == {}
+
+
+class TestArrowSchema:
+    """Test explicit BigQuery schemas derived from Arrow."""
+
+    def test_maps_scalar_nested_and_null_columns(self):
+        df = pd.DataFrame(
+            {
+                "id": ["a", "b"],
+                "amount": [1.5, -2.0],
+                "count": [1, 2],
+                "pending": [True, False],
+                "synced_at": pd.to_datetime(["2024-01-01", "2024-01-02"]),
+                "notes": [None, None],
+                "category": [{"id": "c", "order": 1}, {"id": "d", "order": 2}],
+                "tags": [[{"name": "x"}], []],
+            }
+        )
+
+        table = bigquery._to_arrow(df)
+        fields = {f.name: f for f in bigquery._table_schema("p.d.t", table.schema)}
+
+        assert fields["id"].field_type == "STRING"
+        assert fields["amount"].field_type == "FLOAT"
+        assert fields["count"].field_type == "INTEGER"
+        assert fields["pending"].field_type == "BOOLEAN"
+        assert fields["synced_at"].field_type == "DATETIME"
+        assert fields["notes"].field_type == "STRING"
+        assert fields["category"].field_type == "RECORD"
+        assert [f.name for f in fields["category"].fields] == ["id", "order"]
+        assert fields["tags"].mode == "REPEATED"
+        assert fields["tags"].fields[0].name == "name"
+
+    def test_compact_dtypes_map_to_plain_types(self):
+        df = flatten_records(
+            [{"kind": "Transaction", "day": "2024-01-31", "at": "2024-01-31T10:00Z"}],
+            {"kind": "category", "day": "date", "at": "timestamp"},
+        )
+
+        table = bigquery._to_arrow(df)
+        fields = {f.name: f for f in bigquery._table_schema("p.d.c", table.schema)}
+
+        assert table.schema.field("kind").type == pa.large_string()
+        assert fields["kind"].field_type == "STRING"
+        assert fields["day"].field_type == "DATE"
+        assert fields["at"].field_type == "TIMESTAMP"
+
+    def test_monarch_dates_and_timestamps_are_stored_as_strings(self):
+        df = flatten_records(
+            [
+                {
+                    "id": "t1",
+                    "date": "2024-01-31",
+                    "createdAt": "2024-01-31T10:00:00.123456+00:00",
+                    "updatedAt": None,
+                }
+            ],
+            TRANSACTION_FIELDS,
+        )
+        client = mock.Mock()
+        uploads = []
+        client.load_table_from_file.side_effect = (
+            lambda buffer, destination, job_config: (
+                uploads.append((pq.read_table(buffer), job_config))
+                or mock.Mock(output_rows=1)
+            )
+        )
+
+        bigquery.write_to_bigquery(df, "d", "transactions", client)
+
+        ((table, job_config),) = uploads
+        fields = {field.name: field for field in job_config.schema}
+        assert fields["date"].field_type == "STRING"
+        assert fields["createdAt"].field_type == "STRING"
+        assert table.column("date").to_pylist() == ["2024-01-31"]
+        assert table.column("createdAt").to_pylist() == [
+            "2024-01-31T10:00:00.123456+00:00"
+        ]
+        assert table.column("updatedAt").to_pylist() == [None]
+
+    def test_schema_is_cached_per_table(self):
+        schema = pa.schema([("id", pa.string())])
+
+        first = bigquery._table_schema("p.d.cached", schema)
+
+        assert bigquery._table_schema("p.d.cached", schema) is first
+
+
+class TestSkipUnchanged:
+    """Test fingerprint-based skipping of unchanged table loads."""
+
+    @pytest.fixture
+    def df(self):
+        return pd.DataFrame(
+            {
+                "id": ["a", "b"],
+                "name": ["Food", "Rent"],
+                "synced_at": pd.to_datetime(["2024-01-01", "2024-01-01"]),
+            }
+        )
+
+    def test_fingerprint_ignores_row_order_and_sync_time(self, df):
+        reordered = df.iloc[::-1].assign(synced_at=pd.Timestamp("2024-02-01"))
+
+        assert bigquery._fingerprint(bigquery._to_arrow(df)) == bigquery._fingerprint(
+            bigquery._to_arrow(reordered)
+        )
+
+    def test_fingerprint_changes_with_content(self, df):
+        changed = df.assign(name=["Food", "Utilities"])
+
+        assert bigquery._fingerprint(bigquery._to_arrow(df)) != bigquery._fingerprint(
+            bigquery._to_arrow(changed)
+        )
+
+    def test_account_refresh_times_are_ignored(self):
+        def snapshot(refreshed_at):
+            return flatten_records(
+                [
+                    {
+                        "id": "acct-1",
+                        "displayName": "Checking",
+                        "currentBalance": 100.0,
+                        "updatedAt": refreshed_at,
+                        "displayLastUpdatedAt": refreshed_at,
+                    }
+                ],
+                ACCOUNT_FIELDS,
+            )
+
+        client = mock.Mock()
+        client.get_table.return_value.labels = {}
+        for refreshed_at in ("2024-01-31T09:00:00Z", "2024-01-31T10:00:00Z"):
+            bigquery.write_to_bigquery(
+                snapshot(refreshed_at), "d", "accounts", client, skip_unchanged=True
+            )
+            table, _ = client.update_table.call_args.args
+            client.get_table.return_value.labels = table.labels
+
+        client.load_table_from_file.assert_called_once()
+
+    def test_unchanged_table_is_not_loaded(self, df):
+        client = mock.Mock()
+        fingerprint = bigquery._fingerprint(bigquery._to_arrow(df))
+        client.get_table.return_value.labels = {bigquery.FINGERPRINT_LABEL: fingerprint}
+
+        bigquery.write_to_bigquery(df, "d", "t", client, skip_unchanged=True)
+
+        client.load_table_from_file.assert_not_called()
+
+    def test_changed_table_is_loaded_and_labelled(self, df):
+        client = mock.Mock()
+        client.get_table.return_value.labels = {bigquery.FINGERPRINT_LABEL: "old"}
+
+        bigquery.write_to_bigquery(df, "d", "t", client, skip_unchanged=True)
+
+        client.load_table_from_file.assert_called_once()
+        table, fields = client.update_table.call_args.args
+        assert table.labels[bigquery.FINGERPRINT_LABEL] != "old"
+        assert fields == ["labels"]
+
+    def test_new_table_is_loaded(self, df):
+        client = mock.Mock()
+        client.get_table.side_effect = NotFound("missing")
+
+        bigquery.write_to_bigquery(df, "d", "t", client, skip_unchanged=True)
+
+        client.load_table_from_file.assert_called_once()
+
+
+class TestStreamingLoad:
+    """Test chunked append loads through a staging table."""
+
+    @pytest.fixture
+    def client(self):
+        client = mock.Mock()
+        client.get_table.side_effect = NotFound("missing")
+        client.load_table_from_file.side_effect = lambda buffer, table_id, job_config: (
+            mock.Mock(output_rows=pq.read_table(buffer).num_rows)
+        )
+        return client
+
+    def test_buffers_chunks_into_load_jobs(self, client):
+        loader = bigquery.StreamingLoad("d", "t", client, rows_per_load=4)
+        for i in range(5):
+            loader.append(pd.DataFrame({"id": [f"{i}a", f"{i}b"]}))
+        loader.finish()
+
+        configs = [
+            call.kwargs["job_config"]
+            for call in client.load_table_from_file.call_args_list
+        ]
+        assert [c.write_disposition for c in configs] == [
+            "WRITE_TRUNCATE",
+            "WRITE_APPEND",
+            "WRITE_APPEND",
+        ]
+        assert loader.rows == 10
+        client.copy_table.assert_called_once()
+        assert client.copy_table.call_args.args == (
+            "zwickfi.d.t__stream",
+            "zwickfi.d.t",
+        )
+        client.delete_table.assert_called_once_with(
+            "zwickfi.d.t__stream", not_found_ok=True
+        )
+
+    def test_schema_only_grows(self, client):
+        loader = bigquery.StreamingLoad("d", "t", client, rows_per_load=1)
+        loader.append(pd.DataFrame({"id": ["a"], "tags": [[]]}))
+        loader.append(pd.DataFrame({"id": ["b"], "tags": [[{"name": "x"}]]}))
+        loader.append(pd.DataFrame({"amount": [1.0]}))
+
+        schemas = [
+            [f.name for f in call.kwargs["job_config"].schema]
+            for call in client.load_table_from_file.call_args_list
+        ]
+        assert schemas == [["id"], ["id", "tags"], ["id", "tags", "amount"]]
+        last = client.load_table_from_file.call_args_list[-1].kwargs["job_config"]
+        assert last.schema[1].field_type == "RECORD"
+        assert last.schema_update_options == ["ALLOW_FIELD_ADDITION"]
+
+    def test_merges_into_existing_table(self, client):
+        client.get_table.side_effect = None
+        client.get_table.return_value.schema = [
+            bigquery.bigquery.SchemaField("id", "STRING"),
+            bigquery.bigquery.SchemaField("amount", "FLOAT"),
+        ]
+        loader = bigquery.StreamingLoad("d", "t", client, merge_key="id")
+        loader.append(pd.DataFrame({"id": ["a"], "amount": [1.0]}))
+        loader.finish()
+
+        sql = client.query.call_args.args[0]
+        assert "USING `zwickfi.d.t__stream` S ON T.`id` = S.`id`" in sql
+        client.copy_table.assert_not_called()
+
+    def test_nothing_streamed_loads_nothing(self, client):
+        loader = bigquery.StreamingLoad("d", "t", client)
+        loader.append(pd.DataFrame())
+        loader.finish()
+
+        client.load_table_from_file.assert_not_called()
+        client.copy_table.assert_not_called()
@@ -0,0 +1,123 @@
+"""Tests for normalized budget fact tables."""
+
+from datetime import date
+
+import pandas as pd
+import pytest
+
+from zwickfi import budgets
+from zwickfi.schemas import CATEGORY_FIELDS
+from zwickfi.utils import flatten_records
+
+
+@pytest.fixture
+def response():
+    return {
+        "budgetData": {
+            "monthlyAmountsByCategory": [
+                {
+                    "category": {"id": "cat-1", "__typename": "Category"},
+                    "monthlyAmounts": [
+                        {
+                            "month": "2024-01-01",
+                            "plannedCashFlowAmount": 100.0,
+                            "actualAmount": 90.0,
+                            "__typename": "BudgetMonthlyAmounts",
+                        },
+                        {
+                            "month": "2024-02-01",
+                            "plannedCashFlowAmount": 100.0,
+                            "actualAmount": 120.0,
+                            "__typename": "BudgetMonthlyAmounts",
+                        },
+                    ],
+                }
+            ],
+            "monthlyAmountsByCategoryGroup": [
+                {
+                    "categoryGroup": {"id": "grp-1"},
+                    "monthlyAmounts": [{"month": "2024-01-01", "actualAmount": 90.0}],
+                }
+            ],
+        },
+        "goalsV2": [
+            {
+                "id": "goal-1",
+                "name": "Trip",
+                "priority": 1,
+                "plannedContributions": [
+                    {"id": "p-1", "month": "2024-01-01", "amount": 50.0}
+                ],
+                "monthlyContributionSummaries": [
+                    {"month": "2024-01-01", "sum": 20.0},
+                    {"month": "2024-02-01", "sum": 10.0},
+                ],
+            }
+        ],
+    }
+
+
+class TestMonthWindow:
+    """Test the month window synced around today."""
+
+    def test_spans_whole_months(self):
+        assert budgets.month_window(date(2024, 1, 15), 1, 1) == (
+            "2023-12-01",
+            "2024-02-29",
+        )
+
+    def test_current_month_only(self):
+        assert budgets.month_window(date(2024, 3, 31), 0, 0) == (
+            "2024-03-01",
+            "2024-03-31",
+        )
+
+
+class TestBudgetFactTables:
+    """Test flattening of the nested budgets response."""
+
+    def test_category_months_have_one_row_per_month(self, response):
+        df = budgets.budget_fact_tables(response)["budget_category_months"]
+
+        assert df["categoryId"].tolist() == ["cat-1", "cat-1"]
+        assert df["month"].tolist() == [date(2024, 1, 1), date(2024, 2, 1)]
+        assert df["actualAmount"].tolist() == [90.0, 120.0]
+        assert "__typename" not in df.columns
+
+    def test_group_months_keyed_by_group(self, response):
+        df = budgets.budget_fact_tables(response)["budget_group_months"]
+
+        assert df["categoryGroupId"].tolist() == ["grp-1"]
+
+    def test_parent_ids_have_their_declared_types(self, response):
+        tables = budgets.budget_fact_tables(response)
+        category_ids = flatten_records([{"id": "cat-1"}], CATEGORY_FIELDS)["id"]
+
+        assert tables["budget_category_months"]["categoryId"].dtype == (
+            category_ids.dtype
+        )
+        assert isinstance(
+            tables["budget_group_months"]["categoryGroupId"].dtype,
+            pd.CategoricalDtype,
+        )
+
+    def test_goal_months_join_planned_and_contributed(self, response):
+        df = budgets.budget_fact_tables(response)["budget_goal_months"]
+
+        assert df["month"].tolist() == [date(2024, 1, 1), date(2024, 2, 1)]
+        assert df["plannedAmount"].tolist()[0] == 50.0
+        assert df["plannedAmount"].isna().tolist() == [False, True]
+        assert df["contributedAmount"].tolist() == [20.0, 10.0]
+
+    def test_goals_exclude_monthly_lists(self, response):
+        df = budgets.budget_fact_tables(response)["budget_goals"]
+
+        assert df["id"].tolist() == ["goal-1"]
+        assert "plannedContributions" not in df.columns
+
+    def test_empty_response_gives_empty_tables(self):
+        tables = budgets.budget_fact_tables({})
+
+        assert set(tables) == {*budgets.BUDGET_FACT_TABLES, "budget_goals"}
+        assert all(df.empty for df in tables.values())
+        assert "categoryId" in tables["budget_category_months"].columns
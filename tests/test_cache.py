@@ -0,0 +1,41 @@
+"""Tests for the local artifact cache."""
+
+import os
+import time
+
+from zwickfi.cache import LocalDiskCache
+
+
+class TestLocalDiskCache:
+    """Test storage and eviction of cached artifacts."""
+
+    def test_round_trip(self, tmp_path):
+        cache = LocalDiskCache(tmp_path)
+        cache.put("key", b"value")
+
+        assert cache.get("key") == b"value"
+        assert cache.get("missing") is None
+
+    def test_expired_entries_are_misses(self, tmp_path):
+        cache = LocalDiskCache(tmp_path, max_age_seconds=60)
+        cache.put("key", b"value")
+        old = time.time() - 120
+        os.utime(tmp_path / "key.bin", (old, old))
+
+        assert cache.get("key") is None
+        assert not (tmp_path / "key.bin").exists()
+
+    def test_evicts_least_recently_used_over_size(self, tmp_path):
+        cache = LocalDiskCache(tmp_path, max_bytes=25)
+        cache.put("a", b"x" * 10)
+        cache.put("b", b"x" * 10)
+        past = time.time() - 10
+        os.utime(tmp_path / "a.bin", (past, past))
+        os.utime(tmp_path / "b.bin", (past - 5, past - 5))
+        cache.get("b")
+
+        cache.put("c", b"x" * 10)
+
+        assert cache.get("a") is None
+        assert cache.get("b") == b"x" * 10
+        assert cache.get("c") == b"x" * 10
@@ -0,0 +1,450 @@
+"""Tests for the command-line entry point."""
+
+import os
+import subprocess
+import sys
+import threading
+from datetime import UTC, datetime
+from unittest import mock
+
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+
+from zwickfi import cli
+from zwickfi.schemas import MONARCH_TABLES
+from zwickfi.syncstate import LocalSyncState
+from zwickfi.utils import flatten_records
+
+SRC = os.path.join(os.path.dirname(__file__), "..", "src")
+
+
+def _imported_after(*modules: str) -> set[str]:
+    """Modules loaded by a fresh interpreter after importing the given ones."""
+    code = "; ".join(f"import {module}" for module in modules)
+    code += "; import sys; print('\\n'.join(sys.modules))"
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        env={**os.environ, "PYTHONPATH": SRC},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return set(result.stdout.split())
+
+
+@pytest.fixture(autouse=True)
+def spool_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("SPOOL_DIR", str(tmp_path / "spool"))
+    monkeypatch.setenv("MONARCH_SESSION_KEY", "secret")
+    return tmp_path / "spool"
+
+
+@pytest.fixture(autouse=True)
+def sync_state_file(tmp_path, monkeypatch):
+    monkeypatch.delenv("SYNC_STATE_TABLE", raising=False)
+    monkeypatch.delenv("SYNC_FRESHNESS", raising=False)
+    monkeypatch.setenv("SYNC_STATE_FILE", str(tmp_path / "sync_state.json"))
+    return tmp_path / "sync_state.json"
+
+
+class TestLazyImports:
+    """Guard the CLI's startup cost against eager heavy imports."""
+
+    def test_cli_import_is_light(self):
+        imported = _imported_after("zwickfi.cli")
+
+        for heavy in ("pandas", "prophet", "monarchmoney", "google.cloud.bigquery"):
+            assert heavy not in imported
+
+    def test_extract_stage_does_not_import_prophet(self):
+        imported = _imported_after(
+            "zwickfi.cli", "zwickfi.auth", "zwickfi.monarch", "zwickfi.bigquery"
+        )
+
+        assert "prophet" not in imported
+        assert "zwickfi.forecasts" not in imported
+
+
+class TestStageSelection:
+    """Test how subcommands map to pipeline stages."""
+
+    @pytest.mark.parametrize(
+        ("argv", "expected"),
+        [
+            ([], {"tables": None, "forecast": True, "load": True}),
+            (["sync", "--no-load"], {"tables": None, "forecast": True, "load": False}),
+            (
+                ["extract", "transactions", "accounts"],
+                {
+                    "tables": ["transactions", "accounts"],
+                    "forecast": False,
+                    "load": True,
+                },
+            ),
+            (["extract"], {"tables": None, "forecast": False, "load": True}),
+            (["forecast"], {"tables": [], "forecast": True, "load": True}),
+            (
+                ["sync", "--resume", "abc"],
+                {"tables": None, "forecast": True, "load": True, "resume": "abc"},
+            ),
+            (
+                ["extract", "--force"],
+                {"tables": None, "forecast": False, "load": True, "force": True},
+            ),
+            (
+                ["forecast", "--engine", "linear"],
+                {"tables": [], "forecast": True, "load": True, "engine": "linear"},
+            ),
+        ],
+    )
+    def test_commands_select_stages(self, argv, expected):
+        with mock.patch.object(cli, "sync") as sync:
+            cli.main(argv)
+
+        sync.assert_called_once_with(
+            **{"resume": None, "force": False, "engine": None, **expected}
+        )
+
+    def test_engine_choices_match_forecasts(self):
+        from zwickfi.forecasts import FORECAST_ENGINES
+
+        assert cli.FORECAST_ENGINES == FORECAST_ENGINES
+
+    def test_unknown_engine_is_rejected(self):
+        with mock.patch.object(cli, "sync") as sync, pytest.raises(SystemExit):
+            cli.main(["sync", "--engine", "arima"])
+
+        sync.assert_not_called()
+
+    def test_unknown_table_is_rejected(self):
+        with mock.patch.object(cli, "sync") as sync, pytest.raises(SystemExit):
+            cli.main(["extract", "transfers"])
+
+        sync.assert_not_called()
+
+    def test_batch_syncs_households_from_config(self):
+        with (
+            mock.patch("zwickfi.households.load_households") as load_households,
+            mock.patch(
+                "zwickfi.households.sync_households",
+                return_value={"a": {"status": "ok"}, "b": {"status": "error"}},
+            ) as sync_households,
+            pytest.raises(SystemExit) as excinfo,
+        ):
+            cli.main(["batch", "households.toml", "--max-concurrent", "3"])
+
+        load_households.assert_called_once_with("households.toml")
+        assert sync_households.call_args.kwargs == {
+            "max_concurrent": 3,
+            "load": True,
+            "force": False,
+        }
+        assert excinfo.value.code == 1
+
+    def test_forecast_only_skips_monarch(self):
+        with (
+            mock.patch.object(cli, "_sync", return_value={}) as run_stages,
+            mock.patch("zwickfi.auth.get_monarch_client") as get_mm,
+        ):
+            summary = cli.sync(bq_client=mock.Mock(), tables=[])
+
+        get_mm.assert_not_called()
+        assert run_stages.call_args.args[1:] == (None, [], True, True, None)
+        assert summary["status"] == "ok"
+
+    def test_all_tables_by_default(self):
+        with (
+            mock.patch.object(cli, "_sync", return_value={}) as run_stages,
+            mock.patch("zwickfi.auth.get_monarch_client") as get_mm,
+        ):
+            cli.sync(bq_client=mock.Mock(), forecast=False)
+
+        assert run_stages.call_args.args[1] is get_mm.return_value
+        assert run_stages.call_args.args[2] == list(MONARCH_TABLES)
+
+
+class TestPipeline:
+    """Test the stage graph that sync runs."""
+
+    @pytest.fixture
+    def mm(self):
+        mm = mock.Mock()
+        mm.get_transaction_categories = mock.AsyncMock(
+            return_value={"categories": [{"id": "cat-1", "name": "Food"}]}
+        )
+        mm.get_transaction_tags = mock.AsyncMock(side_effect=RuntimeError("down"))
+        return mm
+
+    def test_failed_table_does_not_block_others(self, mm):
+        with mock.patch("zwickfi.bigquery.load_table") as load_table:
+            with pytest.raises(ExceptionGroup) as excinfo:
+                cli._sync(
+                    mock.Mock(),
+                    mm,
+                    ["transaction_categories", "transaction_tags"],
+                    forecast=False,
+                    load=True,
+                )
+
+        assert [call.args[2] for call in load_table.call_args_list] == [
+            "transaction_categories"
+        ]
+        assert "extract.transaction_tags" in str(excinfo.value)
+
+    def test_rows_are_reported_per_table(self, mm):
+        with mock.patch("zwickfi.bigquery.load_table"):
+            rows = cli._sync(
+                mock.Mock(), mm, ["transaction_categories"], forecast=False, load=True
+            )
+
+        assert rows == {"transaction_categories": 1}
+
+    def test_budget_facts_replace_month_window(self, mm, monkeypatch):
+        monkeypatch.setenv("BUDGETS_FORMAT", "facts")
+        mm.get_budgets = mock.AsyncMock(return_value={})
+        with (
+            mock.patch("zwickfi.bigquery.replace_month_window") as replace,
+            mock.patch("zwickfi.bigquery.write_to_bigquery") as write,
+        ):
+            rows = cli._sync(mock.Mock(), mm, ["budgets"], forecast=False, load=True)
+
+        assert sorted(call.args[2] for call in replace.call_args_list) == [
+            "budget_category_months",
+            "budget_goal_months",
+            "budget_group_months",
+        ]
+        assert write.call_args.args[2] == "budget_goals"
+        start_date, end_date = mm.get_budgets.call_args.kwargs.values()
+        assert replace.call_args.args[4:] == (start_date, end_date)
+        assert rows["budget_category_months"] == 0
+
+    def test_streamed_transactions_are_loaded_by_extract(self, mm, monkeypatch):
+        monkeypatch.setenv("TRANSACTIONS_STREAMING", "true")
+        mm.get_transactions_summary = mock.AsyncMock(
+            return_value={"aggregates": [{"summary": {"count": 2}}]}
+        )
+        mm.get_transactions = mock.AsyncMock(
+            return_value={"allTransactions": {"results": [{"id": "a"}, {"id": "b"}]}}
+        )
+        threads = []
+
+        def flatten(page, fields):
+            threads.append(threading.current_thread())
+            return flatten_records(page, fields)
+
+        with (
+            mock.patch.object(cli, "_transactions_start_date", return_value=None),
+            mock.patch("zwickfi.bigquery.StreamingLoad") as loader,
+            mock.patch("zwickfi.bigquery.load_table") as load_table,
+            mock.patch("zwickfi.utils.flatten_records", side_effect=flatten),
+        ):
+            rows = cli._sync(
+                mock.Mock(), mm, ["transactions"], forecast=False, load=True
+            )
+
+        assert rows == {"transactions": 2}
+        loader.return_value.append.assert_called_once()
+        loader.return_value.finish.assert_called_once()
+        load_table.assert_not_called()
+        # Pages are flattened off the event loop, and loaded every two pages
+        assert threads and threading.main_thread() not in threads
+        assert loader.call_args.kwargs["rows_per_load"] == 2000
+
+
+class TestForecastLoad:
+    """Test loading forecasts into the run-date partitioned table."""
+
+    def test_engines_load_the_same_schema(self):
+        client = mock.Mock()
+        client.get_table.return_value.time_partitioning = None
+        uploads = []
+
+        def load_table_from_file(buffer, destination, job_config):
+            uploads.append((pq.read_schema(buffer), job_config))
+            return mock.Mock(output_rows=1)
+
+        client.load_table_from_file.side_effect = load_table_from_file
+        months = pd.date_range("2024-01-01", periods=2, freq="MS")
+        prophet_shaped = pd.DataFrame(
+            {
+                "ds": months,
+                "trend": [1.0, 2.0],
+                "yhat_lower": [0.0, 1.0],
+                "yhat_upper": [2.0, 3.0],
+                "yearly": [0.1, 0.2],
+                "additive_terms": [0.1, 0.2],
+                "yhat": [1.0, 2.0],
+                "account_name": "Card A",
+            }
+        )
+        linear_shaped = prophet_shaped[
+            ["ds", "yhat", "yhat_lower", "yhat_upper", "account_name"]
+        ].astype({"ds": "datetime64[ns]", "account_name": object})
+        load = {stage.name: stage for stage in cli._forecast_stages(client, True)}[
+            "load.forecast"
+        ]
+
+        load.run({"forecast.fit": prophet_shaped})
+        load.run({"forecast.fit": linear_shaped})
+
+        (prophet_schema, prophet_job), (linear_schema, _) = uploads
+        assert prophet_schema.names == [
+            "ds",
+            "yhat",
+            "yhat_lower",
+            "yhat_upper",
+            "account_name",
+            "run_date",
+        ]
+        assert linear_schema.remove_metadata() == prophet_schema.remove_metadata()
+        assert prophet_job.schema_update_options == [
+            "ALLOW_FIELD_ADDITION",
+            "ALLOW_FIELD_RELAXATION",
+        ]
+
+    def test_engine_overrides_environment(self, monkeypatch):
+        monkeypatch.setenv("FORECAST_ENGINE", "prophet")
+        fit = {
+            stage.name: stage
+            for stage in cli._forecast_stages(mock.Mock(), False, engine="linear")
+        }["forecast.fit"]
+
+        with mock.patch("zwickfi.forecasts.generate_forecasts") as generate:
+            fit.run({"forecast.query": (pd.DataFrame(), [])})
+
+        assert generate.call_args.kwargs["engine"] == "linear"
+
+    def test_forecasts_stay_in_the_sync_project(self):
+        client = mock.Mock()
+        stages = {
+            stage.name: stage
+            for stage in cli._forecast_stages(client, True, project="household")
+        }
+        forecast = pd.DataFrame(
+            {
+                "ds": pd.to_datetime(["2024-01-01"]),
+                "yhat": [1.0],
+                "yhat_lower": [0.0],
+                "yhat_upper": [2.0],
+                "account_name": ["Card A"],
+            }
+        )
+
+        with (
+            mock.patch("zwickfi.forecasts.get_forecast_data") as query,
+            mock.patch("zwickfi.bigquery.replace_partition") as replace,
+        ):
+            stages["forecast.query"].run({})
+            stages["load.forecast"].run({"forecast.fit": forecast})
+
+        assert query.call_args.args[2] == "household"
+        assert replace.call_args.kwargs["project"] == "household"
+
+
+class TestResume:
+    """Test checkpointing and resuming failed runs."""
+
+    def test_failed_run_keeps_spool_and_resume_clears_it(self, spool_dir):
+        def fail_after_first_page(*args, **kwargs):
+            args[5].put("transactions/0", [{"id": "txn-0"}])
+            raise RuntimeError("boom")
+
+        with mock.patch.object(cli, "_sync", side_effect=fail_after_first_page):
+            with pytest.raises(RuntimeError):
+                cli.sync(bq_client=mock.Mock(), mm=mock.Mock(), run_id="run-1")
+        assert (spool_dir / "run-1" / "transactions" / "0.parquet.enc").exists()
+
+        with mock.patch.object(cli, "_sync", return_value={}) as run_stages:
+            cli.sync(bq_client=mock.Mock(), mm=mock.Mock(), resume="run-1")
+
+        spool = run_stages.call_args.args[5]
+        assert spool.get("transactions/0") is None
+        assert not (spool_dir / "run-1").exists()
+
+    def test_resumed_run_gets_its_own_run_id(self, monkeypatch):
+        monkeypatch.setenv("RUN_LOG_TABLE", "ops.runs")
+        with (
+            mock.patch.object(cli, "_sync", return_value={}),
+            mock.patch("zwickfi.bigquery.write_to_bigquery") as write,
+        ):
+            summary = cli.sync(
+                bq_client=mock.Mock(), mm=mock.Mock(), project="p", resume="run-1"
+            )
+
+        log = write.call_args.args[0]
+        assert write.call_args.kwargs["project"] == "p"
+        assert summary["run_id"] != "run-1"
+        assert log["run_id"].unique().tolist() == [summary["run_id"]]
+        assert log["resumed_from"].unique().tolist() == ["run-1"]
+
+    def test_no_spool_without_extraction(self):
+        with mock.patch.object(cli, "_sync", return_value={}) as run_stages:
+            cli.sync(bq_client=mock.Mock(), tables=[])
+
+        assert run_stages.call_args.args[5] is None
+
+
+class TestFreshness:
+    """Test skipping entities synced recently enough to be fresh."""
+
+    def test_fresh_entities_are_skipped(self, sync_state_file):
+        LocalSyncState(sync_state_file, "zwickfi.monarch_money").record(
+            ["transaction_tags", "forecast", "transactions"], datetime.now(UTC)
+        )
+
+        with mock.patch.object(cli, "_sync", return_value={}) as run_stages:
+            summary = cli.sync(bq_client=mock.Mock(), mm=mock.Mock())
+
+        tables, forecast = run_stages.call_args.args[2:4]
+        assert "transaction_tags" not in tables
+        assert "transactions" in tables
+        assert forecast is False
+        assert summary["fresh"] == ["transaction_tags", "forecast"]
+
+    def test_entities_are_recorded_at_the_run_start(self):
+        before = datetime.now(UTC)
+        with (
+            mock.patch.object(cli, "_sync", return_value={}) as run_stages,
+            mock.patch.object(cli, "_stale_only", wraps=cli._stale_only) as stale,
+        ):
+            cli.sync(bq_client=mock.Mock(), mm=mock.Mock())
+
+        synced_at = run_stages.call_args.kwargs["synced_at"]
+        assert before <= synced_at == stale.call_args.args[3]
+
+    def test_force_and_explicit_tables_ignore_freshness(self, sync_state_file):
+        LocalSyncState(sync_state_file, "zwickfi.monarch_money").record(
+            ["transaction_tags"], datetime.now(UTC)
+        )
+
+        with mock.patch.object(cli, "_sync", return_value={}) as run_stages:
+            cli.sync(bq_client=mock.Mock(), mm=mock.Mock(), force=True)
+            cli.sync(bq_client=mock.Mock(), mm=mock.Mock(), tables=["transaction_tags"])
+
+        assert "transaction_tags" in run_stages.call_args_list[0].args[2]
+        assert run_stages.call_args_list[1].args[2] == ["transaction_tags"]
+
+    def test_only_succeeded_entities_are_recorded(self):
+        mm = mock.Mock()
+        mm.get_transaction_categories = mock.AsyncMock(
+            return_value={"categories": [{"id": "cat-1", "name": "Food"}]}
+        )
+        mm.get_transaction_tags = mock.AsyncMock(side_effect=RuntimeError("down"))
+        sync_state = mock.Mock()
+
+        with (
+            mock.patch("zwickfi.bigquery.load_table"),
+            pytest.raises(ExceptionGroup),
+        ):
+            cli._sync(
+                mock.Mock(),
+                mm,
+                ["transaction_categories", "transaction_tags"],
+                forecast=False,
+                load=True,
+                sync_state=sync_state,
+            )
+
+        entities, _ = sync_state.record.call_args.args
+        assert entities == ["transaction_categories"]
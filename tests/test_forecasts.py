@@ -0,0 +1,190 @@
+"""Offline tests for credit card forecasting."""
+
+from datetime import date
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from zwickfi import forecasts
+from zwickfi.cache import LocalDiskCache
+
+
+@pytest.fixture(scope="module")
+def spending():
+    """Three years of synthetic monthly spending for two cards."""
+    months = pd.date_range("2021-01-01", periods=36, freq="MS")
+    rng = np.random.default_rng(42)
+    frames = [
+        pd.DataFrame(
+            {
+                "account_name": card,
+                "due_month": months,
+                "amount": base + 50 * np.sin(np.arange(36) / 2) + rng.normal(0, 5, 36),
+            }
+        )
+        for card, base in [("Card B", 500.0), ("Card A", 1200.0)]
+    ]
+    return pd.concat(frames, ignore_index=True)
+
+
+@pytest.fixture(scope="module")
+def serial_forecast(spending):
+    return forecasts.generate_forecasts(spending, ["Card A", "Card B"], workers=1)
+
+
+class TestGenerateForecasts:
+    """Test per-card forecast generation."""
+
+    def test_cards_in_requested_order(self, serial_forecast):
+        assert serial_forecast["account_name"].unique().tolist() == ["Card A", "Card B"]
+        assert len(serial_forecast) == 2 * (36 + forecasts.FORECAST_PERIODS)
+
+    def test_parallel_matches_serial(self, spending, serial_forecast):
+        parallel = forecasts.generate_forecasts(
+            spending, ["Card A", "Card B"], workers=2
+        )
+
+        pd.testing.assert_frame_equal(parallel, serial_forecast)
+
+    def test_cache_skips_unchanged_cards(self, spending, serial_forecast, tmp_path):
+        cache = LocalDiskCache(tmp_path)
+        forecasts.generate_forecasts(
+            spending, ["Card A", "Card B"], workers=1, cache=cache, warm_start=True
+        )
+
+        changed = spending.copy()
+        changed.loc[changed["account_name"] == "Card B", "amount"] += 1.0
+        with mock.patch.object(
+            forecasts, "_forecast_card", wraps=forecasts._forecast_card
+        ) as fit:
+            result = forecasts.generate_forecasts(
+                changed, ["Card A", "Card B"], workers=1, cache=cache, warm_start=True
+            )
+
+        assert [call.args[0] for call in fit.call_args_list] == ["Card B"]
+        assert fit.call_args_list[0].args[2] is not None
+        card_a = result[result["account_name"] == "Card A"].reset_index(drop=True)
+        expected = serial_forecast[serial_forecast["account_name"] == "Card A"]
+        pd.testing.assert_frame_equal(
+            card_a, expected.reset_index(drop=True), check_like=True
+        )
+
+
+class TestFingerprint:
+    """Test the forecast cache key."""
+
+    @pytest.fixture
+    def series(self, spending):
+        return spending.rename(columns={"due_month": "ds", "amount": "y"})[["ds", "y"]]
+
+    def test_depends_on_warm_start_and_engine(self, series):
+        cold = forecasts._fingerprint(series, "prophet", False)
+
+        assert forecasts._fingerprint(series, "prophet", True) != cold
+        assert forecasts._fingerprint(series, "linear", False) != cold
+        assert forecasts._fingerprint(series, "prophet", False) == cold
+
+    def test_does_not_import_prophet(self, series):
+        with mock.patch.dict("sys.modules", {"prophet": None}):
+            forecasts._fingerprint(series, "prophet", False)
+
+
+class TestLinearEngine:
+    """Test the vectorized linear trend plus seasonality engine."""
+
+    def test_matches_prophet_output_shape(self, spending, serial_forecast):
+        result = forecasts.generate_forecasts(
+            spending, ["Card A", "Card B"], engine="linear"
+        )
+
+        assert list(result.columns) == [
+            "ds",
+            "yhat",
+            "yhat_lower",
+            "yhat_upper",
+            "account_name",
+        ]
+        pd.testing.assert_frame_equal(
+            result[["ds", "account_name"]],
+            serial_forecast[["ds", "account_name"]],
+            check_dtype=False,
+        )
+
+    def test_recovers_noiseless_trend_and_seasonality(self):
+        months = pd.date_range("2020-01-01", periods=48, freq="MS")
+        seasonal = 100 * (months.month == 12)
+        df = pd.DataFrame(
+            {
+                "account_name": "Card",
+                "due_month": months,
+                "amount": 200 + 10 * np.arange(48) + seasonal,
+            }
+        )
+
+        result = forecasts.generate_forecasts(df, ["Card"], engine="linear")
+
+        future = result.iloc[48:]
+        expected = 200 + 10 * np.arange(48, 72) + 100 * (future["ds"].dt.month == 12)
+        np.testing.assert_allclose(future["yhat"], expected, atol=0.5)
+
+    def test_cards_with_different_histories(self, spending):
+        short = spending[
+            (spending["account_name"] == "Card B")
+            & (spending["due_month"] >= "2023-01-01")
+        ]
+        df = pd.concat([spending[spending["account_name"] == "Card A"], short])
+
+        result = forecasts.generate_forecasts(df, ["Card B", "Card A"], engine="linear")
+
+        counts = result.groupby("account_name", sort=False).size()
+        assert counts.to_dict() == {"Card B": 12 + 24, "Card A": 36 + 24}
+        assert result["yhat"].notna().all()
+
+    def test_unknown_engine_raises(self, spending):
+        with pytest.raises(ValueError, match="Unknown forecast engine"):
+            forecasts.generate_forecasts(spending, ["Card A"], engine="arima")
+
+
+class TestGetForecastData:
+    """Test the projected, pre-aggregated forecast input query."""
+
+    @pytest.fixture
+    def client(self):
+        client = mock.Mock()
+        client.query.return_value.result.return_value.to_arrow.return_value = pa.table(
+            {
+                "account_name": ["Card A", "Card A", "Card B"],
+                "due_month": [date(2024, 1, 1), date(2024, 2, 1), date(2024, 1, 1)],
+                "amount": [10.0, 20.0, 30.0],
+            }
+        )
+        return client
+
+    def test_reads_only_forecast_columns_as_arrow(self, client):
+        df, credit_cards = forecasts.get_forecast_data(client)
+
+        query = client.query.call_args.args[0]
+        assert "SELECT *" not in query
+        assert "GROUP BY" in query
+        assert "WHERE" not in query
+        assert credit_cards == ["Card A", "Card B"]
+        assert df.columns.tolist() == ["account_name", "due_month", "amount"]
+        assert pd.api.types.is_datetime64_any_dtype(df["due_month"])
+
+    def test_history_window_is_a_query_parameter(self, client):
+        forecasts.get_forecast_data(client, history_months=24)
+
+        query = client.query.call_args.args[0]
+        job_config = client.query.call_args.kwargs["job_config"]
+        assert "@history_months" in query
+        assert job_config.query_parameters[0].value == 24
+
+    def test_history_is_read_from_the_given_project(self, client):
+        forecasts.get_forecast_data(client, project="household")
+
+        query = client.query.call_args.args[0]
+        assert "`household.analytics.credit_card_spending_for_forecast`" in query
+        assert client.query.call_args.kwargs["project"] == "household"
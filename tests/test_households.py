@@ -0,0 +1,152 @@
+"""Tests for multi-household batch syncs."""
+
+import threading
+from unittest import mock
+
+import pytest
+
+from zwickfi import cli, households
+from zwickfi.households import Household
+
+
+@pytest.fixture
+def config(tmp_path):
+    path = tmp_path / "households.toml"
+    path.write_text(
+        """
+[households.smith]
+dataset = "smith_monarch"
+email_env = "SMITH_EMAIL"
+password_env = "SMITH_PASSWORD"
+secret_key_env = "SMITH_SECRET_KEY"
+
+[households.jones]
+dataset = "jones_monarch"
+project = "jones-project"
+tables = ["accounts"]
+"""
+    )
+    return path
+
+
+class TestLoadHouseholds:
+    """Test reading households from a TOML config."""
+
+    def test_households_keep_config_order(self, config):
+        smith, jones = households.load_households(config)
+
+        assert smith.name == "smith"
+        assert smith.dataset == "smith_monarch"
+        assert smith.email_env == "SMITH_EMAIL"
+        assert smith.tables is None
+        assert jones.project == "jones-project"
+        assert jones.tables == ["accounts"]
+        assert jones.email_env == "MONARCH_EMAIL"
+
+    def test_empty_config_is_rejected(self, tmp_path):
+        path = tmp_path / "empty.toml"
+        path.write_text("")
+
+        with pytest.raises(ValueError, match="no"):
+            households.load_households(path)
+
+    @pytest.mark.parametrize(
+        "settings",
+        [
+            'dataset = "d"\ncolor = "blue"',
+            'project = "p"',
+            'dataset = "d"\ntables = ["x"]',
+        ],
+    )
+    def test_invalid_household_is_rejected(self, tmp_path, settings):
+        path = tmp_path / "bad.toml"
+        path.write_text(f"[households.bad]\n{settings}\n")
+
+        with pytest.raises(ValueError, match="'bad'"):
+            households.load_households(path)
+
+
+class TestCredentials:
+    """Test reading a household's credentials from its variables."""
+
+    def test_missing_variables_are_named(self, monkeypatch):
+        monkeypatch.setenv("SMITH_EMAIL", "smith@example.com")
+        monkeypatch.delenv("SMITH_PASSWORD", raising=False)
+        monkeypatch.delenv("SMITH_SECRET_KEY", raising=False)
+        household = Household(
+            "smith",
+            "smith_monarch",
+            email_env="SMITH_EMAIL",
+            password_env="SMITH_PASSWORD",
+            secret_key_env="SMITH_SECRET_KEY",
+        )
+
+        with pytest.raises(ValueError, match="SMITH_PASSWORD, SMITH_SECRET_KEY"):
+            household.credentials()
+
+    def test_session_file_defaults_to_one_per_household(self, monkeypatch):
+        for name in ("MONARCH_EMAIL", "MONARCH_PASSWORD", "MONARCH_SECRET_KEY"):
+            monkeypatch.setenv(name, "x")
+
+        with mock.patch("zwickfi.auth.get_monarch_client") as get_mm:
+            Household("smith", "smith_monarch").monarch_client()
+
+        assert get_mm.call_args.args[3].endswith("smith_session.enc")
+
+
+class TestSyncHouseholds:
+    """Test running households concurrently with isolated failures."""
+
+    def test_failure_is_isolated_to_its_household(self):
+        bq_client = mock.Mock()
+
+        def sync(bq, mm, **kwargs):
+            if kwargs["dataset"] == "bad_monarch":
+                raise RuntimeError("boom")
+            return {"status": "ok", "dataset": kwargs["dataset"]}
+
+        with (
+            mock.patch.object(Household, "monarch_client"),
+            mock.patch.object(cli, "sync", side_effect=sync) as run_sync,
+        ):
+            summaries = households.sync_households(
+                [Household("good", "good_monarch"), Household("bad", "bad_monarch")],
+                bq_client,
+            )
+
+        assert summaries["good"] == {"status": "ok", "dataset": "good_monarch"}
+        assert summaries["bad"]["status"] == "error"
+        assert summaries["bad"]["error"] == "RuntimeError: boom"
+        calls = run_sync.call_args_list
+        assert all(call.args[0] is bq_client for call in calls)
+        assert all(call.kwargs["forecast"] is False for call in calls)
+        assert calls[0].kwargs["load_executor"] is calls[1].kwargs["load_executor"]
+
+    def test_households_run_concurrently_up_to_limit(self):
+        running = 0
+        peak = 0
+        lock = threading.Lock()
+        barrier = threading.Barrier(2, timeout=5)
+
+        def sync(bq, mm, **kwargs):
+            nonlocal running, peak
+            with lock:
+                running += 1
+                peak = max(peak, running)
+            barrier.wait()
+            with lock:
+                running -= 1
+            return {"status": "ok"}
+
+        with (
+            mock.patch.object(Household, "monarch_client"),
+            mock.patch.object(cli, "sync", side_effect=sync),
+        ):
+            summaries = households.sync_households(
+                [Household(str(i), f"d{i}") for i in range(4)],
+                mock.Mock(),
+                max_concurrent=2,
+            )
+
+        assert peak == 2
+        assert len(summaries) == 4
@@ -0,0 +1,119 @@
+"""Tests for run instrumentation spans."""
+
+import asyncio
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+import pandas as pd
+import pytest
+
+from zwickfi import bigquery, instrumentation
+from zwickfi.instrumentation import span
+from zwickfi.scheduler import Stage, run_stages
+
+
+@pytest.fixture
+def run():
+    run = instrumentation.start_run("test-run")
+    yield run
+    instrumentation.end_run()
+
+
+class TestSpans:
+    """Test span timing, nesting and error capture."""
+
+    def test_nested_spans_record_parent_and_rows(self, run):
+        with span("extract", concurrency=4):
+            with span("monarch.accounts") as inner:
+                inner.rows = 3
+
+        inner_span, outer_span = run.spans
+        assert inner_span.name == "monarch.accounts"
+        assert inner_span.parent == "extract"
+        assert inner_span.rows == 3
+        assert outer_span.parent is None
+        assert outer_span.attributes == {"concurrency": 4}
+        assert outer_span.seconds >= inner_span.seconds
+        assert outer_span.max_rss_mb > 0
+
+    def test_failed_span_is_recorded_and_reraised(self, run):
+        with pytest.raises(ValueError), span("load"):
+            raise ValueError("bad rows")
+
+        assert run.spans[0].status == "error"
+        assert run.spans[0].error == "ValueError: bad rows"
+
+    def test_spans_without_active_run_are_discarded(self):
+        with span("orphan") as orphan:
+            orphan.rows = 1
+        instrumentation.record("orphan", 1.0)
+
+        assert instrumentation.end_run() is None
+
+    def test_load_spans_nest_under_stage_across_threads(self, run):
+        client = mock.Mock()
+        client.load_table_from_file.return_value.output_rows = 2
+        df = pd.DataFrame({"id": ["a", "b"]})
+        stages = [
+            Stage(
+                f"load.{name}",
+                lambda _, name=name: bigquery.load_table(df, "d", name, client),
+                blocking=True,
+            )
+            for name in ("one", "two")
+        ]
+
+        asyncio.run(run_stages(stages))
+
+        loads = [s for s in run.spans if s.name == "bigquery.load"]
+        assert {s.parent for s in loads} == {"load.one", "load.two"}
+        assert all(s.rows == 2 and s.bytes > 0 for s in loads)
+
+
+class TestRunLog:
+    """Test emitting a run's spans as logs and table rows."""
+
+    def test_emits_one_json_line_per_span(self, run, capsys):
+        with span("forecast", engine="linear"):
+            instrumentation.record("forecast.card", 0.5, rows=36, account_name="A")
+
+        run.emit()
+        lines = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+        assert [line["name"] for line in lines] == ["forecast.card", "forecast"]
+        assert lines[0]["run_id"] == "test-run"
+        assert lines[0]["parent"] == "forecast"
+        assert lines[0]["attributes"] == {"account_name": "A"}
+
+    def test_dataframe_types_are_stable_when_columns_are_null(self, run):
+        with span("auth.bigquery"):
+            pass
+
+        df = run.to_dataframe()
+        assert df["rows"].dtype == "Int64"
+        assert df["bytes"].dtype == "Int64"
+        assert df["attributes"].tolist() == ["{}"]
+
+
+class TestConcurrentRuns:
+    """Test that runs on different threads keep their own spans."""
+
+    def test_runs_on_separate_threads_are_isolated(self):
+        barrier = threading.Barrier(2)
+
+        def run_on_thread(run_id):
+            run = instrumentation.start_run(run_id)
+            barrier.wait()
+            with span(f"stage-{run_id}"):
+                barrier.wait()
+            instrumentation.end_run()
+            return run
+
+        with ThreadPoolExecutor(2) as pool:
+            runs = list(pool.map(run_on_thread, ["a", "b"]))
+
+        assert [[s.name for s in run.spans] for run in runs] == [
+            ["stage-a"],
+            ["stage-b"],
+        ]
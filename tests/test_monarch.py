@@ -0,0 +1,427 @@
+"""
+Offline tests for the Monarch extraction layer.
+
+These use an in-memory stand-in for MonarchMoney, so they run without
+credentials and exercise only our own orchestration and shaping code.
+"""
+
+import asyncio
+from datetime import date
+from unittest import mock
+
+import pytest
+from gql.transport.exceptions import TransportServerError
+
+from zwickfi import cli, instrumentation, monarch
+from zwickfi.schemas import MONARCH_TABLES
+from zwickfi.spool import CheckpointSpool
+
+
+class FakeMonarch:
+    """Minimal async stand-in for MonarchMoney serving canned payloads."""
+
+    def __init__(self, n_transactions: int = 5, n_accounts: int = 2):
+        self.n_transactions = n_transactions
+        self.account_ids = [f"acct-{i}" for i in range(n_accounts)]
+        self.calls: list[str] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def _get_graphql_client(self):
+        raise AssertionError("fake client never builds a GraphQL client")
+
+    async def get_transactions_summary(self):
+        self.calls.append("summary")
+        return {"aggregates": [{"summary": {"count": self.n_transactions}}]}
+
+    async def get_transactions(
+        self, limit: int = 100, offset: int = 0, start_date=None, end_date=None
+    ):
+        self.calls.append(f"transactions:{offset}")
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        # Later pages finish first, so ordering must not depend on arrival
+        await asyncio.sleep(0.001 * (self.n_transactions - offset) / max(limit, 1))
+        self.in_flight -= 1
+        records = [
+            {
+                "id": f"txn-{i}",
+                "date": f"2024-{1 + i % 12:02d}-01",
+                "amount": -float(i),
+                "category": {"name": "Food"},
+            }
+            for i in range(self.n_transactions)
+        ]
+        if start_date is not None:
+            records = [r for r in records if start_date <= r["date"] <= end_date]
+        return {
+            "allTransactions": {
+                "totalCount": len(records),
+                "results": records[offset : offset + limit],
+            }
+        }
+
+    async def get_transaction_categories(self):
+        self.calls.append("categories")
+        return {"categories": [{"id": "cat-1", "name": "Food", "group": {"id": "g"}}]}
+
+    async def get_transaction_tags(self):
+        self.calls.append("tags")
+        return {"householdTransactionTags": [{"id": "tag-1", "name": "Trip"}]}
+
+    async def get_accounts(self):
+        self.calls.append("accounts")
+        return {
+            "accounts": [
+                {
+                    "id": account_id,
+                    "displayName": account_id,
+                    "type": {"name": "credit"},
+                }
+                for account_id in self.account_ids
+            ]
+        }
+
+    async def get_account_history(self, account_id: str):
+        self.calls.append(f"history:{account_id}")
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.001)
+        self.in_flight -= 1
+        return [
+            {"date": "2024-01-01", "signedBalance": 1.0, "accountId": account_id},
+            {"date": "2024-01-02", "signedBalance": 2.0, "accountId": account_id},
+        ]
+
+    async def get_budgets(self, start_date=None, end_date=None):
+        self.calls.append("budgets")
+        return {
+            "budgetData": {
+                "monthlyAmountsByCategory": [{"category": {"id": "cat-1"}}],
+                "totalsByMonth": [],
+            },
+            "categoryGroups": [
+                {"id": "g", "name": "Living", "categories": [{"id": "cat-1"}]}
+            ],
+            "goalsV2": [],
+        }
+
+
+@pytest.fixture
+def fake_mm():
+    return FakeMonarch()
+
+
+def extract(fake_mm, tables=MONARCH_TABLES):
+    """Run the pipeline's extract stages for tables, without loading."""
+    stages = cli._extract_stages(mock.Mock(), fake_mm, list(tables), load=False)
+    outcome = asyncio.run(cli._run_stages(stages, fake_mm))
+    outcome.raise_for_errors()
+    return {table: outcome.results[f"extract.{table}"] for table in tables}
+
+
+@pytest.fixture(autouse=True)
+def full_sync(monkeypatch):
+    # Watermarks would otherwise be read from BigQuery
+    monkeypatch.setenv("TRANSACTIONS_SYNC_MODE", "full")
+    monkeypatch.setenv("ACCOUNT_HISTORY_SYNC_MODE", "full")
+
+
+class TestExtractStages:
+    """Test extraction through the pipeline's stage graph."""
+
+    def test_returns_every_dataset(self, fake_mm):
+        extracted = extract(fake_mm)
+
+        assert len(extracted["transactions"]) == 5
+        assert len(extracted["account_balance_history"]) == 4
+        assert "category_name" in extracted["transactions"].columns
+
+    def test_extracts_only_requested_tables(self, fake_mm):
+        extracted = extract(fake_mm, ["transaction_tags", "account_balance_history"])
+
+        assert len(extracted["account_balance_history"]) == 4
+        assert set(fake_mm.calls) == {
+            "tags",
+            "accounts",
+            "history:acct-0",
+            "history:acct-1",
+        }
+
+    def test_requests_are_retried_and_measured(self, fake_mm, monkeypatch):
+        monkeypatch.setenv("MONARCH_REQUESTS_PER_SECOND", "0")
+        get_tags = fake_mm.get_transaction_tags
+        errors = [TransportServerError("slow down", 429)]
+
+        async def throttled_tags():
+            if errors:
+                raise errors.pop()
+            return await get_tags()
+
+        fake_mm.get_transaction_tags = throttled_tags
+        run = instrumentation.start_run()
+        try:
+            extracted = extract(fake_mm, ["transaction_tags"])
+        finally:
+            instrumentation.end_run()
+
+        assert len(extracted["transaction_tags"]) == 1
+        (requests,) = [s for s in run.spans if s.name == "monarch.requests"]
+        assert requests.attributes["retries"] == 1
+        assert requests.attributes["successes"] == 1
+
+    def test_restores_client_after_run(self, fake_mm):
+        extract(fake_mm)
+
+        assert "_get_graphql_client" not in vars(fake_mm)
+
+    def test_budgets_are_enriched(self, fake_mm):
+        budgets = extract(fake_mm, ["budgets"])["budgets"]
+
+        entry = budgets.loc[0, "budgetData"]["monthlyAmountsByCategory"][0]
+        assert entry["category"]["group"]["name"] == "Living"
+        assert "synced_at" in budgets.columns
+
+    def test_incremental_transactions_use_since_date(self, fake_mm):
+        with mock.patch.object(
+            cli, "_transactions_start_date", return_value="2024-01-01"
+        ):
+            extract(fake_mm, ["transactions"])
+
+        assert "summary" not in fake_mm.calls
+
+
+class ShiftingMonarch(FakeMonarch):
+    """Fake whose listing gains a newer transaction after the first page."""
+
+    async def get_transactions(self, limit: int = 100, offset: int = 0, **filters):
+        # A transaction added mid-fetch pushes later pages back by one row
+        shift = 1 if offset else 0
+        return await super().get_transactions(limit, offset - shift, **filters)
+
+
+class TestGetTransactions:
+    """Test concurrent transaction pagination."""
+
+    def test_pages_keep_order(self):
+        fake_mm = FakeMonarch(n_transactions=3500)
+
+        df = monarch.get_transactions(fake_mm, limit=3500, concurrency=4)
+
+        assert len(df) == 3500
+        assert df["id"].tolist() == [f"txn-{i}" for i in range(3500)]
+
+    def test_concurrency_is_bounded(self):
+        fake_mm = FakeMonarch(n_transactions=10_000)
+
+        monarch.get_transactions(fake_mm, limit=10_000, concurrency=3)
+
+        assert fake_mm.max_in_flight == 3
+        assert len([c for c in fake_mm.calls if c.startswith("transactions")]) == 10
+
+    def test_shifted_pages_are_deduplicated(self):
+        fake_mm = ShiftingMonarch(n_transactions=2000)
+
+        df = monarch.get_transactions(fake_mm, limit=2000)
+
+        assert df["id"].is_unique
+        assert len(df) == 1999
+
+    def test_last_page_is_trimmed(self):
+        fake_mm = FakeMonarch(n_transactions=1500)
+
+        df = monarch.get_transactions(fake_mm, limit=1200)
+
+        assert len(df) == 1200
+
+    def test_zero_limit_returns_empty_frame(self, fake_mm):
+        df = monarch.get_transactions(fake_mm, limit=0)
+
+        assert df.empty
+        assert fake_mm.calls == []
+
+
+class TestIterTransactionPages:
+    """Test streaming transaction pages."""
+
+    async def collect(self, fake_mm, **kwargs):
+        return [
+            page
+            async for page in monarch.iter_transaction_pages_async(fake_mm, **kwargs)
+        ]
+
+    def test_pages_arrive_in_order(self):
+        fake_mm = FakeMonarch(n_transactions=3500)
+
+        pages = asyncio.run(self.collect(fake_mm, concurrency=3))
+
+        assert [len(page) for page in pages] == [1000, 1000, 1000, 500]
+        assert [r["id"] for page in pages for r in page] == [
+            f"txn-{i}" for i in range(3500)
+        ]
+        assert fake_mm.max_in_flight == 3
+
+    def test_shifted_pages_are_deduplicated(self):
+        fake_mm = ShiftingMonarch(n_transactions=2000)
+
+        pages = asyncio.run(self.collect(fake_mm))
+
+        ids = [r["id"] for page in pages for r in page]
+        assert len(ids) == len(set(ids)) == 1999
+
+    def test_only_recent_pages_are_deduplicated(self):
+        class RepeatingMonarch(FakeMonarch):
+            async def get_transactions(self, limit=100, offset=0, **filters):
+                response = await super().get_transactions(limit, offset, **filters)
+                if offset == 3000:
+                    response["allTransactions"]["results"][0] = {"id": "txn-0"}
+                return response
+
+        fake_mm = RepeatingMonarch(n_transactions=4000)
+
+        pages = asyncio.run(self.collect(fake_mm))
+
+        assert monarch.DEDUP_PAGES < 3
+        assert [r["id"] for page in pages for r in page].count("txn-0") == 2
+
+    def test_since_starts_from_first_filtered_page(self):
+        fake_mm = FakeMonarch(n_transactions=2400)
+
+        pages = asyncio.run(self.collect(fake_mm, since="2024-11-01"))
+
+        assert sum(len(page) for page in pages) == 400
+        assert "summary" not in fake_mm.calls
+
+    def test_early_exit_cancels_prefetched_pages(self):
+        fake_mm = FakeMonarch(n_transactions=10_000)
+
+        async def first_page():
+            pages = monarch.iter_transaction_pages_async(fake_mm, concurrency=2)
+            page = await anext(pages)
+            await pages.aclose()
+            await asyncio.sleep(0.05)
+            return page
+
+        assert len(asyncio.run(first_page())) == 1000
+        assert len([c for c in fake_mm.calls if c.startswith("transactions")]) <= 3
+
+
+class TestGetTransactionsSince:
+    """Test date-filtered transaction fetches for incremental syncs."""
+
+    def test_only_returns_transactions_after_start(self):
+        fake_mm = FakeMonarch(n_transactions=2400)
+
+        df = monarch.get_transactions_since(fake_mm, start_date="2024-11-01")
+
+        assert len(df) == 400
+        assert (df["date"] >= date(2024, 11, 1)).all()
+
+    def test_fetches_remaining_pages(self):
+        fake_mm = FakeMonarch(n_transactions=6000)
+
+        df = monarch.get_transactions_since(fake_mm, start_date="2024-01-01")
+
+        assert len(df) == 6000
+        assert df["id"].is_unique
+
+
+class TestCheckpointSpool:
+    """Test resuming extraction from spooled pages."""
+
+    def test_spooled_pages_are_not_requested_again(self, tmp_path):
+        spool = CheckpointSpool(tmp_path, "run-1", "secret")
+        spool.put("transactions/1000", [{"id": "txn-1000", "amount": -1000.0}])
+        fake_mm = FakeMonarch(n_transactions=2500)
+
+        df = asyncio.run(monarch.get_transactions_async(fake_mm, 2500, spool=spool))
+
+        assert "transactions:1000" not in fake_mm.calls
+        assert len(df) == 1001 + 500
+        assert spool.get("transactions/2000") is not None
+
+    def test_resumed_pages_are_deduplicated(self, tmp_path):
+        spool = CheckpointSpool(tmp_path, "run-1", "secret")
+        spool.put("transactions_since_2024-01-01/1000", [{"id": "txn-0"}])
+        fake_mm = FakeMonarch(n_transactions=1500)
+
+        df = asyncio.run(
+            monarch.get_transactions_since_async(
+                fake_mm, start_date="2024-01-01", spool=spool
+            )
+        )
+
+        assert df["id"].is_unique
+        assert len(df) == 1000
+
+    def test_first_filtered_page_is_spooled_with_its_total(self, tmp_path):
+        spool = CheckpointSpool(tmp_path, "run-1", "secret")
+        fake_mm = FakeMonarch(n_transactions=1500)
+        asyncio.run(
+            monarch.get_transactions_since_async(
+                fake_mm, start_date="2024-01-01", spool=spool
+            )
+        )
+        fake_mm.calls.clear()
+
+        df = asyncio.run(
+            monarch.get_transactions_since_async(
+                fake_mm, start_date="2024-01-01", spool=spool
+            )
+        )
+
+        assert fake_mm.calls == []
+        assert len(df) == 1500
+
+    def test_spooled_history_is_not_requested_again(self, tmp_path, fake_mm):
+        spool = CheckpointSpool(tmp_path, "run-1", "secret")
+        spool.put(
+            "account_history/acct-0", [{"date": "2024-01-01", "accountId": "acct-0"}]
+        )
+
+        df = asyncio.run(
+            monarch.get_accounts_history_async(
+                fake_mm, fake_mm.account_ids, spool=spool
+            )
+        )
+
+        assert fake_mm.calls == ["history:acct-1"]
+        assert len(df) == 3
+        assert spool.get("account_history/acct-1") is not None
+
+
+class TestGetAccountsHistory:
+    """Test concurrent, incremental account history extraction."""
+
+    def test_concurrency_is_bounded_and_order_kept(self):
+        fake_mm = FakeMonarch(n_accounts=12)
+
+        df = monarch.get_accounts_history(fake_mm, fake_mm.account_ids, concurrency=5)
+
+        assert fake_mm.max_in_flight == 5
+        assert df["accountId"].unique().tolist() == fake_mm.account_ids
+
+    def test_since_keeps_last_loaded_date_onwards(self, fake_mm):
+        df = monarch.get_accounts_history(
+            fake_mm, fake_mm.account_ids, since={"acct-0": "2024-01-02"}
+        )
+
+        acct_0 = df[df["accountId"] == "acct-0"]
+        assert acct_0["date"].tolist() == [date(2024, 1, 2)]
+        assert len(df[df["accountId"] == "acct-1"]) == 2
+
+    def test_no_accounts_returns_empty_frame(self, fake_mm):
+        assert monarch.get_accounts_history(fake_mm, []).empty
+
+
+class TestSyncWrappers:
+    """Test the backward-compatible synchronous wrappers."""
+
+    def test_get_accounts(self, fake_mm):
+        accounts = monarch.get_accounts(fake_mm)
+
+        assert accounts["id"].tolist() == fake_mm.account_ids
+        assert "type_name" in accounts.columns
+
+    def test_get_total_transactions(self, fake_mm):
+        assert monarch.get_total_transactions(fake_mm) == 5
@@ -0,0 +1,129 @@
+"""Tests for adaptive request pacing, limiting and retries."""
+
+import asyncio
+import time
+
+import aiohttp
+import pytest
+from gql.transport.exceptions import TransportQueryError, TransportServerError
+
+from zwickfi.ratelimit import RequestController, TokenBucket
+
+
+class FlakyRequest:
+    """Async request failing with the given errors before succeeding."""
+
+    def __init__(self, *errors: Exception, delay: float = 0.0):
+        self.errors = list(errors)
+        self.delay = delay
+        self.attempts = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def __call__(self, value="ok"):
+        self.attempts += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            if self.errors:
+                raise self.errors.pop(0)
+            return value
+        finally:
+            self.in_flight -= 1
+
+
+def controller(**kwargs) -> RequestController:
+    return RequestController(**{"requests_per_second": 0, "base_backoff": 0, **kwargs})
+
+
+class TestRequestController:
+    """Test retries, backoff and the adaptive concurrency limit."""
+
+    async def test_retries_throttled_request(self):
+        request = FlakyRequest(TransportServerError("slow down", 429))
+        requests = controller(max_concurrency=8)
+
+        assert await requests.call(request, "page") == "page"
+        assert request.attempts == 2
+        assert requests.limit == pytest.approx(4 + 1 / 4)
+        assert requests.metrics()["throttled"] == 1
+        assert requests.metrics()["retries"] == 1
+
+    async def test_retries_connection_errors_without_backing_off(self):
+        request = FlakyRequest(aiohttp.ClientConnectionError())
+        requests = controller(max_concurrency=8)
+
+        await requests.call(request)
+
+        assert request.attempts == 2
+        assert requests.limit == 8
+
+    async def test_query_errors_are_not_retried(self):
+        request = FlakyRequest(TransportQueryError("bad query"))
+        requests = controller()
+
+        with pytest.raises(TransportQueryError):
+            await requests.call(request)
+
+        assert request.attempts == 1
+        assert requests.metrics()["failures"] == 1
+
+    async def test_gives_up_after_max_attempts(self):
+        request = FlakyRequest(*[TransportServerError("down", 503)] * 5)
+        requests = controller(max_attempts=3)
+
+        with pytest.raises(TransportServerError):
+            await requests.call(request)
+
+        assert request.attempts == 3
+
+    async def test_deadline_bounds_slow_requests(self):
+        request = FlakyRequest(delay=1)
+        requests = controller(deadline=0.05)
+
+        with pytest.raises(TimeoutError):
+            await requests.call(request)
+
+        assert request.attempts == 1
+
+    async def test_in_flight_requests_stay_under_limit(self):
+        request = FlakyRequest(delay=0.01)
+        requests = controller(max_concurrency=3)
+
+        await asyncio.gather(*(requests.call(request) for _ in range(12)))
+
+        assert request.max_in_flight == 3
+        assert requests.in_flight == 0
+
+    async def test_limit_recovers_after_successes(self):
+        requests = controller(max_concurrency=4)
+        await requests.call(FlakyRequest(TransportServerError("busy", 429)))
+        await requests.call(FlakyRequest(TransportServerError("busy", 429)))
+
+        for _ in range(5):
+            await requests.call(FlakyRequest())
+
+        assert 2 < requests.limit <= 4
+
+
+class TestTokenBucket:
+    """Test request pacing."""
+
+    async def test_paces_after_burst(self):
+        bucket = TokenBucket(rate=100, burst=2)
+        start = time.monotonic()
+
+        for _ in range(6):
+            await bucket.acquire()
+
+        assert time.monotonic() - start >= 0.035
+
+    async def test_zero_rate_is_unlimited(self):
+        bucket = TokenBucket(rate=0, burst=1)
+        start = time.monotonic()
+
+        for _ in range(1000):
+            await bucket.acquire()
+
+        assert time.monotonic() - start < 0.1
@@ -0,0 +1,99 @@
+"""Tests for dependency-aware stage scheduling."""
+
+import asyncio
+import graphlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from zwickfi.scheduler import Stage, run_stages
+
+
+class TestRunStages:
+    """Test ordering, overlap and failure isolation of pipeline stages."""
+
+    async def test_dependents_receive_results(self):
+        stages = [
+            Stage("total", lambda r: r["a"] + r["b"], after=("a", "b")),
+            Stage("a", lambda r: 1),
+            Stage("b", lambda r: asyncio.sleep(0, result=2)),
+        ]
+
+        outcome = await run_stages(stages)
+
+        assert outcome.results == {"a": 1, "b": 2, "total": 3}
+
+    async def test_independent_stages_overlap(self):
+        def slow(_):
+            time.sleep(0.2)
+
+        stages = [
+            Stage("io", lambda r: asyncio.sleep(0.2)),
+            Stage("cpu", slow, blocking=True),
+            Stage("query", slow, blocking=True),
+        ]
+
+        start = time.perf_counter()
+        await run_stages(stages)
+
+        assert time.perf_counter() - start < 0.45
+
+    async def test_blocking_stages_run_off_the_event_loop(self):
+        loop_thread = threading.get_ident()
+        stages = [Stage("query", lambda r: threading.get_ident(), blocking=True)]
+
+        outcome = await run_stages(stages)
+
+        assert outcome.results["query"] != loop_thread
+
+    async def test_blocking_stages_use_given_executor(self):
+        with ThreadPoolExecutor(thread_name_prefix="loads") as pool:
+            stages = [
+                Stage(
+                    "load",
+                    lambda r: threading.current_thread().name,
+                    blocking=True,
+                    executor=pool,
+                )
+            ]
+
+            outcome = await run_stages(stages)
+
+        assert outcome.results["load"].startswith("loads")
+
+    async def test_failure_only_skips_dependents(self):
+        def fail(_):
+            raise RuntimeError("endpoint down")
+
+        stages = [
+            Stage("extract.tags", fail),
+            Stage("load.tags", lambda r: "loaded", after=("extract.tags",)),
+            Stage("extract.accounts", lambda r: ["acct"]),
+            Stage("load.accounts", lambda r: "loaded", after=("extract.accounts",)),
+        ]
+
+        outcome = await run_stages(stages)
+
+        assert outcome.results == {
+            "extract.accounts": ["acct"],
+            "load.accounts": "loaded",
+        }
+        assert list(outcome.errors) == ["extract.tags"]
+        assert outcome.skipped == ["load.tags"]
+        with pytest.raises(ExceptionGroup):
+            outcome.raise_for_errors()
+
+    async def test_unknown_dependency_is_rejected(self):
+        with pytest.raises(ValueError):
+            await run_stages([Stage("load", lambda r: None, after=("extract",))])
+
+    async def test_cycle_is_rejected(self):
+        stages = [
+            Stage("a", lambda r: None, after=("b",)),
+            Stage("b", lambda r: None, after=("a",)),
+        ]
+
+        with pytest.raises(graphlib.CycleError):
+            await run_stages(stages)
@@ -0,0 +1,117 @@
+"""Tests for the HTTP service mode."""
+
+import json
+import threading
+import urllib.error
+import urllib.request
+from http import HTTPStatus
+from unittest import mock
+
+import pytest
+
+from zwickfi import server
+
+
+@pytest.fixture
+def clients():
+    with (
+        mock.patch.object(server, "get_bigquery_client") as get_bq,
+        mock.patch.object(server, "get_monarch_client") as get_mm,
+    ):
+        yield get_bq, get_mm
+
+
+class TestSyncService:
+    """Test warm client reuse and overlap rejection."""
+
+    def test_clients_are_authenticated_once(self, clients):
+        get_bq, get_mm = clients
+        service = server.SyncService()
+        with mock.patch.object(
+            server.cli, "sync", return_value={"status": "ok"}
+        ) as sync:
+            service.run()
+            status, body = service.run()
+
+        assert status == HTTPStatus.OK
+        assert body == {"status": "ok"}
+        get_bq.assert_called_once()
+        get_mm.assert_called_once()
+        assert sync.call_args.args == (get_bq.return_value, get_mm.return_value)
+
+    def test_overlapping_run_is_rejected(self, clients):
+        service = server.SyncService()
+        started, release = threading.Event(), threading.Event()
+
+        def slow_sync(*args, **kwargs):
+            started.set()
+            release.wait()
+            return {"status": "ok"}
+
+        with mock.patch.object(server.cli, "sync", side_effect=slow_sync):
+            first = threading.Thread(target=service.run)
+            first.start()
+            started.wait()
+            status, body = service.run()
+            release.set()
+            first.join()
+
+        assert status == HTTPStatus.CONFLICT
+        assert body["status"] == "busy"
+        assert not service.busy
+
+    def test_failed_run_reports_error(self, clients):
+        service = server.SyncService()
+        with mock.patch.object(server.cli, "sync", side_effect=RuntimeError("boom")):
+            status, body = service.run()
+
+        assert status == HTTPStatus.INTERNAL_SERVER_ERROR
+        assert body["error"] == "RuntimeError: boom"
+        assert body["run_id"]
+
+
+class TestSyncServer:
+    """Test the HTTP endpoints."""
+
+    @pytest.fixture
+    def base_url(self, clients):
+        httpd = server.SyncServer(("127.0.0.1", 0))
+        thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+        thread.start()
+        yield f"http://127.0.0.1:{httpd.server_address[1]}"
+        httpd.shutdown()
+        httpd.server_close()
+
+    def test_request_runs_sync_and_returns_summary(self, base_url):
+        summary = {"run_id": "abc", "status": "ok", "tables": {"accounts": 3}}
+        with mock.patch.object(server.cli, "sync", return_value=summary):
+            request = urllib.request.Request(base_url, method="POST")
+            with urllib.request.urlopen(request) as response:
+                assert response.status == HTTPStatus.OK
+                assert json.loads(response.read()) == summary
+
+    def test_healthz_does_not_sync(self, base_url):
+        with mock.patch.object(server.cli, "sync") as sync:
+            with urllib.request.urlopen(f"{base_url}/healthz") as response:
+                body = json.loads(response.read())
+
+        assert body == {"status": "ok", "busy": False}
+        sync.assert_not_called()
+
+    @pytest.mark.parametrize("path", ["/favicon.ico", "/robots.txt", "/wp-login.php"])
+    def test_other_paths_do_not_sync(self, base_url, path):
+        with mock.patch.object(server.cli, "sync") as sync:
+            for method in ("GET", "POST"):
+                request = urllib.request.Request(base_url + path, method=method)
+                with pytest.raises(urllib.error.HTTPError) as excinfo:
+                    urllib.request.urlopen(request)
+                assert excinfo.value.code == HTTPStatus.NOT_FOUND
+
+        sync.assert_not_called()
+
+    def test_errors_return_500(self, base_url):
+        with mock.patch.object(server.cli, "sync", side_effect=RuntimeError("boom")):
+            with pytest.raises(urllib.error.HTTPError) as excinfo:
+                urllib.request.urlopen(base_url)
+
+        assert excinfo.value.code == HTTPStatus.INTERNAL_SERVER_ERROR
@@ -0,0 +1,86 @@
+"""Tests for the run checkpoint spool."""
+
+import os
+import time
+
+from zwickfi.spool import CheckpointSpool, get_checkpoint_spool
+
+
+class TestCheckpointSpool:
+    """Test spooling and reading back units of work."""
+
+    def test_round_trips_nested_records(self, tmp_path):
+        spool = CheckpointSpool(tmp_path, "run-1", "secret")
+        records = [{"id": "txn-1", "tags": [], "category": {"name": "Food"}}, {}]
+
+        spool.put("transactions/0", records)
+
+        assert spool.get("transactions/0") == records
+
+    def test_units_are_encrypted_and_private(self, tmp_path):
+        spool = CheckpointSpool(tmp_path, "run-1", "secret")
+
+        spool.put("accounts", [{"id": "acct-1", "displayName": "Checking"}])
+
+        path = tmp_path / "run-1" / "accounts.parquet.enc"
+        assert b"Checking" not in path.read_bytes()
+        assert path.stat().st_mode & 0o777 == 0o600
+
+    def test_wrong_key_reads_as_missing(self, tmp_path):
+        CheckpointSpool(tmp_path, "run-1", "secret").put("accounts", [{"id": "a"}])
+
+        assert CheckpointSpool(tmp_path, "run-1", "other").get("accounts") is None
+
+    def test_missing_unit_is_none(self, tmp_path):
+        assert (
+            CheckpointSpool(tmp_path, "run-1", "secret").get("transactions/0") is None
+        )
+
+    def test_runs_are_isolated(self, tmp_path):
+        CheckpointSpool(tmp_path, "run-1", "secret").put("accounts", [{"id": "a"}])
+
+        assert CheckpointSpool(tmp_path, "run-2", "secret").get("accounts") is None
+
+    def test_clear_removes_run(self, tmp_path):
+        spool = CheckpointSpool(tmp_path, "run-1", "secret")
+        spool.put("accounts", [{"id": "a"}])
+
+        spool.clear()
+
+        assert spool.get("accounts") is None
+        assert not (tmp_path / "run-1").exists()
+
+    def test_evicts_abandoned_runs(self, tmp_path):
+        old = CheckpointSpool(tmp_path, "old", "secret")
+        old.put("accounts", [{"id": "a"}])
+        an_hour_ago = time.time() - 3600
+        os.utime(old.directory, (an_hour_ago, an_hour_ago))
+        current = CheckpointSpool(tmp_path, "current", "secret")
+        current.put("accounts", [{"id": "a"}])
+
+        current.evict(max_age_seconds=60)
+
+        assert not old.directory.exists()
+        assert current.get("accounts") == [{"id": "a"}]
+
+
+class TestGetCheckpointSpool:
+    """Test environment configuration."""
+
+    def test_empty_dir_disables_spool(self, monkeypatch):
+        monkeypatch.setenv("SPOOL_DIR", "")
+
+        assert get_checkpoint_spool("run-1") is None
+
+    def test_spool_is_keyed_by_run(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("SPOOL_DIR", str(tmp_path))
+        monkeypatch.setenv("MONARCH_SESSION_KEY", "secret")
+
+        assert get_checkpoint_spool("run-1").directory == tmp_path / "run-1"
+
+    def test_no_key_disables_spool(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("SPOOL_DIR", str(tmp_path))
+        monkeypatch.delenv("MONARCH_SESSION_KEY", raising=False)
+        monkeypatch.delenv("MONARCH_PASSWORD", raising=False)
+
+        assert get_checkpoint_spool("run-1") is None
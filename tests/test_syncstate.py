@@ -0,0 +1,168 @@
+"""Tests for persisted sync state and freshness policies."""
+
+from datetime import UTC, datetime, timedelta
+from unittest import mock
+
+import pytest
+from google.api_core.exceptions import NotFound
+
+from zwickfi import syncstate
+from zwickfi.syncstate import BigQuerySyncState, LocalSyncState
+
+NOW = datetime(2024, 1, 31, 12, tzinfo=UTC)
+
+
+class TestParseFreshness:
+    """Test parsing of SYNC_FRESHNESS policies."""
+
+    def test_units(self):
+        assert syncstate.parse_freshness(
+            "accounts=30m, budgets=6h,forecast=1d,x=90"
+        ) == {
+            "accounts": timedelta(minutes=30),
+            "budgets": timedelta(hours=6),
+            "forecast": timedelta(days=1),
+            "x": timedelta(seconds=90),
+        }
+
+    def test_empty_spec(self):
+        assert syncstate.parse_freshness("") == {}
+
+    @pytest.mark.parametrize("spec", ["accounts", "accounts=soon", "=1h"])
+    def test_malformed_policy_is_rejected(self, spec):
+        with pytest.raises(ValueError, match="Invalid freshness policy"):
+            syncstate.parse_freshness(spec)
+
+    def test_environment_overrides_defaults(self, monkeypatch):
+        monkeypatch.setenv("SYNC_FRESHNESS", "budgets=0,accounts=1h")
+
+        freshness = syncstate.get_freshness()
+
+        assert freshness["budgets"] == timedelta(0)
+        assert freshness["accounts"] == timedelta(hours=1)
+        assert freshness["forecast"] == syncstate.DEFAULT_FRESHNESS["forecast"]
+
+
+class TestLocalSyncState:
+    """Test the JSON file sync state."""
+
+    def test_records_are_scoped(self, tmp_path):
+        path = tmp_path / "state.json"
+        LocalSyncState(path, "p.a").record(["accounts"], NOW)
+
+        assert LocalSyncState(path, "p.a").last_synced() == {"accounts": NOW}
+        assert LocalSyncState(path, "p.b").last_synced() == {}
+
+    def test_later_records_update_entities(self, tmp_path):
+        state = LocalSyncState(tmp_path / "state.json", "p.a")
+        state.record(["accounts", "budgets"], NOW - timedelta(days=1))
+        state.record(["accounts"], NOW)
+
+        assert state.last_synced() == {
+            "accounts": NOW,
+            "budgets": NOW - timedelta(days=1),
+        }
+
+
+class TestStaleEntities:
+    """Test selecting the entities due for a sync."""
+
+    def test_only_lapsed_or_unsynced_entities_are_stale(self, tmp_path):
+        state = LocalSyncState(tmp_path / "state.json", "p.a")
+        state.record(["budgets", "forecast", "accounts"], NOW - timedelta(hours=7))
+        freshness = {"budgets": timedelta(hours=6), "forecast": timedelta(days=1)}
+
+        stale = syncstate.stale_entities(
+            state,
+            ["transactions", "accounts", "budgets", "forecast"],
+            freshness,
+            now=NOW,
+        )
+
+        assert stale == ["transactions", "accounts", "budgets"]
+
+    def test_runs_just_under_the_policy_apart_are_stale(self, tmp_path):
+        state = LocalSyncState(tmp_path / "state.json", "p.a")
+        state.record(["accounts", "budgets"], NOW - timedelta(minutes=59, seconds=58))
+        freshness = {"accounts": timedelta(hours=1), "budgets": timedelta(hours=6)}
+
+        stale = syncstate.stale_entities(
+            state, ["accounts", "budgets"], freshness, now=NOW
+        )
+
+        assert stale == ["accounts"]
+
+    def test_day_policies_follow_the_calendar(self, tmp_path):
+        state = LocalSyncState(tmp_path / "state.json", "p.a")
+        yesterday = datetime(2024, 1, 30, 9, 5).astimezone(UTC)
+        state.record(["forecast"], yesterday)
+        freshness = {"forecast": timedelta(days=1)}
+        today = datetime(2024, 1, 31, 9).astimezone(UTC)
+
+        stale = syncstate.stale_entities(state, ["forecast"], freshness, now=today)
+        later_yesterday = syncstate.stale_entities(
+            state, ["forecast"], freshness, now=yesterday + timedelta(hours=14)
+        )
+
+        assert stale == ["forecast"]
+        assert later_yesterday == []
+
+
+class TestBigQuerySyncState:
+    """Test the BigQuery table sync state."""
+
+    def test_missing_table_has_no_state(self):
+        client = mock.Mock()
+        client.get_table.side_effect = NotFound("missing")
+
+        assert BigQuerySyncState(client, "meta.sync_state", "p.a").last_synced() == {}
+        client.query.assert_not_called()
+
+    def test_latest_sync_per_entity_is_read_for_scope(self):
+        client = mock.Mock()
+        client.query.return_value.result.return_value = [
+            mock.Mock(entity="accounts", synced_at=NOW)
+        ]
+
+        last_synced = BigQuerySyncState(client, "meta.sync_state", "p.a").last_synced()
+
+        assert last_synced == {"accounts": NOW}
+        job_config = client.query.call_args.kwargs["job_config"]
+        assert job_config.query_parameters[0].value == "p.a"
+
+    def test_record_appends_rows(self):
+        client = mock.Mock()
+
+        with mock.patch("zwickfi.bigquery.write_to_bigquery") as write:
+            BigQuerySyncState(client, "meta.sync_state", "p.a").record(
+                ["accounts", "budgets"], NOW
+            )
+
+        rows = write.call_args.args[0]
+        assert rows["entity"].tolist() == ["accounts", "budgets"]
+        assert (rows["scope"] == "p.a").all()
+        assert write.call_args.args[1:3] == ("meta", "sync_state")
+        assert write.call_args.kwargs["write_disposition"] == "WRITE_APPEND"
+
+
+class TestGetSyncState:
+    """Test configuring the sync state store."""
+
+    def test_table_takes_precedence(self, monkeypatch):
+        monkeypatch.setenv("SYNC_STATE_TABLE", "meta.sync_state")
+
+        assert isinstance(syncstate.get_sync_state(mock.Mock()), BigQuerySyncState)
+
+    def test_table_is_in_the_sync_project(self, monkeypatch):
+        monkeypatch.setenv("SYNC_STATE_TABLE", "ops.sync_state")
+
+        state = syncstate.get_sync_state(mock.Mock(), "household", "other-project")
+
+        assert state.project == "other-project"
+        assert state.scope == "other-project.household"
+
+    def test_empty_settings_disable_state(self, monkeypatch):
+        monkeypatch.setenv("SYNC_STATE_TABLE", "")
+        monkeypatch.setenv("SYNC_STATE_FILE", "")
+
+        assert syncstate.get_sync_state(mock.Mock()) is None
@@ -0,0 +1,170 @@
+"""Tests for JSON flattening utilities."""
+
+from datetime import date
+
+import pandas as pd
+import pyarrow as pa
+
+from zwickfi.utils import (
+    concat_frames,
+    flatten_records,
+    json_to_dataframe,
+    to_stored_types,
+)
+
+FIELDS = {
+    "id": "string",
+    "amount": "float",
+    "count": "int",
+    "pending": "bool",
+    "tags": "list",
+    "category": {"id": "string", "group": {"name": "string"}},
+}
+
+RECORDS = [
+    {
+        "id": "a",
+        "amount": 1,
+        "count": 3,
+        "pending": True,
+        "tags": [{"id": "t"}],
+        "category": {"id": "c1", "group": {"name": "Living"}},
+    },
+    {
+        "id": "b",
+        "amount": -2.5,
+        "count": None,
+        "pending": False,
+        "tags": [],
+        "category": None,
+    },
+]
+
+
+class TestFlattenRecords:
+    """Test the schema-driven flattener."""
+
+    def test_matches_json_normalize_values(self):
+        df = flatten_records(RECORDS, FIELDS)
+        expected = json_to_dataframe(RECORDS)
+
+        for column in ["id", "amount", "pending", "category_id", "category_group_name"]:
+            assert (
+                df[column].tolist()
+                == expected[column].where(expected[column].notna(), None).tolist()
+            )
+
+    def test_builds_declared_types(self):
+        df = flatten_records(RECORDS, FIELDS)
+
+        assert df["amount"].dtype == "float64"
+        assert df["pending"].dtype == "boolean"
+        assert df["count"].dtype == "Int64"
+        assert df["count"].tolist()[0] == 3
+        assert pd.isna(df["count"].tolist()[1])
+        assert df["tags"].tolist() == [[{"id": "t"}], []]
+
+    def test_missing_nested_object_gives_nulls(self):
+        df = flatten_records(RECORDS, FIELDS)
+
+        assert pd.isna(df.loc[1, "category_id"])
+        assert pd.isna(df.loc[1, "category_group_name"])
+
+    def test_unknown_fields_fall_back_to_generic_flattening(self):
+        records = [
+            {**RECORDS[0], "extra": {"nested": 1}},
+            {**RECORDS[1], "category": {"id": "c2", "icon": "x"}},
+        ]
+
+        df = flatten_records(records, FIELDS)
+
+        assert df["extra_nested"].tolist()[0] == 1
+        assert df["category_icon"].tolist()[1] == "x"
+        assert len(df) == 2
+
+    def test_mistyped_values_are_kept(self):
+        df = flatten_records([{"id": 1, "amount": "n/a"}], FIELDS)
+
+        assert df.loc[0, "amount"] == "n/a"
+
+    def test_empty_records_keep_declared_columns(self):
+        df = flatten_records([], FIELDS)
+
+        assert df.empty
+        assert "category_group_name" in df.columns
+
+    def test_builds_compact_types(self):
+        fields = {"kind": "category", "day": "date", "at": "timestamp"}
+        records = [
+            {"kind": "Transaction", "day": "2024-01-31", "at": "2024-01-31T10:00:00Z"},
+            {"kind": "Transaction", "day": None, "at": None},
+        ]
+
+        df = flatten_records(records, fields)
+
+        assert isinstance(df["kind"].dtype, pd.CategoricalDtype)
+        assert df["day"].tolist()[0] == date(2024, 1, 31)
+        assert df["day"].dtype == pd.ArrowDtype(pa.date32())
+        assert df["at"].dtype == "datetime64[us, UTC]"
+        assert pd.isna(df["at"].tolist()[1])
+
+    def test_unparseable_compact_values_are_kept(self):
+        df = flatten_records([{"day": "soon"}], {"day": "date"})
+
+        assert df.loc[0, "day"] == "soon"
+
+    def test_int_dtype_does_not_depend_on_values(self):
+        small = flatten_records([{"count": 1}], FIELDS)
+        large = flatten_records([{"count": 2**40}], FIELDS)
+
+        assert small["count"].dtype == large["count"].dtype == "Int64"
+
+
+class TestToStoredTypes:
+    """Test converting compact columns back to the warehouse's strings."""
+
+    FIELDS = {"id": "string", "day": "date", "meta": {"at": "timestamp"}}
+
+    def test_dates_and_timestamps_become_iso_strings(self):
+        records = [
+            {"id": "a", "day": "2024-01-31", "meta": {"at": "2024-01-31T10:00:00Z"}},
+            {"id": "b", "day": None, "meta": None},
+        ]
+
+        df = to_stored_types(flatten_records(records, self.FIELDS), self.FIELDS)
+
+        assert df["day"].tolist()[0] == "2024-01-31"
+        assert df["meta_at"].tolist()[0] == "2024-01-31T10:00:00+00:00"
+        assert pd.isna(df["day"].tolist()[1])
+        assert pd.isna(df["meta_at"].tolist()[1])
+        assert df["id"].tolist() == ["a", "b"]
+
+    def test_unparsed_columns_are_left_as_they_are(self):
+        df = flatten_records([{"day": "soon"}], self.FIELDS)
+
+        assert to_stored_types(df, self.FIELDS)["day"].tolist() == ["soon"]
+
+    def test_json_to_dataframe_uses_entity_spec(self):
+        df = json_to_dataframe(
+            {"householdTransactionTags": [{"id": "t", "name": "Trip"}]},
+            key="householdTransactionTags",
+            entity="tags",
+        )
+
+        assert {"id", "name", "color", "order", "transactionCount"} <= set(df.columns)
+
+
+class TestConcatFrames:
+    """Test concatenation of frames with categorical columns."""
+
+    def test_categoricals_survive_differing_categories(self):
+        frames = [
+            flatten_records([{"name": "a"}], {"name": "category"}),
+            flatten_records([{"name": "b"}, {"name": "a"}], {"name": "category"}),
+        ]
+
+        df = concat_frames(frames)
+
+        assert isinstance(df["name"].dtype, pd.CategoricalDtype)
+        assert df["name"].tolist() == ["a", "b", "a"]
+        assert df.index.tolist() == [0, 1, 2]